@@ -1,2 +1,25 @@
+import importlib
+
 from .solver import Solver
 from .check_solver import CheckSolver
+from .bench_solver import BenchSolver
+from .bench_store import BenchStore
+from .check_cache import CheckCache
+from .registry import LazyModule, Registry
+
+# These are only imported when first used, since they pull in cProfile,
+# pstats, xml and subprocess, which every solution would otherwise pay for
+# when it imports Solver
+_LAZY_ATTRIBUTES = {
+	"ProfileSolver": ".profile_solver",
+	"JsonLinesReporter": ".reporters",
+	"JUnitReporter": ".reporters",
+	"ImportProfiler": ".import_profiler",
+}
+
+
+def __getattr__(name: str):
+	if name not in _LAZY_ATTRIBUTES:
+		raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+	module = importlib.import_module(_LAZY_ATTRIBUTES[name], __name__)
+	return getattr(module, name)
@@ -0,0 +1,175 @@
+import gc
+import math
+import re
+import statistics
+import time
+import tracemalloc
+import typing
+
+
+class BenchSolver:
+	"""
+	A generic class to measure the running time of the solution to a
+	problem statement over inputs of increasing size
+	"""
+	def __init__(self):
+		pass
+
+	@staticmethod
+	def time_solver(
+			generate_input: typing.Callable, solver, size: int,
+			repeat: int = 5, warmup: int = 1
+	) -> typing.Dict[str, float]:
+		"""
+		Times the solver on inputs of a given size
+		:param generate_input: A function that returns the input arguments
+			of a test case, as a dictionary, for the given size
+		:param solver: A class that inherits the Solver class and
+			implements the solve method for a given problem statement
+		:param size: The size of the input to be generated
+		:param repeat: The number of timed runs
+		:param warmup: The number of untimed runs made before the timed ones
+		:return: The size along with the min, median and p95 of the
+			timings in seconds and the peak memory allocated in bytes
+		"""
+		timings = []
+		for run in range(warmup + repeat):
+			# A fresh input is generated for every run, outside of the timed
+			# region, since solvers are allowed to modify their input in-place
+			input_value = generate_input(size)
+			# Like timeit, the garbage collector is kept from kicking in
+			# halfway through a run and skewing its timing
+			gc_enabled = gc.isenabled()
+			gc.disable()
+			try:
+				start = time.perf_counter()
+				solver.solve(input_value)
+				elapsed = time.perf_counter() - start
+			finally:
+				if gc_enabled:
+					gc.enable()
+			if run >= warmup:
+				timings.append(elapsed)
+		return {
+			"size": size,
+			"min": min(timings),
+			"median": statistics.median(timings),
+			"p95": BenchSolver.percentile(timings, 95),
+			"peak_memory": BenchSolver.peak_memory(generate_input, solver, size),
+		}
+
+	@staticmethod
+	def peak_memory(generate_input: typing.Callable, solver, size: int) -> int:
+		"""
+		Measures the peak memory allocated by the solver on an input of a
+		given size. This is done in a run of its own, since tracing the
+		allocations slows the solver down too much for it to be timed
+		:param generate_input: A function that returns the input arguments
+			of a test case, as a dictionary, for the given size
+		:param solver: A class that inherits the Solver class and
+			implements the solve method for a given problem statement
+		:param size: The size of the input to be generated
+		:return: The peak memory allocated while solving, in bytes
+		"""
+		input_value = generate_input(size)
+		was_tracing = tracemalloc.is_tracing()
+		if not was_tracing:
+			tracemalloc.start()
+		tracemalloc.reset_peak()
+		try:
+			baseline, _ = tracemalloc.get_traced_memory()
+			solver.solve(input_value)
+			_, peak = tracemalloc.get_traced_memory()
+		finally:
+			if not was_tracing:
+				tracemalloc.stop()
+		return peak - baseline
+
+	@staticmethod
+	def bench_solver(
+			generate_input: typing.Callable, solver, sizes: typing.List[int],
+			repeat: int = 5, warmup: int = 1
+	) -> typing.List[typing.Dict[str, float]]:
+		"""
+		Times the solver over a sweep of input sizes
+		:param generate_input: A function that returns the input arguments
+			of a test case, as a dictionary, for the given size
+		:param solver: A class that inherits the Solver class and
+			implements the solve method for a given problem statement
+		:param sizes: The input sizes to sweep over
+		:param repeat: The number of timed runs per size
+		:param warmup: The number of untimed runs made before the timed ones
+		:return: The timing statistics for each size
+		"""
+		return [
+			BenchSolver.time_solver(generate_input, solver, size, repeat, warmup)
+			for size in sizes
+		]
+
+	@staticmethod
+	def percentile(values: typing.List[float], percent: float) -> float:
+		"""
+		Computes a percentile using the nearest-rank method
+		:param values: The values to compute the percentile of
+		:param percent: The percentile to be computed, between 0 and 100
+		:return: The smallest value that is greater than or equal to
+			percent% of the values
+		"""
+		ordered = sorted(values)
+		rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+		return ordered[rank - 1]
+
+	@staticmethod
+	def fit_exponent(sizes: typing.List[int], timings: typing.List[float]) -> float:
+		"""
+		Fits the empirical complexity exponent k of time = c * size^k, which
+		is the slope of the least squares line through log(size), log(time)
+		:param sizes: The input sizes
+		:param timings: The time taken for each of the input sizes
+		:raises: ValueError: When fewer than two distinct sizes are given
+		:return: The fitted exponent
+		"""
+		xs = [math.log(size) for size in sizes]
+		ys = [math.log(max(timing, 1e-9)) for timing in timings]
+		x_mean = statistics.fmean(xs)
+		y_mean = statistics.fmean(ys)
+		variance = sum((x - x_mean) ** 2 for x in xs)
+		if len(xs) < 2 or variance == 0:
+			raise ValueError("At least two distinct sizes are needed")
+		covariance = sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys))
+		return covariance / variance
+
+	@staticmethod
+	def declared_complexity(source: str) -> typing.Optional[str]:
+		"""
+		Finds the time complexity claimed in the comments of a solution,
+		such as "Time Complexity: O(N)". When several are claimed, the last
+		one is taken since the approach implemented is described last
+		:param source: The source code of the solution
+		:return: The claimed complexity, such as "N" or "NlogN", if any
+		"""
+		claims = re.findall(
+			r"^#.*time complexity[^.\n]*?O\(([^)]+)\)",
+			source, flags=re.IGNORECASE | re.MULTILINE
+		)
+		return claims[-1].replace(" ", "") if claims else None
+
+	@staticmethod
+	def complexity_exponent(complexity: str) -> typing.Optional[float]:
+		"""
+		Converts a claimed complexity into the exponent of N it corresponds
+		to, with logarithmic factors being ignored
+		:param complexity: The claimed complexity, such as "N", "N^2",
+			"NlogN" or "1"
+		:return: The exponent, or None when the complexity is not understood
+		"""
+		if complexity == "1":
+			return 0.0
+		match = re.fullmatch(
+			r"(?:(N)(?:\^(\d+(?:\.\d+)?))?)?\*?(?:log\(?N\)?)?", complexity
+		)
+		if match is None:
+			return None
+		if match.group(1) is None:
+			return 0.0
+		return float(match.group(2) or 1)
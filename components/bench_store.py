@@ -0,0 +1,185 @@
+import datetime
+import hashlib
+import json
+import os
+import platform
+import typing
+
+
+class BenchStore:
+	"""
+	A persistent history of benchmark results stored as a JSON file, with
+	every record keyed by the hash of the solution file that was benchmarked
+	and the version of the interpreter it was benchmarked with. The last few
+	runs of the same file and interpreter are all kept, since the timings of
+	separate runs vary by far more than those within a run
+	"""
+	# The number of runs of the same file and interpreter that are kept
+	MAX_RUNS = 5
+
+	def __init__(self, path: str):
+		"""
+		Loads the history of benchmark results, if the file exists
+		:param path: The path of the JSON file holding the history
+		"""
+		self.path = path
+		self.history = {}
+		if os.path.isfile(path):
+			with open(path) as store_file:
+				self.history = json.load(store_file)
+
+	@staticmethod
+	def hash_files(paths: typing.List[str]) -> str:
+		"""
+		Hashes the contents of the given files
+		:param paths: The paths of the files to be hashed
+		:return: The hex digest of the SHA-256 hash of their contents
+		"""
+		digest = hashlib.sha256()
+		for path in paths:
+			with open(path, "rb") as hashed_file:
+				digest.update(hashed_file.read())
+		return digest.hexdigest()
+
+	@staticmethod
+	def interpreter() -> str:
+		"""
+		Identifies the interpreter that the benchmarks are being run with
+		:return: The implementation and version of the interpreter
+		"""
+		return f"{platform.python_implementation()}-{platform.python_version()}"
+
+	def add(self, problem: str, file_hash: str, results: typing.List[dict]):
+		"""
+		Records the results of benchmarking a solution, dropping the oldest
+		run of the same file hash and interpreter once there are MAX_RUNS
+		of them
+		:param problem: The problem that was benchmarked
+		:param file_hash: The hash of the solution file that was benchmarked
+		:param results: The benchmark results for each input size
+		:return: None
+		"""
+		interpreter = BenchStore.interpreter()
+		records = self.history.get(problem, [])
+		runs = [
+			record for record in records
+			if (record["file_hash"], record["interpreter"])
+			== (file_hash, interpreter)
+		]
+		dropped = runs[:max(len(runs) - BenchStore.MAX_RUNS + 1, 0)]
+		records = [
+			record for record in records
+			if not any(record is run for run in dropped)
+		]
+		records.append({
+			"file_hash": file_hash,
+			"interpreter": interpreter,
+			"timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+			"results": results,
+		})
+		self.history[problem] = records
+
+	def baseline(self, problem: str) -> typing.Optional[dict]:
+		"""
+		Finds the baseline to compare a solution against, which merges the
+		runs kept of the file most recently benchmarked with the current
+		interpreter. The baseline of each size holds the fastest "min" and
+		the slowest "p95" and "peak_memory" of the runs, which bound what
+		the solution is seen to take
+		:param problem: The problem to find the baseline for
+		:return: The baseline record, with the number of "runs" merged, if
+			any
+		"""
+		interpreter = BenchStore.interpreter()
+		records = [
+			record for record in self.history.get(problem, [])
+			if record["interpreter"] == interpreter
+		]
+		if not records:
+			return None
+		latest = records[-1]
+		runs = [
+			record for record in records
+			if record["file_hash"] == latest["file_hash"]
+		]
+		merged = {}
+		for run in runs:
+			for result in run["results"]:
+				base = merged.setdefault(result["size"], dict(result))
+				base["min"] = min(base["min"], result["min"])
+				base["p95"] = max(base["p95"], result["p95"])
+				base["peak_memory"] = max(base["peak_memory"], result["peak_memory"])
+		return {
+			"file_hash": latest["file_hash"],
+			"interpreter": interpreter,
+			"timestamp": latest["timestamp"],
+			"runs": len(runs),
+			"results": [merged[size] for size in sorted(merged)],
+		}
+
+	def save(self):
+		"""
+		Writes the history of benchmark results back to its JSON file
+		:return: None
+		"""
+		directory = os.path.dirname(self.path)
+		if directory:
+			os.makedirs(directory, exist_ok=True)
+		temporary_path = f"{self.path}.tmp"
+		with open(temporary_path, "w") as store_file:
+			json.dump(self.history, store_file, indent=1)
+		os.replace(temporary_path, self.path)
+
+	@staticmethod
+	def compare(
+			baseline: typing.List[dict], results: typing.List[dict],
+			time_threshold: float, memory_threshold: float
+	) -> typing.List[str]:
+		"""
+		Compares benchmark results against a baseline, size by size. As the
+		timings are noisy, a size is only taken to have slowed down when even
+		its fastest run is slower than the p95 of the baseline by more than
+		the threshold, so that a slowdown within the spread of the baseline
+		is not reported
+		:param baseline: The baseline benchmark results for each input size
+		:param results: The new benchmark results for each input size
+		:param time_threshold: The allowed relative increase of the min time
+			over the p95 of the baseline
+		:param memory_threshold: The allowed relative increase of the
+			peak memory
+		:return: A description of each regression found
+		"""
+		regressions = []
+		baseline_by_size = {result["size"]: result for result in baseline}
+		for result in results:
+			base = baseline_by_size.get(result["size"])
+			if base is None:
+				continue
+			if result["min"] > base["p95"] * (1 + time_threshold):
+				regressions.append(
+					f"N={result['size']} min went from {base['min']:.6g} to "
+					f"{result['min']:.6g}, above the baseline p95 of {base['p95']:.6g}"
+				)
+			if result["peak_memory"] > base["peak_memory"] * (1 + memory_threshold):
+				regressions.append(
+					f"N={result['size']} peak_memory went from "
+					f"{base['peak_memory']:.6g} to {result['peak_memory']:.6g}"
+				)
+		return regressions
+
+	@staticmethod
+	def missing_sizes(
+			baseline: typing.List[dict], results: typing.List[dict]
+	) -> typing.List[int]:
+		"""
+		Finds the sizes benchmarked that the baseline has no results for,
+		which cannot be compared
+		:param baseline: The baseline benchmark results for each input size
+		:param results: The new benchmark results for each input size
+		:return: The sizes missing from the baseline
+		"""
+		baseline_sizes = {result["size"] for result in baseline}
+		return [
+			result["size"] for result in results
+			if result["size"] not in baseline_sizes
+		]
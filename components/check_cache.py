@@ -0,0 +1,107 @@
+import glob
+import json
+import os
+import platform
+import time
+import typing
+
+from .bench_store import BenchStore
+
+
+class CheckCache:
+	"""
+	An on-disk cache of the solutions that have passed their check, so that
+	unchanged solutions need not be imported and checked again. Every entry
+	is keyed by the hash of the solution file, the sources of the components
+	package, the version of the interpreter and the limits the solution was
+	checked under, so a change to any of them invalidates it
+	"""
+	def __init__(self, path: str, max_age_days: float = 30):
+		"""
+		Loads the cache, if the file exists
+		:param path: The path of the JSON file holding the cache
+		:param max_age_days: The number of days after which an entry that
+			has not been hit is pruned
+		"""
+		self.path = path
+		self.max_age_days = max_age_days
+		self.entries = {}
+		if os.path.isfile(path):
+			try:
+				with open(path) as cache_file:
+					self.entries = json.load(cache_file)
+			except ValueError:
+				# A corrupt cache is only a missed optimization
+				self.entries = {}
+		components_dir = os.path.dirname(os.path.abspath(__file__))
+		self.components_sources = sorted(
+			glob.glob(os.path.join(components_dir, "*.py"))
+		)
+
+	def key(self, file_name: str, limits: typing.Optional[dict] = None) -> str:
+		"""
+		Computes the key of a solution from its current contents and the
+		limits it is checked under, since a solution that passed without a
+		limit may well exceed a stricter one
+		:param file_name: The path of the solution file
+		:param limits: The limits the solution is checked under, such as its
+			TIMEOUT, MEMORY_LIMIT and CASE_TIMEOUT
+		:return: The key of the solution
+		"""
+		file_hash = BenchStore.hash_files([file_name] + self.components_sources)
+		key = f"{file_hash}-{platform.python_version()}"
+		if limits:
+			key += f"-{json.dumps(limits, sort_keys=True)}"
+		return key
+
+	def hit(self, problem: str, key: str) -> bool:
+		"""
+		Checks whether the solution has passed with the same key before
+		:param problem: The problem to be looked up
+		:param key: The current key of the solution
+		:return: True if it has, else False
+		"""
+		entry = self.entries.get(problem)
+		if entry is None or entry["key"] != key:
+			return False
+		entry["last_used"] = time.time()
+		return True
+
+	def add(self, problem: str, file_name: str, key: str):
+		"""
+		Records that a solution has passed its check, replacing any entry
+		held for an earlier version of it
+		:param problem: The problem that passed
+		:param file_name: The path of the solution file
+		:param key: The key of the solution that was checked
+		:return: None
+		"""
+		self.entries[problem] = {
+			"key": key, "file_name": file_name, "last_used": time.time()
+		}
+
+	def prune(self):
+		"""
+		Removes the entries of solutions that no longer exist and of those
+		that have not been hit for more than max_age_days
+		:return: None
+		"""
+		oldest = time.time() - self.max_age_days * 24 * 60 * 60
+		self.entries = {
+			problem: entry for problem, entry in self.entries.items()
+			if os.path.isfile(entry["file_name"]) and entry["last_used"] >= oldest
+		}
+
+	def save(self):
+		"""
+		Prunes the cache and writes it back to its JSON file
+		:return: None
+		"""
+		self.prune()
+		directory = os.path.dirname(self.path)
+		if directory:
+			os.makedirs(directory, exist_ok=True)
+		temporary_path = f"{self.path}.tmp"
+		with open(temporary_path, "w") as cache_file:
+			json.dump(self.entries, cache_file, indent=1)
+		os.replace(temporary_path, self.path)
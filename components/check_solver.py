@@ -1,13 +1,105 @@
+import contextlib
+import itertools
+import signal
+import time
+import traceback
+import tracemalloc
+import typing
+
+
+def _equal(solution_output, output_value) -> bool:
+	"""
+	Compares an output produced by a solver against the expected one. NumPy
+	arrays are compared with numpy.array_equal, since their == compares
+	element-wise instead of reducing to a single truth value, and lists and
+	tuples are compared element by element so that they can hold arrays
+	:param solution_output: The output produced by the solver
+	:param output_value: The expected output value
+	:return: True if they are equal, else False
+	"""
+	if hasattr(solution_output, "__array__") or hasattr(output_value, "__array__"):
+		# NumPy is only imported once a solver has returned an array
+		import numpy
+		return bool(numpy.array_equal(solution_output, output_value))
+	if (isinstance(solution_output, (list, tuple))
+			and isinstance(output_value, (list, tuple))):
+		return len(solution_output) == len(output_value) and all(
+			_equal(sol, out) for sol, out in zip(solution_output, output_value)
+		)
+	return solution_output == output_value
+
+
 class CheckSolver:
 	"""
 	A generic class to validate the solution to a problem statement
 	which is inherited by all checker classes
 	"""
+	PASSED = "PASSED"
+	FAILED = "FAILED"
+	TIMEOUT = "TIMEOUT"
+	OOM = "OOM"
+
 	def __init__(self):
 		pass
 
 	@staticmethod
-	def check_solver(test_cases: list, solver):
+	def check_output(input_value: dict, solution_output, output_value):
+		"""
+		Validates that the solver produced the desired output for a test case
+		:param input_value: The input arguments of the test case
+		:param solution_output: The output produced by the solver
+		:param output_value: The expected output value
+		:raises: AssertionError: When the test case fails
+		:raises: NotImplementedError: When attempting comparison for an
+			unexpected output type
+		:return: None
+		"""
+		error_message = (
+			f"Input Arguments:{input_value}"
+			f"\nSolution Output: {solution_output}"
+			f"\nOutput Value: {output_value}"
+		)
+		if (isinstance(output_value, int) 
+				or isinstance(output_value, float)
+				or isinstance(output_value, bool)
+				or isinstance(output_value, str)):
+			assert _equal(solution_output, output_value), error_message
+		elif isinstance(output_value, list):
+			for sol, out in zip(solution_output, output_value):
+				assert _equal(sol, out), error_message
+		else:
+			raise NotImplementedError
+
+	@staticmethod
+	@contextlib.contextmanager
+	def time_limit(seconds: typing.Optional[float]):
+		"""
+		Limits the wall-clock time spent within the context, using a timer
+		signal so that it can only be used from the main thread
+		:param seconds: The time limit in seconds, or None for no limit
+		:raises: TimeoutError: When the time limit is exceeded
+		:return: None
+		"""
+		if not seconds:
+			yield
+			return
+
+		def raise_timeout(signum, frame):
+			raise TimeoutError(f"Exceeded the time limit of {seconds:g}s")
+
+		previous_handler = signal.signal(signal.SIGALRM, raise_timeout)
+		signal.setitimer(signal.ITIMER_REAL, seconds)
+		try:
+			yield
+		finally:
+			signal.setitimer(signal.ITIMER_REAL, 0)
+			signal.signal(signal.SIGALRM, previous_handler)
+
+	@staticmethod
+	def check_solver(
+			test_cases: typing.Iterable, solver, batch_size: int = 1,
+			case_timeout: typing.Optional[float] = None
+	) -> int:
 		"""
 		Validates that the solver produces the desired output for
 		each input test case
@@ -17,29 +109,110 @@ class CheckSolver:
 				"input": {A dictionary of input arguments}
 				"output": The expected output value
 			}
+			It can also be any iterable or generator of them, or a function
+			returning one, in which case the test cases are consumed lazily
+			so that only one batch of them is held in memory at a time
 		:param solver: A class that inherits the Solver class and 
 			implements the solve method for a given problem statement
+		:param batch_size: The number of test cases passed to the
+			solve_batch method of the solver at once
+		:param case_timeout: The time limit in seconds for solving each test
+			case, with a batch being allowed this much per test case in it
 		:raises: AssertionError: When a test case fails
+		:raises: TimeoutError: When a batch of test cases exceeds its time limit
 		:raises: NotImplementedError: When attempting comparison for an
 			unexpected output type
-		:return: None
+		:return: The number of test cases checked
 		"""
-		for test_case in test_cases:
-			input_value = test_case["input"]
-			output_value = test_case["output"]
-			solution_output = solver.solve(input_value)
-			error_message = (
-				f"Input Arguments:{input_value}"
-				f"\nSolution Output: {solution_output}"
-				f"\nOutput Value: {output_value}"
+		if callable(test_cases):
+			test_cases = test_cases()
+		test_cases = iter(test_cases)
+		count = 0
+		while True:
+			batch = list(itertools.islice(test_cases, batch_size))
+			if not batch:
+				break
+			count += len(batch)
+			input_values = [test_case["input"] for test_case in batch]
+			output_values = [test_case["output"] for test_case in batch]
+			batch_timeout = case_timeout and case_timeout * len(batch)
+			with CheckSolver.time_limit(batch_timeout):
+				solution_outputs = list(solver.solve_batch(input_values))
+			assert len(solution_outputs) == len(batch), (
+				f"solve_batch returned {len(solution_outputs)} outputs "
+				f"for {len(batch)} inputs"
 			)
-			if (isinstance(output_value, int) 
-					or isinstance(output_value, float)
-					or isinstance(output_value, bool)
-					or isinstance(output_value, str)):
-				assert solution_output == output_value, error_message
-			elif isinstance(output_value, list):
-				for sol, out in zip(solution_output, output_value):
-					assert sol == out, error_message
-			else:
-				raise NotImplementedError
+			# The whole batch is compared at once, falling back to comparing
+			# test case by test case only to pinpoint the failing one
+			if all(
+					isinstance(output_value, (int, float, bool, str, list))
+					and _equal(solution_output, output_value)
+					for solution_output, output_value in zip(
+						solution_outputs, output_values
+					)
+			):
+				continue
+			for input_value, solution_output, output_value in zip(
+					input_values, solution_outputs, output_values
+			):
+				CheckSolver.check_output(
+					input_value, solution_output, output_value
+				)
+		return count
+
+	@staticmethod
+	def iter_results(
+			test_cases: typing.Iterable, solver,
+			case_timeout: typing.Optional[float] = None,
+			trace_memory: bool = True
+	) -> typing.Iterator[dict]:
+		"""
+		Validates the solver against each input test case like check_solver,
+		but solves them one at a time and carries on past the failing ones,
+		yielding a record of each test case as it completes
+		:param test_cases: A list, iterable or generator of the input values
+			and the corresponding output values for each test case, or a
+			function returning one, as for check_solver
+		:param solver: A class that inherits the Solver class and
+			implements the solve method for a given problem statement
+		:param case_timeout: The time limit in seconds for solving each
+			test case
+		:param trace_memory: Whether to trace the peak memory allocated while
+			solving each test case, which slows the solver down
+		:return: An iterator over the records of the test cases, each with
+			the "case" index, its "status", its "duration" in seconds, its
+			"peak_memory" in bytes (None if not traced) and the "error"
+			message if it did not pass
+		"""
+		if callable(test_cases):
+			test_cases = test_cases()
+		for index, test_case in enumerate(test_cases):
+			input_value = test_case["input"]
+			status, error, peak_memory = CheckSolver.PASSED, None, None
+			if trace_memory:
+				tracemalloc.start()
+			start = time.perf_counter()
+			try:
+				with CheckSolver.time_limit(case_timeout):
+					solution_output = solver.solve_batch([input_value])[0]
+				CheckSolver.check_output(
+					input_value, solution_output, test_case["output"]
+				)
+			except TimeoutError as exception:
+				status, error = CheckSolver.TIMEOUT, str(exception)
+			except MemoryError:
+				status, error = CheckSolver.OOM, traceback.format_exc()
+			except Exception:
+				status, error = CheckSolver.FAILED, traceback.format_exc()
+			finally:
+				duration = time.perf_counter() - start
+				if trace_memory:
+					_, peak_memory = tracemalloc.get_traced_memory()
+					tracemalloc.stop()
+			yield {
+				"case": index,
+				"status": status,
+				"duration": duration,
+				"peak_memory": peak_memory,
+				"error": error,
+			}
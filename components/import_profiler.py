@@ -0,0 +1,180 @@
+import ast
+import os
+import subprocess
+import sys
+import typing
+
+
+class ImportProfiler:
+	"""
+	Measures the cost of importing a module with python -X importtime, in a
+	fresh interpreter every time so that nothing it depends on has been
+	imported already. The cost is broken down into the time spent importing
+	its dependencies and the time spent executing its own module level code
+	"""
+	def __init__(self, paths: typing.Iterable[str] = (),
+				 first_party: typing.Iterable[str] = ()):
+		"""
+		Initializing the profiler
+		:param paths: The directories to be prepended to the PYTHONPATH of
+			the interpreters the modules are imported in
+		:param first_party: The top level packages that belong to this
+			repository rather than to the standard library or third parties
+		"""
+		self.paths = list(paths)
+		self.first_party = set(first_party)
+
+	@staticmethod
+	def parse(output: str) -> typing.List[dict]:
+		"""
+		Parses the output of python -X importtime, which lists the modules
+		in the order their imports finished, each one indented two spaces
+		deeper than the module that imported it
+		:param output: The output to be parsed
+		:return: A record of the name, depth, self and cumulative time in
+			seconds of every module imported, in the same order
+		"""
+		records = []
+		for line in output.splitlines():
+			if not line.startswith("import time:"):
+				continue
+			fields = line[len("import time:"):].split("|")
+			if len(fields) != 3 or not fields[0].strip().isdigit():
+				# The header of the columns
+				continue
+			name = fields[2][1:]
+			records.append({
+				"name": name.strip(),
+				"depth": (len(name) - len(name.lstrip())) // 2,
+				"self": int(fields[0]) / 1e6,
+				"cumulative": int(fields[1]) / 1e6,
+			})
+		return records
+
+	def classify(self, name: str) -> str:
+		"""
+		Classifies a module by where it comes from
+		:param name: The name of the module
+		:return: "first-party", "stdlib" or "third-party"
+		"""
+		package = name.split(".")[0]
+		if package in self.first_party:
+			return "first-party"
+		if package in sys.stdlib_module_names:
+			return "stdlib"
+		return "third-party"
+
+	def _import(self, module_name: str) -> typing.List[dict]:
+		"""
+		Imports a module in a fresh interpreter
+		:param module_name: The name of the module to be imported
+		:raises: ImportError: When the module fails to be imported
+		:return: The records of the modules imported, leaving out the ones
+			that were only looked for, such as optional dependencies that
+			are not installed
+		"""
+		environment = dict(os.environ)
+		environment["PYTHONPATH"] = os.pathsep.join(
+			self.paths + [environment.get("PYTHONPATH", "")]
+		)
+		process = subprocess.run(
+			[
+				sys.executable, "-X", "importtime", "-c",
+				# importlib.import_module is not timed by -X importtime
+				f"import sys; __import__({module_name!r}); "
+				f"print(*sys.modules, sep='\\n')"
+			],
+			env=environment, stdout=subprocess.PIPE,
+			stderr=subprocess.PIPE, text=True
+		)
+		if process.returncode != 0:
+			lines = process.stderr.splitlines()
+			error = next(
+				(line for line in reversed(lines) if line.strip()), "unknown error"
+			)
+			raise ImportError(f"{module_name} failed to be imported: {error}")
+		loaded = set(process.stdout.splitlines())
+		return [
+			record for record in ImportProfiler.parse(process.stderr)
+			if record["name"] in loaded
+		]
+
+	def profile(self, module_name: str, repeat: int = 1) -> dict:
+		"""
+		Measures the cost of importing a module, keeping the fastest of the
+		repeated imports to reduce the noise
+		:param module_name: The name of the module to be profiled
+		:param repeat: The number of times the module is imported
+		:raises: ImportError: When the module fails to be imported
+		:return: The "total" time taken to import the module, split into
+			the time spent on its "imports" and on its module level
+			"execution", along with the "dependencies" it imports directly
+			and the cumulative time of every top level "package" imported
+			on its behalf, all in seconds
+		"""
+		best = None
+		for _ in range(repeat):
+			records = self._import(module_name)
+			index = max(
+				position for position, record in enumerate(records)
+				if record["name"] == module_name
+			)
+			if best is None or records[index]["cumulative"] < best["cumulative"]:
+				best = {"index": index, "records": records, **records[index]}
+		index, records = best["index"], best["records"]
+		module = records[index]
+
+		# The modules imported on behalf of this one are the ones finished
+		# right before it that are nested deeper
+		start = index
+		while start > 0 and records[start - 1]["depth"] > module["depth"]:
+			start -= 1
+		descendants = records[start:index]
+		dependencies = [
+			{
+				"name": record["name"], "kind": self.classify(record["name"]),
+				"cumulative": record["cumulative"],
+			}
+			for record in descendants if record["depth"] == module["depth"] + 1
+		]
+		packages = {}
+		for record in descendants:
+			package = record["name"].split(".")[0]
+			if record["name"] == package:
+				packages[package] = max(
+					packages.get(package, 0.0), record["cumulative"]
+				)
+		return {
+			"module": module_name,
+			"total": module["cumulative"],
+			"execution": module["self"],
+			"imports": module["cumulative"] - module["self"],
+			"dependencies": dependencies,
+			"packages": packages,
+		}
+
+	@staticmethod
+	def unused_imports(source: str) -> typing.Dict[str, str]:
+		"""
+		Statically finds the imports of a module whose names are never used
+		anywhere in it, at the top level or within its functions
+		:param source: The source code of the module
+		:return: The names bound by the unused imports, mapped to the
+			modules they were imported from
+		"""
+		tree = ast.parse(source)
+		imported = {}
+		for node in ast.walk(tree):
+			if isinstance(node, ast.Import):
+				for alias in node.names:
+					imported[alias.asname or alias.name.split(".")[0]] = alias.name
+			elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+				for alias in node.names:
+					if alias.name != "*":
+						imported[alias.asname or alias.name] = node.module
+		used = {
+			node.id for node in ast.walk(tree) if isinstance(node, ast.Name)
+		}
+		return {
+			name: module for name, module in imported.items() if name not in used
+		}
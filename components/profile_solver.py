@@ -0,0 +1,141 @@
+import contextlib
+import cProfile
+import io
+import os
+import pstats
+import threading
+import tracemalloc
+import typing
+
+from .solver import Solver
+
+
+class ProfileSolver(Solver):
+	"""
+	A solver that wraps the solver of a problem statement and profiles every
+	call made to it with cProfile and tracemalloc, so that the checks run
+	against it double up as a profiling session
+	"""
+	def __init__(self, solver: Solver, top: int = 20, sample_interval: float = 0.005):
+		"""
+		Initializing the profilers for the wrapped solver
+		:param solver: A class that inherits the Solver class and
+			implements the solve method for a given problem statement
+		:param top: The number of functions and lines to report
+		:param sample_interval: The interval in seconds at which the memory
+			traced is sampled to find its peak
+		"""
+		super().__init__()
+		self.solver = solver
+		self.top = top
+		self.sample_interval = sample_interval
+		self.profile = cProfile.Profile()
+		# The largest amount of memory traced during a call, along with the
+		# top lines by memory allocated as close to it as sampled
+		self.peak_memory = 0
+		self.peak_statistics = []
+
+	def solve(self, input_value: dict):
+		with self.profiling():
+			return self.solver.solve(input_value)
+
+	def solve_batch(self, input_values: list) -> list:
+		with self.profiling():
+			return self.solver.solve_batch(input_values)
+
+	def _top_statistics(self) -> typing.List[tracemalloc.Statistic]:
+		"""
+		Takes a snapshot of the memory traced and reduces it to the top lines
+		by memory allocated, leaving out the allocations of the profiler and
+		of the context manager it runs in
+		:return: The statistics of the top lines
+		"""
+		snapshot = tracemalloc.take_snapshot().filter_traces((
+			tracemalloc.Filter(False, tracemalloc.__file__),
+			tracemalloc.Filter(False, contextlib.__file__),
+			tracemalloc.Filter(False, __file__),
+			tracemalloc.Filter(False, threading.__file__),
+		))
+		return snapshot.statistics("lineno")[:self.top]
+
+	@contextlib.contextmanager
+	def profiling(self):
+		"""
+		Profiles the calls made within the context. The peak of the memory
+		traced is reset for every call and measured from the memory already
+		traced, so that only the allocations made by the call itself are
+		accounted for, and a background thread snapshots the allocations
+		whenever the memory traced grows to a new high. Memory is only traced
+		for the call when it is not being traced already, such as by the
+		checks, whose tracing is left running
+		:return: None
+		"""
+		was_tracing = tracemalloc.is_tracing()
+		if not was_tracing:
+			tracemalloc.start()
+		tracemalloc.reset_peak()
+		baseline, _ = tracemalloc.get_traced_memory()
+		stop = threading.Event()
+		sample = {"size": 0, "peak": 0, "statistics": []}
+
+		def sample_peak():
+			while not stop.wait(self.sample_interval):
+				current, peak = tracemalloc.get_traced_memory()
+				current, peak = current - baseline, peak - baseline
+				sample["peak"] = max(sample["peak"], peak)
+				# Snapshots are expensive, so one is only taken when the
+				# memory traced has grown by a quarter since the last one.
+				# It is reduced right away, and the peak reset after it, so
+				# that the snapshot itself is not mistaken for the solver's
+				if current > sample["size"] * 1.25:
+					sample["size"] = current
+					sample["statistics"] = self._top_statistics()
+					tracemalloc.reset_peak()
+
+		sampler = threading.Thread(target=sample_peak, daemon=True)
+		sampler.start()
+		self.profile.enable()
+		try:
+			yield
+		finally:
+			self.profile.disable()
+			stop.set()
+			sampler.join()
+			current, peak = tracemalloc.get_traced_memory()
+			current, peak = current - baseline, peak - baseline
+			peak = max(sample["peak"], peak)
+			# The allocations still alive at the end of the call may well be
+			# the largest ones seen, such as for a call that returns quickly
+			if current > sample["size"]:
+				sample["statistics"] = self._top_statistics()
+			if not was_tracing:
+				tracemalloc.stop()
+			if peak > self.peak_memory:
+				self.peak_memory = peak
+				self.peak_statistics = sample["statistics"]
+
+	def write_reports(self, directory: str, name: str) -> typing.List[str]:
+		"""
+		Writes the profiling reports, which are a pstats dump that can be
+		loaded later and a text report of the top functions by cumulative
+		time and the top lines by memory allocated at the peak
+		:param directory: The directory to write the reports in
+		:param name: The name of the reports, without an extension
+		:return: The paths of the reports written
+		"""
+		os.makedirs(directory, exist_ok=True)
+		stats_path = os.path.join(directory, f"{name}.pstats")
+		report_path = os.path.join(directory, f"{name}.txt")
+		self.profile.dump_stats(stats_path)
+
+		stream = io.StringIO()
+		stream.write("Top functions by cumulative time\n")
+		stats = pstats.Stats(self.profile, stream=stream)
+		stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+		stream.write(f"Peak memory allocated by a call: {self.peak_memory} B\n")
+		stream.write("Top lines by memory allocated at the peak\n")
+		for statistic in self.peak_statistics:
+			stream.write(f"{statistic}\n")
+		with open(report_path, "w") as report_file:
+			report_file.write(stream.getvalue())
+		return [report_path, stats_path]
@@ -0,0 +1,222 @@
+import importlib
+import json
+import os
+import re
+import typing
+
+from .bench_solver import BenchSolver
+from .bench_store import BenchStore
+
+
+class LazyModule:
+	"""
+	A proxy of a solution module that imports it on the first access to one
+	of its attributes, so that solutions can be handed out and passed around
+	without running any of their code until they are actually needed
+	"""
+	def __init__(self, module_name: str):
+		"""
+		Initializing the proxy without importing the module
+		:param module_name: The name of the module to be imported
+		"""
+		self._module_name = module_name
+		self._module = None
+
+	@property
+	def loaded(self) -> bool:
+		"""
+		Whether the module has been imported yet
+		:return: True if it has, else False
+		"""
+		return self._module is not None
+
+	def load(self):
+		"""
+		Imports the module, unless it has been imported already
+		:return: The module
+		"""
+		if self._module is None:
+			self._module = importlib.import_module(self._module_name)
+		return self._module
+
+	def __getattr__(self, name: str):
+		# Guards against recursing when the proxy is not fully initialized,
+		# such as while it is being unpickled or copied
+		if name in ("_module", "_module_name"):
+			raise AttributeError(name)
+		return getattr(self.load(), name)
+
+	def __repr__(self) -> str:
+		state = "loaded" if self.loaded else "not loaded"
+		return f"<LazyModule {self._module_name} ({state})>"
+
+
+class Registry:
+	"""
+	A manifest of the solutions in a directory, holding the path, mtime,
+	hash, declared tags and declared time complexity of each one. It is
+	persisted as a JSON file so that only the solutions whose files have
+	changed since the last scan are read again, and it hands out lazy
+	proxies of the solution modules so that solutions can be listed and
+	filtered without importing any of them
+	"""
+	def __init__(self, solutions_dir: str, path: typing.Optional[str] = None):
+		"""
+		Loads the manifest, if the file exists. The directory is not
+		scanned until the problems are asked for
+		:param solutions_dir: The directory holding the solutions, whose
+			parent directory is expected to be importable
+		:param path: The path of the JSON file holding the manifest, or
+			None to not persist it
+		"""
+		self.solutions_dir = solutions_dir
+		self.path = path
+		self.entries = {}
+		self.modules = {}
+		self.scanned = False
+		if path and os.path.isfile(path):
+			try:
+				with open(path) as manifest_file:
+					manifest = json.load(manifest_file)
+				if manifest.get("solutions_dir") == os.path.abspath(solutions_dir):
+					self.entries = manifest["entries"]
+			except (ValueError, KeyError):
+				# A corrupt manifest only means that every solution is read
+				self.entries = {}
+
+	@staticmethod
+	def declared_tags(source: str) -> typing.List[str]:
+		"""
+		Finds the tags declared in the comments of a solution, such as
+		"# Tags: arrays, hashing"
+		:param source: The source code of the solution
+		:return: The tags declared, in lower case
+		"""
+		lines = re.findall(
+			r"^#\s*tags:(.*)$", source, flags=re.IGNORECASE | re.MULTILINE
+		)
+		return [
+			tag.strip().lower() for line in lines
+			for tag in line.split(",") if tag.strip()
+		]
+
+	def file_name(self, problem: str) -> str:
+		"""
+		Identifies the file of a problem
+		:param problem: The problem, with or without the .py extension
+		:return: The path of the solution file
+		"""
+		problem_name = problem.replace(".py", "")
+		return os.path.join(self.solutions_dir, f"{problem_name}.py")
+
+	def module_name(self, problem: str) -> str:
+		"""
+		Identifies the module of a problem
+		:param problem: The problem, with or without the .py extension
+		:return: The name of the module to be imported
+		"""
+		package = os.path.basename(os.path.normpath(self.solutions_dir))
+		problem_name = problem.replace(".py", "")
+		return f"{package}.{problem_name}"
+
+	def module(self, problem: str) -> LazyModule:
+		"""
+		Hands out the module of a problem, which is only imported once one
+		of its attributes is accessed
+		:param problem: The problem, with or without the .py extension
+		:return: The lazy proxy of the module
+		"""
+		module_name = self.module_name(problem)
+		if module_name not in self.modules:
+			self.modules[module_name] = LazyModule(module_name)
+		return self.modules[module_name]
+
+	def _read_entry(self, problem: str, stat: os.stat_result) -> dict:
+		"""
+		Reads the entry of a solution from its file
+		:param problem: The problem whose solution is read
+		:param stat: The status of the solution file
+		:return: The entry of the solution
+		"""
+		file_name = self.file_name(problem)
+		with open(file_name) as source_file:
+			source = source_file.read()
+		return {
+			"path": file_name,
+			"mtime": stat.st_mtime_ns,
+			"size": stat.st_size,
+			"hash": BenchStore.hash_files([file_name]),
+			"tags": Registry.declared_tags(source),
+			"complexity": BenchSolver.declared_complexity(source),
+		}
+
+	def scan(self) -> bool:
+		"""
+		Scans the directory for solutions, reading only those that are new
+		or whose mtime or size differs from the manifest, and dropping the
+		entries of solutions that no longer exist
+		:return: True if the manifest has changed, else False
+		"""
+		entries = {}
+		changed = False
+		with os.scandir(self.solutions_dir) as directory:
+			for dir_entry in directory:
+				if not dir_entry.name.endswith(".py") or not dir_entry.is_file():
+					continue
+				stat = dir_entry.stat()
+				entry = self.entries.get(dir_entry.name)
+				if (
+					entry is None or entry["mtime"] != stat.st_mtime_ns
+					or entry["size"] != stat.st_size
+				):
+					entry = self._read_entry(dir_entry.name, stat)
+					changed = True
+				entries[dir_entry.name] = entry
+		changed |= entries.keys() != self.entries.keys()
+		self.entries = entries
+		self.scanned = True
+		return changed
+
+	def problems(self, tags: typing.Iterable[str] = ()) -> typing.List[str]:
+		"""
+		Identifies the problems for which solutions exist, scanning the
+		directory the first time they are asked for
+		:param tags: The tags that the problems must all have declared
+		:return: The sorted list of problems, as file names
+		"""
+		if not self.scanned:
+			self.scan()
+		tags = {tag.lower() for tag in tags}
+		return sorted(
+			problem for problem, entry in self.entries.items()
+			if tags.issubset(entry["tags"])
+		)
+
+	def entry(self, problem: str) -> typing.Optional[dict]:
+		"""
+		Looks up the entry of a problem
+		:param problem: The problem, with or without the .py extension
+		:return: The entry of the problem, if it exists
+		"""
+		if not self.scanned:
+			self.scan()
+		problem_name = problem.replace(".py", "")
+		return self.entries.get(f"{problem_name}.py")
+
+	def save(self):
+		"""
+		Writes the manifest back to its JSON file, if it has one
+		:return: None
+		"""
+		if not self.path:
+			return
+		directory = os.path.dirname(self.path)
+		if directory:
+			os.makedirs(directory, exist_ok=True)
+		temporary_path = f"{self.path}.tmp"
+		with open(temporary_path, "w") as manifest_file:
+			json.dump({
+				"solutions_dir": os.path.abspath(self.solutions_dir),
+				"entries": self.entries,
+			}, manifest_file, indent=1)
+		os.replace(temporary_path, self.path)
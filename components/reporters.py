@@ -0,0 +1,137 @@
+import collections
+import json
+import sys
+import xml.etree.ElementTree as ElementTree
+
+
+class JsonLinesReporter:
+	"""
+	Reports the results of checking the solutions as JSON Lines, streaming
+	one record per test case as it completes and one per problem as it
+	finishes, the latter having a "case" of None
+	"""
+	def __init__(self, path: str):
+		"""
+		Initializing the reporter
+		:param path: The path of the file to write the records to, or "-"
+			to write them to stdout
+		"""
+		self.path = path
+		self.stream = sys.stdout if path == "-" else open(path, "w")
+
+	def _write(self, record: dict):
+		"""
+		Writes a record, flushing it so that it can be consumed right away
+		:param record: The record to be written
+		:return: None
+		"""
+		self.stream.write(json.dumps(record) + "\n")
+		self.stream.flush()
+
+	def report_case(self, problem: str, record: dict):
+		"""
+		Reports the result of a test case
+		:param problem: The problem the test case belongs to
+		:param record: The record of the test case, as produced by
+			CheckSolver.iter_results
+		:return: None
+		"""
+		self._write({"problem": problem, **record})
+
+	def report_problem(self, problem: str, status: str, duration: float, message: str):
+		"""
+		Reports the result of a problem as a whole
+		:param problem: The problem
+		:param status: The status of the problem
+		:param duration: The time taken by the problem in seconds
+		:param message: A description of the result
+		:return: None
+		"""
+		self._write({
+			"problem": problem, "case": None, "status": status,
+			"duration": duration, "peak_memory": None,
+			"error": None if status == "PASSED" else message,
+		})
+
+	def close(self):
+		"""
+		Finishes the report
+		:return: None
+		"""
+		if self.stream is sys.stdout:
+			self.stream.flush()
+		else:
+			self.stream.close()
+
+
+class JUnitReporter:
+	"""
+	Reports the results of checking the solutions as JUnit XML, with one
+	test suite per problem and one test case per test case of the problem.
+	A problem that did not pass as a whole, such as one that failed to be
+	imported or that timed out after some of its test cases passed, is also
+	reported as a failing test case of its own
+	"""
+	def __init__(self, path: str):
+		"""
+		Initializing the reporter
+		:param path: The path of the XML file to write the report to
+		"""
+		self.path = path
+		self.cases = collections.defaultdict(list)
+		self.problems = {}
+
+	def report_case(self, problem: str, record: dict):
+		"""
+		Reports the result of a test case
+		:param problem: The problem the test case belongs to
+		:param record: The record of the test case, as produced by
+			CheckSolver.iter_results
+		:return: None
+		"""
+		self.cases[problem].append(record)
+
+	def report_problem(self, problem: str, status: str, duration: float, message: str):
+		"""
+		Reports the result of a problem as a whole
+		:param problem: The problem
+		:param status: The status of the problem
+		:param duration: The time taken by the problem in seconds
+		:param message: A description of the result
+		:return: None
+		"""
+		self.problems[problem] = (status, duration, message)
+
+	def close(self):
+		"""
+		Writes the report to its XML file
+		:return: None
+		"""
+		test_suites = ElementTree.Element("testsuites")
+		for problem, (status, duration, message) in self.problems.items():
+			records = list(self.cases.get(problem, []))
+			if status != "PASSED" or not records:
+				records.append({
+					"case": None, "status": status, "duration": duration,
+					"error": None if status == "PASSED" else message,
+				})
+			failures = sum(record["status"] != "PASSED" for record in records)
+			test_suite = ElementTree.SubElement(
+				test_suites, "testsuite", name=problem,
+				tests=str(len(records)), failures=str(failures),
+				time=f"{duration:.6f}"
+			)
+			for record in records:
+				name = problem if record["case"] is None else f"case {record['case']}"
+				test_case = ElementTree.SubElement(
+					test_suite, "testcase", classname=problem, name=name,
+					time=f"{record['duration']:.6f}"
+				)
+				if record["status"] != "PASSED":
+					failure = ElementTree.SubElement(
+						test_case, "failure", message=record["status"]
+					)
+					failure.text = record["error"]
+		ElementTree.ElementTree(test_suites).write(
+			self.path, encoding="utf-8", xml_declaration=True
+		)
@@ -14,3 +14,15 @@ class Solver:
 		:return: The output value for the corresponding input test case
 		"""
 		raise NotImplementedError
+
+	def solve_batch(self, input_values: list) -> list:
+		"""
+		The method which solves a batch of test cases at once. By default
+		it calls solve for each of them, but solutions can override it with
+		a vectorized implementation that amortizes the per-call overhead
+		:param input_values: The input values for each test case, each
+			expressed as a dictionary of arguments
+		:return: A list of the output values for the corresponding input
+			test cases
+		"""
+		return [self.solve(input_value) for input_value in input_values]
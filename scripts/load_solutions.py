@@ -0,0 +1,234 @@
+import argparse
+import itertools
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import typing
+
+from components import BenchSolver, Registry
+
+
+logging.basicConfig(
+	format='%(asctime)s - %(message)s',
+	datefmt='%d-%b-%y %H:%M:%S',
+	level=logging.INFO
+)
+LOGGER = logging.getLogger()
+
+
+SOLUTIONS_DIR = os.environ["SOLUTIONS_DIR"]
+REGISTRY = Registry(
+	SOLUTIONS_DIR, os.environ.get("REGISTRY", ".registry.json")
+)
+GENERATOR = "generate_input"
+MAX_TEST_CASES = 1000
+
+
+def _encode(value) -> str:
+	"""
+	Encodes a value as JSON, converting NumPy arrays and scalars to lists
+	and numbers
+	:param value: The value to be encoded
+	:raises: TypeError: When the value cannot be encoded
+	:return: The JSON encoding of the value
+	"""
+	def default(unencodable):
+		if hasattr(unencodable, "tolist"):
+			return unencodable.tolist()
+		raise TypeError(f"{type(unencodable).__name__} cannot be encoded")
+	return json.dumps(value, default=default)
+
+
+def _get_test_cases(problem: str, size: int) -> typing.List[dict]:
+	"""
+	Collects the test cases to send, which are either a single input of the
+	given size made by the input generator of the solution, or its test
+	cases whose inputs can be encoded as JSON
+	:param problem: The problem to load the test cases of
+	:param size: The size of the input to be generated, 0 to use the
+		test cases of the solution
+	:raises: ValueError: When there is no test case to send
+	:return: The test cases, with the "input" encoded as JSON and the
+		"output" decoded from JSON, or None when it is not known
+	"""
+	module = REGISTRY.module(problem)
+	if size:
+		generate_input = getattr(module, GENERATOR, None)
+		if generate_input is None:
+			raise ValueError(f"{problem} has no {GENERATOR}")
+		return [{"input": _encode(generate_input(size)), "output": None}]
+
+	test_cases = module.test_cases
+	if callable(test_cases):
+		test_cases = test_cases()
+	encoded = []
+	for test_case in itertools.islice(test_cases, MAX_TEST_CASES):
+		try:
+			encoded.append({
+				"input": _encode(test_case["input"]),
+				"output": json.loads(_encode(test_case["output"])),
+			})
+		except (TypeError, ValueError):
+			# Inputs such as streams or buffers cannot be sent as JSON
+			continue
+	if not encoded:
+		raise ValueError(f"{problem} has no test case that can be sent as JSON")
+	return encoded
+
+
+def _connect(args) -> typing.Tuple[typing.TextIO, typing.TextIO, typing.Callable]:
+	"""
+	Connects to the server listening on args.socket, or starts a server
+	reading stdin and writing stdout that serves args.problem
+	:param args: The arguments passed (args.socket, args.problem and
+		args.workers are used)
+	:return: The stream to write the requests to, the one to read the
+		responses from and the function closing the connection
+	"""
+	if args.socket:
+		client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		client.connect(args.socket)
+		writer, reader = client.makefile("w"), client.makefile("r")
+
+		def close():
+			writer.close()
+			client.shutdown(socket.SHUT_WR)
+			reader.close()
+			client.close()
+		return writer, reader, close
+
+	scripts_dir = os.path.dirname(os.path.abspath(__file__))
+	server = subprocess.Popen(
+		[
+			sys.executable, os.path.join(scripts_dir, "serve_solutions.py"),
+			"--problem", args.problem, "--workers", str(args.workers)
+		],
+		stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+	)
+
+	def close():
+		server.stdin.close()
+		server.wait()
+		server.stdout.close()
+	return server.stdin, server.stdout, close
+
+
+def load(args) -> int:
+	"""
+	Sends args.requests requests for args.problem to the server, keeping up
+	to args.concurrency of them in flight, and reports the throughput and
+	the latency percentiles observed. Responses whose output differs from
+	the one expected by the test case are counted as mismatches
+	:param args: The arguments passed (args.problem, args.size,
+		args.requests, args.concurrency, args.socket and args.workers are
+		used)
+	:return: The exit code of the run, 1 if any request failed or
+		mismatched else 0
+	"""
+	problem = f"{args.problem.replace('.py', '')}.py"
+	test_cases = _get_test_cases(problem, args.size)
+	writer, reader, close = _connect(args)
+
+	def send(request_id: int):
+		test_case = test_cases[request_id % len(test_cases)]
+		writer.write(
+			f'{{"id": {request_id}, "problem": {json.dumps(problem)}, '
+			f'"input": {test_case["input"]}}}\n'
+		)
+		writer.flush()
+
+	# A first request is answered before the clock starts, so that the time
+	# taken by the server to start its workers is left out
+	send(-1)
+	json.loads(reader.readline())
+
+	in_flight = threading.BoundedSemaphore(args.concurrency)
+	sent_at = {}
+	latencies, server_latencies, solve_times = [], [], []
+	failures = {"errors": 0, "mismatches": 0}
+
+	def receive():
+		for _ in range(args.requests):
+			response = json.loads(reader.readline())
+			# A response without a known id, such as the one to a request the
+			# server could not parse, is counted as an error
+			sent = sent_at.pop(response.get("id"), None)
+			if sent is not None:
+				latencies.append(time.perf_counter() - sent)
+				server_latencies.append(response["latency"])
+			in_flight.release()
+			if sent is None or "error" in response:
+				failures["errors"] += 1
+				if failures["errors"] == 1:
+					LOGGER.error(
+						f"Request {response.get('id')} failed\n"
+						f"{response.get('error', 'The response has no known id')}"
+					)
+				continue
+			solve_times.append(response["solve_time"])
+			expected = test_cases[response["id"] % len(test_cases)]["output"]
+			if expected is not None and response["output"] != expected:
+				failures["mismatches"] += 1
+
+	receiver = threading.Thread(target=receive, daemon=True)
+	receiver.start()
+	start = time.perf_counter()
+	for request_id in range(args.requests):
+		in_flight.acquire()
+		sent_at[request_id] = time.perf_counter()
+		send(request_id)
+	receiver.join()
+	duration = time.perf_counter() - start
+	close()
+
+	LOGGER.info(
+		f"{problem}: {args.requests} requests in {duration:.3f}s with "
+		f"{args.concurrency} in flight, {args.requests / duration:.1f} requests/s"
+	)
+	for name, values in (
+			("Round trip", latencies), ("Server", server_latencies),
+			("Solve", solve_times)
+	):
+		if not values:
+			continue
+		LOGGER.info(
+			f"  {name + ' latency:':<20} "
+			+ " ".join(
+				f"p{percent}={BenchSolver.percentile(values, percent) * 1e3:.3f}ms"
+				for percent in (50, 90, 99)
+			)
+			+ f" max={max(values) * 1e3:.3f}ms"
+		)
+	LOGGER.info(
+		f"  {failures['errors']} errors, {failures['mismatches']} mismatches"
+	)
+	return 1 if failures["errors"] or failures["mismatches"] else 0
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(
+		description="Generate load against the server of serve_solutions.py "
+					"and report its throughput and tail latency"
+	)
+	parser.add_argument("--problem", required=True,
+						help="Problem statement to send requests for")
+	parser.add_argument("--size", type=int, default=0,
+						help="Size of the input made by the input generator "
+							 "of the solution (0 sends its test cases)")
+	parser.add_argument("--requests", type=int, default=1000,
+						help="Number of requests to send")
+	parser.add_argument("--concurrency", type=int, default=16,
+						help="Number of requests in flight at once")
+	parser.add_argument("--socket", default="",
+						help="Path of the Unix socket of a running server, "
+							 "else a server reading stdin is started")
+	parser.add_argument("--workers", type=int, default=0,
+						help="Number of worker processes of the server "
+							 "started (0 uses all cores)")
+	args = parser.parse_args()
+	sys.exit(load(args))
@@ -0,0 +1,409 @@
+import argparse
+import concurrent.futures
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import socketserver
+import sys
+import threading
+import time
+import traceback
+import typing
+
+from components import Registry
+
+
+logging.basicConfig(
+	format='%(asctime)s - %(message)s',
+	datefmt='%d-%b-%y %H:%M:%S',
+	level=logging.INFO
+)
+LOGGER = logging.getLogger()
+
+
+SOLUTIONS_DIR = os.environ["SOLUTIONS_DIR"]
+REGISTRY = Registry(
+	SOLUTIONS_DIR, os.environ.get("REGISTRY", ".registry.json")
+)
+
+
+def _serve_worker(
+		solutions_dir: str, problems: typing.List[str],
+		connection: "multiprocessing.connection.Connection"
+):
+	"""
+	The entry point of a worker process, which imports the solvers of the
+	problems once and then solves the requests sent to it one at a time
+	until it is sent None. Every request is answered with an ("output",
+	output, solve time) or an ("error", traceback, solve time) message
+	:param solutions_dir: The directory holding the solutions
+	:param problems: The problems whose solvers are imported
+	:param connection: The connection to receive the requests and send the
+		responses through
+	:return: None
+	"""
+	# Anything the solutions print must not be mistaken for a response, and
+	# an interrupt is left to the server, which stops the workers once the
+	# requests in flight have been solved
+	sys.stdout = sys.stderr
+	signal.signal(signal.SIGINT, signal.SIG_IGN)
+	registry = Registry(solutions_dir)
+	solvers, errors = {}, {}
+	for problem in problems:
+		try:
+			solvers[problem] = registry.module(problem).ProblemSolver()
+		except Exception:
+			errors[problem] = traceback.format_exc()
+	connection.send(("ready", sorted(solvers), errors))
+
+	while True:
+		request = connection.recv()
+		if request is None:
+			break
+		problem, input_value = request
+		start = time.perf_counter()
+		try:
+			if problem not in solvers:
+				raise LookupError(errors.get(problem, f"{problem} is not served"))
+			output = solvers[problem].solve(input_value)
+			connection.send(("output", output, time.perf_counter() - start))
+		except Exception:
+			solve_time = time.perf_counter() - start
+			connection.send(("error", traceback.format_exc(), solve_time))
+	connection.close()
+
+
+class WorkerPool:
+	"""
+	A pool of long-lived worker processes with the solvers of the problems
+	already imported, so that many small requests can be solved without
+	paying for starting an interpreter and importing the solutions every
+	time. Each worker is fed by a thread of its own, which takes the next
+	request from a shared queue, and is restarted when it dies
+	"""
+	def __init__(self, problems: typing.List[str], workers: int):
+		"""
+		Starting the workers and waiting for them to import the solvers
+		:param problems: The problems to be served
+		:param workers: The number of worker processes
+		"""
+		self.problems = problems
+		self.context = multiprocessing.get_context("spawn")
+		self.requests = queue.Queue()
+		self.threads = []
+		# The workers are all started before waiting for any of them, so that
+		# they import the solutions at the same time
+		started = [self._start_worker() for _ in range(workers)]
+		for worker in started:
+			self._wait_ready(worker)
+			thread = threading.Thread(
+				target=self._feed_worker, args=(worker,), daemon=True
+			)
+			thread.start()
+			self.threads.append(thread)
+
+	def _start_worker(self) -> list:
+		"""
+		Starts a worker process
+		:return: The worker process and the receiving end of its connection
+		"""
+		receiver, sender = self.context.Pipe()
+		process = self.context.Process(
+			target=_serve_worker, args=(SOLUTIONS_DIR, self.problems, sender),
+			daemon=True
+		)
+		process.start()
+		sender.close()
+		return [process, receiver]
+
+	def _wait_ready(self, worker: list):
+		"""
+		Waits for a worker to import the solvers, logging the problems whose
+		solvers could not be imported
+		:param worker: The worker process and its connection
+		:return: None
+		"""
+		_, solvers, errors = worker[1].recv()
+		for problem, error in errors.items():
+			LOGGER.error(f"{problem} could not be imported\n{error}")
+		LOGGER.info(f"Worker {worker[0].pid} is serving {len(solvers)} problems")
+
+	def _restart_worker(self, worker: list) -> bool:
+		"""
+		Replaces a dead worker in place with a new one and waits for it to
+		import the solvers. When the new worker dies before it is ready, its
+		connection is left as None so that it is restarted again with the
+		next request
+		:param worker: The worker process and its connection
+		:return: True if the new worker is ready, else False
+		"""
+		if worker[1] is not None:
+			worker[1].close()
+		worker[:] = self._start_worker()
+		try:
+			self._wait_ready(worker)
+		except (EOFError, OSError):
+			worker[0].join()
+			LOGGER.error(
+				f"Worker {worker[0].pid} exited with code {worker[0].exitcode} "
+				f"before it was ready"
+			)
+			worker[1].close()
+			worker[1] = None
+			return False
+		return True
+
+	def _feed_worker(self, worker: list):
+		"""
+		Sends the requests taken from the queue to a worker one at a time and
+		resolves their futures with its responses, until None is taken
+		:param worker: The worker process and its connection, which are
+			replaced in place when the worker dies
+		:return: None
+		"""
+		while True:
+			item = self.requests.get()
+			if item is None:
+				if worker[1] is not None:
+					worker[1].send(None)
+					worker[0].join()
+				return
+			future, problem, input_value = item
+			if not future.set_running_or_notify_cancel():
+				continue
+			if worker[1] is None and not self._restart_worker(worker):
+				future.set_result({
+					"error": "The worker could not be restarted",
+					"solve_time": None,
+				})
+				continue
+			try:
+				worker[1].send((problem, input_value))
+				kind, value, solve_time = worker[1].recv()
+			except (EOFError, OSError):
+				worker[0].join()
+				future.set_result({
+					"error": f"The worker exited with code {worker[0].exitcode}",
+					"solve_time": None,
+				})
+				self._restart_worker(worker)
+				continue
+			except Exception as error:
+				# The input or the output could not be pickled
+				future.set_result({"error": repr(error), "solve_time": None})
+				continue
+			future.set_result({kind: value, "solve_time": solve_time})
+
+	def submit(self, problem: str, input_value) -> concurrent.futures.Future:
+		"""
+		Queues a request to be solved by the next free worker
+		:param problem: The problem of the request
+		:param input_value: The input value to be solved
+		:return: A future resolved with the "output" or the "error" of the
+			request, along with its "solve_time" in seconds
+		"""
+		future = concurrent.futures.Future()
+		self.requests.put((future, problem, input_value))
+		return future
+
+	def close(self):
+		"""
+		Stops the workers once the requests queued have been solved
+		:return: None
+		"""
+		for _ in self.threads:
+			self.requests.put(None)
+		for thread in self.threads:
+			thread.join()
+
+
+def _to_json(value):
+	"""
+	Converts the values that json cannot encode, such as NumPy arrays and
+	scalars, sets or custom objects
+	:param value: The value to be converted
+	:return: The converted value
+	"""
+	if hasattr(value, "tolist"):
+		return value.tolist()
+	if isinstance(value, (set, frozenset)):
+		return sorted(value, key=repr)
+	return repr(value)
+
+
+def handle_request(
+		line: str, pool: WorkerPool, respond: typing.Callable[[str], None]
+) -> typing.Optional[concurrent.futures.Future]:
+	"""
+	Parses a JSON request such as {"id": 1, "problem": ..., "input": {...}}
+	and dispatches it to the pool, responding with a JSON record holding its
+	"id", "problem", "output" or "error", "solve_time" and "latency" (the
+	seconds between the request being read and its response being written)
+	once it has been solved
+	:param line: The line holding the request
+	:param pool: The pool of workers to solve the request with
+	:param respond: The function the line holding the response is passed to
+	:return: The future of the request, or None if it was rejected outright
+	"""
+	start = time.perf_counter()
+
+	def send(record: dict):
+		record["latency"] = time.perf_counter() - start
+		try:
+			response = json.dumps(record, default=_to_json)
+		except ValueError as error:
+			response = json.dumps({
+				"id": record["id"], "problem": record["problem"],
+				"error": f"The output could not be encoded: {error}",
+				"solve_time": record["solve_time"],
+				"latency": record["latency"],
+			})
+		respond(response)
+
+	try:
+		request = json.loads(line)
+		request_id = request.get("id")
+		problem = f"{request['problem'].replace('.py', '')}.py"
+		input_value = request["input"]
+	except (ValueError, KeyError, TypeError, AttributeError) as error:
+		send({
+			"id": None, "problem": None,
+			"error": f"Invalid request: {error!r}", "solve_time": None,
+		})
+		return None
+	if problem not in pool.problems:
+		send({
+			"id": request_id, "problem": problem,
+			"error": f"{problem} is not served", "solve_time": None,
+		})
+		return None
+
+	future = pool.submit(problem, input_value)
+	future.add_done_callback(lambda done: send({
+		"id": request_id, "problem": problem, **done.result()
+	}))
+	return future
+
+
+def serve_lines(
+		lines: typing.Iterable[str], pool: WorkerPool,
+		respond: typing.Callable[[str], None]
+):
+	"""
+	Dispatches every request read from a stream of JSON lines, and waits
+	for all of them to be answered once the stream ends
+	:param lines: The lines holding the requests
+	:param pool: The pool of workers to solve the requests with
+	:param respond: The function the lines holding the responses are
+		passed to, which must be safe to call from several threads
+	:return: None
+	"""
+	pending = set()
+	for line in lines:
+		if not line.strip():
+			continue
+		future = handle_request(line, pool, respond)
+		if future is not None:
+			pending.add(future)
+		if len(pending) > 1024:
+			pending = {future for future in pending if not future.done()}
+	concurrent.futures.wait(pending)
+
+
+def _locked_writer(stream: typing.TextIO) -> typing.Callable[[str], None]:
+	"""
+	Makes a function writing lines to a stream from several threads
+	:param stream: The stream to write to
+	:return: The function writing and flushing a line
+	"""
+	lock = threading.Lock()
+
+	def write(line: str):
+		with lock:
+			stream.write(line + "\n")
+			stream.flush()
+	return write
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+	"""
+	Serves the JSON lines requests of a client connected to the socket
+	"""
+	def handle(self):
+		lock = threading.Lock()
+
+		def write(line: str):
+			with lock:
+				try:
+					self.wfile.write((line + "\n").encode())
+					self.wfile.flush()
+				except (BrokenPipeError, ConnectionResetError):
+					# The client left before all of its responses were sent
+					pass
+		serve_lines(
+			(line.decode() for line in self.rfile), self.server.pool, write
+		)
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+	daemon_threads = True
+
+
+def serve(args) -> int:
+	"""
+	Serves the requests read from stdin, answering them on stdout, or those
+	of the clients connecting to the Unix socket at args.socket
+	:param args: The arguments passed (args.problem, args.tag, args.workers
+		and args.socket are used)
+	:return: The exit code of the server, which is always 0
+	"""
+	if args.problem:
+		problems = [f"{problem.replace('.py', '')}.py" for problem in args.problem]
+	else:
+		problems = REGISTRY.problems(args.tag)
+		REGISTRY.save()
+	workers = args.workers or os.cpu_count()
+	LOGGER.info(f"Starting {workers} workers for {len(problems)} problems")
+	pool = WorkerPool(problems, workers)
+	try:
+		if not args.socket:
+			serve_lines(sys.stdin, pool, _locked_writer(sys.stdout))
+			return 0
+		if os.path.exists(args.socket):
+			os.remove(args.socket)
+		with _UnixServer(args.socket, _RequestHandler) as server:
+			server.pool = pool
+			LOGGER.info(f"Listening on {args.socket}")
+			try:
+				server.serve_forever()
+			except KeyboardInterrupt:
+				LOGGER.info("Shutting down")
+		os.remove(args.socket)
+		return 0
+	finally:
+		pool.close()
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(
+		description="Serve JSON lines requests such as {\"id\": 1, "
+					"\"problem\": ..., \"input\": {...}} with a pool of "
+					"warm workers"
+	)
+	parser.add_argument("--problem", action="append", default=[],
+						help="Problem statement to serve, which can be "
+							 "repeated (all problems by default)")
+	parser.add_argument("--tag", action="append", default=[],
+						help="Only serve the problems that declare this tag "
+							 "in a '# Tags:' comment, which can be repeated "
+							 "to require several tags")
+	parser.add_argument("--workers", type=int, default=0,
+						help="Number of worker processes (0 uses all cores)")
+	parser.add_argument("--socket", default="",
+						help="Path of a Unix socket to listen on instead of "
+							 "reading stdin and writing stdout")
+	args = parser.parse_args()
+	sys.exit(serve(args))
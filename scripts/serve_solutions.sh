@@ -0,0 +1,17 @@
+#!/usr/bin/env bash
+
+set -o errexit
+set -o pipefail
+set -o nounset
+
+
+__scripts_dir="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+__root_dir="$(cd "$(dirname "${__scripts_dir}")" && pwd)"
+
+
+export SOLUTIONS_DIR=${__root_dir}/solutions
+# The responses are written to stdout, so the setup of the environment is
+# logged to stderr
+source ${__scripts_dir}/activate_venv.sh >&2
+cd ${__root_dir}
+python ${__scripts_dir}/serve_solutions.py "$@"
@@ -1,11 +1,23 @@
 import argparse
+import ast
+import collections
 import errno
-import importlib
+import functools
 import logging
+import math
 import os
+import resource
+import signal
+import sys
+import time
+import traceback
 import typing
 
-from components import CheckSolver
+# The profiler, the reporters and multiprocessing are imported where they
+# are first needed, so that the startup of lint and check stays cheap
+from components import (
+	BenchSolver, BenchStore, CheckCache, CheckSolver, Registry
+)
 
 
 logging.basicConfig(
@@ -18,6 +30,24 @@ LOGGER = logging.getLogger()
 
 SOLUTIONS_DIR = os.environ["SOLUTIONS_DIR"]
 ATTRIBUTES = ["test_cases", "ProblemSolver"]
+BENCH_STORE = os.environ.get("BENCH_STORE", ".bench_history.json")
+CHECK_CACHE = os.environ.get("CHECK_CACHE", ".check_cache.json")
+REGISTRY = Registry(
+	SOLUTIONS_DIR, os.environ.get("REGISTRY", ".registry.json")
+)
+GENERATOR = "generate_input"
+VARIANTS = "BENCH_VARIANTS"
+LIMITS = ["TIMEOUT", "MEMORY_LIMIT"]
+SOLVER_NAMES = {"components.Solver", "components.solver.Solver"}
+PASSED = "PASSED"
+FAILED = "FAILED"
+TIMEOUT = "TIMEOUT"
+OOM = "OOM"
+
+# The function the record of every test case is passed to as it completes
+# when the results are being reported, which forwards it to the reporters
+# in this interpreter or to the parent process from a worker
+_record_sink = None
 
 
 def _get_file_and_module_name(problem: str) -> typing.Tuple[str, str]:
@@ -27,21 +57,19 @@ def _get_file_and_module_name(problem: str) -> typing.Tuple[str, str]:
 	:param problem: The problem to be parsed
 	:return: The corresponding file name and the module name to be imported
 	"""
-	problem_name = problem.replace(".py", "")
-	file_name = f"{SOLUTIONS_DIR}/{problem_name}.py"
-	module_name = f"{os.path.basename(SOLUTIONS_DIR)}.{problem_name}"
-	return file_name, module_name
+	return REGISTRY.file_name(problem), REGISTRY.module_name(problem)
 
 
-def _get_all_problems() -> typing.List[str]:
+def _get_all_problems(tags: typing.Iterable[str] = ()) -> typing.List[str]:
 	"""
-	Identifies all problems for which solutions exist
-	:return: A list of problems found
+	Identifies all problems for which solutions exist, from the registry
+	of solutions which only reads the files changed since it was last saved
+	:param tags: The tags that the problems must all have declared
+	:return: A sorted list of problems found
 	"""
-	return [
-		file_name for file_name in os.listdir(SOLUTIONS_DIR) 
-		if file_name.endswith(".py")
-	]
+	if REGISTRY.scan():
+		REGISTRY.save()
+	return REGISTRY.problems(tags)
 
 
 def lint_solution(problem: str):
@@ -58,74 +86,1137 @@ def lint_solution(problem: str):
 		raise FileNotFoundError(
 			errno.ENOENT, os.strerror(errno.ENOENT), file_name
 		)
-	module = importlib.import_module(module_name)
+	module = REGISTRY.module(problem).load()
 	for attribute in ATTRIBUTES:
 		error_message = f"{module_name} does not have {attribute}"
 		assert hasattr(module, attribute), error_message
 
 
-def check_solution(problem):
+def _get_top_level_names(tree: ast.Module) -> typing.Set[str]:
+	"""
+	Identifies the names bound at the top level of a module
+	:param tree: The syntax tree of the module
+	:return: The set of names bound
+	"""
+	names = set()
+	for node in tree.body:
+		if isinstance(node, ast.Assign):
+			targets = node.targets
+		elif isinstance(node, (ast.AnnAssign, ast.AugAssign)):
+			targets = [node.target]
+		elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef,
+							   ast.ClassDef)):
+			names.add(node.name)
+			continue
+		elif isinstance(node, (ast.Import, ast.ImportFrom)):
+			for alias in node.names:
+				names.add(alias.asname or alias.name.split(".")[0])
+			continue
+		else:
+			continue
+		for target in targets:
+			for name in ast.walk(target):
+				if isinstance(name, ast.Name):
+					names.add(name.id)
+	return names
+
+
+def _get_import_aliases(tree: ast.Module) -> typing.Dict[str, str]:
+	"""
+	Maps the names bound by the top level imports of a module to the dotted
+	names they refer to, such as Solver to components.solver.Solver
+	:param tree: The syntax tree of the module
+	:return: The dotted name of each imported name
+	"""
+	aliases = {}
+	for node in tree.body:
+		if isinstance(node, ast.Import):
+			for alias in node.names:
+				if alias.asname:
+					aliases[alias.asname] = alias.name
+				else:
+					root = alias.name.split(".")[0]
+					aliases[root] = root
+		elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+			for alias in node.names:
+				aliases[alias.asname or alias.name] = f"{node.module}.{alias.name}"
+	return aliases
+
+
+def _resolve_name(
+		node: ast.expr, aliases: typing.Dict[str, str]
+) -> typing.Optional[str]:
+	"""
+	Resolves a name or a chain of attributes, such as components.Solver,
+	to the dotted name it refers to through the imports of a module
+	:param node: The expression to be resolved
+	:param aliases: The dotted name of each imported name
+	:return: The dotted name, if the expression refers to an import
+	"""
+	if isinstance(node, ast.Name):
+		return aliases.get(node.id)
+	if isinstance(node, ast.Attribute):
+		value = _resolve_name(node.value, aliases)
+		return f"{value}.{node.attr}" if value is not None else None
+	return None
+
+
+def _is_solver_subclass(
+		class_node: ast.ClassDef, tree: ast.Module,
+		visited: typing.Optional[typing.Set[str]] = None
+) -> bool:
+	"""
+	Statically checks whether a class inherits components.Solver, either
+	directly or through other classes defined in the same module, however
+	Solver has been imported
+	:param class_node: The class to be checked
+	:param tree: The syntax tree of the module that defines the class
+	:param visited: The classes already checked, to guard against cycles
+	:return: True if it does, else False
+	"""
+	visited = visited if visited is not None else set()
+	visited.add(class_node.name)
+	aliases = _get_import_aliases(tree)
+	classes = {
+		node.name: node for node in tree.body if isinstance(node, ast.ClassDef)
+	}
+
+	for base in class_node.bases:
+		if _resolve_name(base, aliases) in SOLVER_NAMES:
+			return True
+		if (isinstance(base, ast.Name) and base.id in classes
+				and base.id not in visited
+				and _is_solver_subclass(classes[base.id], tree, visited)):
+			return True
+	return False
+
+
+def _overrides_solve(class_node: ast.ClassDef, tree: ast.Module) -> bool:
+	"""
+	Statically checks whether a class defines the solve method, either
+	itself or through other classes defined in the same module
+	:param class_node: The class to be checked
+	:param tree: The syntax tree of the module that defines the class
+	:return: True if it does, else False
+	"""
+	classes = {
+		node.name: node for node in tree.body if isinstance(node, ast.ClassDef)
+	}
+	to_visit, visited = [class_node], set()
+	while to_visit:
+		node = to_visit.pop()
+		if node.name in visited:
+			continue
+		visited.add(node.name)
+		for statement in node.body:
+			if (isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef))
+					and statement.name == "solve"):
+				return True
+		to_visit.extend(
+			classes[base.id] for base in node.bases
+			if isinstance(base, ast.Name) and base.id in classes
+		)
+	return False
+
+
+def lint_solution_static(problem: str):
+	"""
+	Acts as a lint for the given solution like lint_solution, but by parsing
+	it instead of importing it so that none of its code is run. It further
+	ensures that ProblemSolver inherits Solver and overrides solve
+	:param problem: The problem to be linted
+	:raises: FileNotFoundError: When the solution does not exist
+	:raises: SyntaxError: When the solution cannot be parsed
+	:raises: AssertionError: When the solution has been improperly written
+	:return: None
+	"""
+	file_name, module_name = _get_file_and_module_name(problem)
+	if not os.path.isfile(file_name):
+		raise FileNotFoundError(
+			errno.ENOENT, os.strerror(errno.ENOENT), file_name
+		)
+	with open(file_name) as source_file:
+		tree = ast.parse(source_file.read(), filename=file_name)
+
+	names = _get_top_level_names(tree)
+	for attribute in ATTRIBUTES:
+		error_message = f"{module_name} does not have {attribute}"
+		assert attribute in names, error_message
+
+	solver_class = next(
+		(
+			node for node in tree.body
+			if isinstance(node, ast.ClassDef) and node.name == "ProblemSolver"
+		),
+		None
+	)
+	assert solver_class is not None, f"{module_name}.ProblemSolver is not a class"
+	assert _is_solver_subclass(solver_class, tree), (
+		f"{module_name}.ProblemSolver does not inherit components.Solver"
+	)
+	assert _overrides_solve(solver_class, tree), (
+		f"{module_name}.ProblemSolver does not override solve"
+	)
+	for name, value in _get_limit_declarations(tree):
+		try:
+			_parse_limit(value)
+		except (ValueError, TypeError, SyntaxError):
+			raise AssertionError(
+				f"{module_name}.{name} is not a literal number: {ast.unparse(value)}"
+			) from None
+
+
+def _get_limit_declarations(
+		tree: ast.Module
+) -> typing.Iterator[typing.Tuple[str, ast.expr]]:
+	"""
+	Finds the module level TIMEOUT and MEMORY_LIMIT declarations of a solution
+	:param tree: The syntax tree of the solution
+	:return: A generator of the names declared and the values assigned
+	"""
+	for node in tree.body:
+		if not isinstance(node, ast.Assign):
+			continue
+		for target in node.targets:
+			if isinstance(target, ast.Name) and target.id in LIMITS:
+				yield target.id, node.value
+
+
+def _parse_limit(value: ast.expr) -> float:
+	"""
+	Evaluates the value of a limit declaration, which has to be a literal
+	number since the solution is not run to find it
+	:param value: The value assigned
+	:raises: ValueError: When the value is not a literal number
+	:return: The limit
+	"""
+	limit = ast.literal_eval(value)
+	if isinstance(limit, bool) or not isinstance(limit, (int, float)):
+		raise ValueError(f"{limit!r} is not a number")
+	return limit
+
+
+def _get_limits(problem: str, timeout: float, memory_limit: float) -> dict:
+	"""
+	Identifies the limits a problem is run under, which are the ones passed
+	unless the solution overrides them with module level TIMEOUT (seconds)
+	or MEMORY_LIMIT (MB) values. These are read by parsing the solution
+	so that they are known before it is run
+	:param problem: The problem to be run
+	:param timeout: The default time limit in seconds, 0 for no limit
+	:param memory_limit: The default memory limit in MB, 0 for no limit
+	:return: A dictionary of the TIMEOUT and MEMORY_LIMIT
+	"""
+	limits = {"TIMEOUT": timeout, "MEMORY_LIMIT": memory_limit}
+	file_name, _ = _get_file_and_module_name(problem)
+	if not os.path.isfile(file_name):
+		return limits
+	with open(file_name) as source_file:
+		try:
+			tree = ast.parse(source_file.read(), filename=file_name)
+		except SyntaxError:
+			return limits
+	for name, value in _get_limit_declarations(tree):
+		try:
+			limits[name] = _parse_limit(value)
+		except (ValueError, TypeError, SyntaxError):
+			LOGGER.warning(
+				f"{problem} declares {name} = {ast.unparse(value)}, which is not "
+				f"a literal number, so the default of {limits[name]} is used"
+			)
+	return limits
+
+
+def check_solution(
+		problem, batch_size: int = 1, case_timeout: typing.Optional[float] = None,
+		profile_dir: typing.Optional[str] = None, report: bool = False
+) -> str:
 	"""
 	Checks the behavior of the given solution for correctness
 	:param problem: The problem to be linted
+	:param batch_size: The number of test cases solved at once
+	:param case_timeout: The time limit in seconds for each test case,
+		unless the solution overrides it with a module level CASE_TIMEOUT
+	:param profile_dir: The directory to write profiling reports of the
+		solver to, or None to not profile it
+	:param report: Whether to solve the test cases one at a time, carrying
+		on past the failing ones, and pass the record of each to the
+		record sink as it completes
 	:raises: AssertionError: When the solution is incorrect
-	:return: None
+	:raises: TimeoutError: When a test case exceeds its time limit
+	:return: A description of the number of test cases checked, along with
+		the throughput when they are streamed rather than listed
 	"""
-	_, module_name = _get_file_and_module_name(problem)
-	module = importlib.import_module(module_name)
+	module = REGISTRY.module(problem)
 	test_cases = module.test_cases
-	solver = module.ProblemSolver
-	CheckSolver.check_solver(test_cases, solver())
+	solver = module.ProblemSolver()
+	if profile_dir:
+		from components import ProfileSolver
+		solver = ProfileSolver(solver)
+	case_timeout = getattr(module, "CASE_TIMEOUT", case_timeout)
+	start = time.perf_counter()
+	if report:
+		count, failures = 0, 0
+		for record in CheckSolver.iter_results(
+				test_cases, solver, case_timeout=case_timeout
+		):
+			_record_sink(problem, record)
+			count += 1
+			failures += record["status"] != PASSED
+		assert failures == 0, f"{failures} of {count} test cases did not pass"
+	else:
+		count = CheckSolver.check_solver(
+			test_cases, solver, batch_size=batch_size, case_timeout=case_timeout
+		)
+	elapsed = time.perf_counter() - start
+	if isinstance(test_cases, (list, tuple)):
+		message = f"{count} test cases"
+	else:
+		message = (
+			f"{count} streamed test cases in {elapsed:.3f}s, "
+			f"{count / max(elapsed, 1e-9):.0f} test cases/s"
+		)
+	if profile_dir:
+		report_path, _ = solver.write_reports(
+			profile_dir, problem.replace(".py", "")
+		)
+		message += f", profiled in {report_path}"
+	return message
 
 
-def lint(args):
+def lint_task(problem: str) -> str:
 	"""
-	Lints all solutions that have been written
-	:param args: The arguments passed (No arguments used)
-	:raises: FileNotFoundError: When the solution does not exist
-	:raises: AssertionError: When the solution has been improperly written
+	The unit of work run for every problem by the lint command
+	:param problem: The problem to be linted
+	:return: An empty description of the result
+	"""
+	lint_solution_static(problem)
+	return ""
+
+
+def lint_import_task(problem: str) -> str:
+	"""
+	The unit of work run for every problem by the lint command when the
+	solutions are to be imported
+	:param problem: The problem to be linted
+	:return: An empty description of the result
+	"""
+	lint_solution(problem)
+	return ""
+
+
+def check_task(
+		problem: str, batch_size: int = 1,
+		case_timeout: typing.Optional[float] = None,
+		profile_dir: typing.Optional[str] = None, report: bool = False
+) -> str:
+	"""
+	The unit of work run for every problem by the check command. The static
+	lint comes first so that malformed solutions fail before being run
+	:param problem: The problem to be checked
+	:param batch_size: The number of test cases solved at once
+	:param case_timeout: The time limit in seconds for each test case
+	:param profile_dir: The directory to write profiling reports to, if any
+	:param report: Whether to report the record of each test case
+	:return: A description of the test cases checked
+	"""
+	lint_solution_static(problem)
+	lint_solution(problem)
+	return check_solution(
+		problem, batch_size=batch_size, case_timeout=case_timeout,
+		profile_dir=profile_dir, report=report
+	)
+
+
+def _run_task(
+		task: typing.Callable, problem: str
+) -> typing.Tuple[str, str, str, float]:
+	"""
+	Runs the task for a problem, capturing any error raised so that it can be
+	reported back from a worker process instead of aborting the run
+	:param task: The task to be run, such as lint_task or check_task
+	:param problem: The problem to run the task for
+	:return: The problem, its status, either the description returned
+		by the task or the traceback if it failed and the time it took
+	"""
+	start = time.perf_counter()
+	try:
+		status, message = PASSED, task(problem)
+	except MemoryError:
+		status, message = OOM, traceback.format_exc()
+	except TimeoutError:
+		status, message = TIMEOUT, traceback.format_exc()
+	except Exception:
+		status, message = FAILED, traceback.format_exc()
+	return problem, status, message, time.perf_counter() - start
+
+
+def _run_worker(
+		task: typing.Callable, problem: str, limits: dict,
+		connection: "multiprocessing.connection.Connection"
+):
+	"""
+	The entry point of a worker process, which applies the limits to itself
+	before running the task for the problem and sending back the records
+	of its test cases as they complete followed by its result
+	:param task: The task to be run, such as lint_task or check_task
+	:param problem: The problem to run the task for
+	:param limits: The TIMEOUT (seconds) and MEMORY_LIMIT (MB) to apply
+	:param connection: The connection to send the messages through
 	:return: None
 	"""
-	for file_name in _get_all_problems():
-		LOGGER.info(f"Linting {file_name}")
-		lint_solution(file_name)
-		LOGGER.info(f"{file_name} is correctly written")
+	global _record_sink
+	_record_sink = lambda problem, record: connection.send(
+		("record", problem, record)
+	)
+	if limits["MEMORY_LIMIT"]:
+		memory_limit = int(limits["MEMORY_LIMIT"] * 1024 * 1024)
+		resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+	if limits["TIMEOUT"]:
+		# The CPU limit backs up the wall-clock limit enforced by the parent
+		cpu_limit = math.ceil(limits["TIMEOUT"])
+		resource.setrlimit(resource.RLIMIT_CPU, (cpu_limit, cpu_limit + 1))
+	connection.send(("result", _run_task(task, problem)))
+	connection.close()
+
+
+def _describe_exit(
+		problem: str, process: "multiprocessing.Process", limits: dict,
+		duration: float
+) -> typing.Tuple[str, str, str, float]:
+	"""
+	Describes the result of a worker process that exited without sending
+	back a result, for instance when it was killed for exceeding a limit
+	:param problem: The problem the worker was running
+	:param process: The worker process that exited
+	:param limits: The TIMEOUT (seconds) and MEMORY_LIMIT (MB) applied to it
+	:param duration: The time the worker ran for
+	:return: The problem, its status, a description of the exit and the
+		time the worker ran for
+	"""
+	exit_code = process.exitcode
+	if exit_code == -signal.SIGXCPU:
+		return problem, TIMEOUT, (
+			f"Exceeded the CPU time limit of {limits['TIMEOUT']:g}s"
+		), duration
+	if limits["MEMORY_LIMIT"] and exit_code in (-signal.SIGKILL, -signal.SIGSEGV):
+		return problem, OOM, (
+			f"Killed by signal {-exit_code} with a memory limit of "
+			f"{limits['MEMORY_LIMIT']:g}MB"
+		), duration
+	return problem, FAILED, f"The worker exited with code {exit_code}", duration
+
+
+def _iter_results_in_workers(
+		task: typing.Callable, problems: typing.List[str], jobs: int,
+		timeout: float, memory_limit: float,
+		on_record: typing.Optional[typing.Callable] = None
+) -> typing.Iterator[typing.Tuple[str, str, str, float]]:
+	"""
+	Runs the task for every problem in a worker process of its own, so that
+	each solution is imported in a fresh interpreter isolated from the others
+	and can be killed when it exceeds its limits, and yields the results as
+	they finish
+	:param task: The task to be run, such as lint_task or check_task
+	:param problems: The problems to run the task for
+	:param jobs: The number of worker processes run at once
+	:param timeout: The default time limit in seconds, 0 for no limit
+	:param memory_limit: The default memory limit in MB, 0 for no limit
+	:param on_record: The function the records of test cases sent back by
+		the workers are passed to, along with their problem
+	:return: An iterator over the (problem, status, message, duration)
+		results
+	"""
+	import multiprocessing.connection
+
+	context = multiprocessing.get_context("spawn")
+	pending = collections.deque(problems)
+	# The receiving end of the connection to each running worker, mapped to
+	# the worker process, its problem, its limits, its start and its deadline
+	running = {}
+	try:
+		while pending or running:
+			while pending and len(running) < jobs:
+				problem = pending.popleft()
+				limits = _get_limits(problem, timeout, memory_limit)
+				receiver, sender = context.Pipe(duplex=False)
+				process = context.Process(
+					target=_run_worker, args=(task, problem, limits, sender),
+					daemon=True
+				)
+				process.start()
+				sender.close()
+				start, deadline = time.monotonic(), None
+				if limits["TIMEOUT"]:
+					deadline = start + limits["TIMEOUT"]
+				running[receiver] = (process, problem, limits, start, deadline)
+
+			deadlines = [
+				deadline for _, _, _, _, deadline in running.values()
+				if deadline is not None
+			]
+			wait_time = None
+			if deadlines:
+				wait_time = max(min(deadlines) - time.monotonic(), 0)
+			# A worker that exits without sending a result closes its end of
+			# the connection, which also makes the receiver ready
+			for receiver in multiprocessing.connection.wait(
+					list(running), timeout=wait_time
+			):
+				process, problem, limits, start, _ = running[receiver]
+				try:
+					message = receiver.recv()
+				except EOFError:
+					process.join()
+					message = ("result", _describe_exit(
+						problem, process, limits, time.monotonic() - start
+					))
+				if message[0] == "record":
+					if on_record is not None:
+						on_record(*message[1:])
+					continue
+				del running[receiver]
+				receiver.close()
+				process.join()
+				yield message[1]
+
+			now = time.monotonic()
+			for receiver, (process, problem, limits, start, deadline) in list(
+					running.items()
+			):
+				if deadline is not None and now >= deadline:
+					process.kill()
+					process.join()
+					receiver.close()
+					del running[receiver]
+					yield problem, TIMEOUT, (
+						f"Exceeded the time limit of {limits['TIMEOUT']:g}s"
+					), now - start
+	finally:
+		# Running workers are killed when the caller stops early
+		for receiver, (process, _, _, _, _) in running.items():
+			process.kill()
+			process.join()
+			receiver.close()
+
+
+def _iter_results(
+		task: typing.Callable, problems: typing.List[str], args,
+		on_record: typing.Optional[typing.Callable] = None
+) -> typing.Iterator[typing.Tuple[str, str, str, float]]:
+	"""
+	Runs the task for every problem and yields the results as they finish.
+	The problems are run in this interpreter, unless several jobs or any
+	limits are asked for in which case each is run in a worker process
+	:param task: The task to be run, such as lint_task or check_task
+	:param problems: The problems to run the task for
+	:param args: The arguments passed (args.jobs, args.timeout and
+		args.memory_limit are used)
+	:param on_record: The function the records of test cases are passed
+		to as they complete, along with their problem
+	:return: An iterator over the (problem, status, message, duration)
+		results
+	"""
+	global _record_sink
+	jobs = args.jobs or os.cpu_count()
+	if jobs == 1 and not args.timeout and not args.memory_limit:
+		_record_sink = on_record
+		for problem in problems:
+			yield _run_task(task, problem)
+		return
+	yield from _iter_results_in_workers(
+		task, problems, jobs, args.timeout, args.memory_limit, on_record
+	)
 
 
-def check(args):
+def _run_problems(
+		task: typing.Callable, problems: typing.List[str], args,
+		cache: typing.Optional[CheckCache] = None, reporters: list = ()
+) -> int:
+	"""
+	Runs the task for every problem, streaming the result of each problem
+	as it finishes and summarizing the run at the end
+	:param task: The task to be run, such as lint_task or check_task
+	:param problems: The problems to run the task for
+	:param args: The arguments passed (args.jobs, args.timeout,
+		args.memory_limit and args.fail_fast are used, along with
+		args.case_timeout when checking)
+	:param cache: The cache of problems that passed before, whose unchanged
+		problems checked under the same limits are reported as passed
+		without being run
+	:param reporters: The reporters the results of the problems and their
+		test cases are streamed to
+	:return: The exit code of the run, 0 if all problems passed else 1
+	"""
+	def on_record(problem: str, record: dict):
+		for reporter in reporters:
+			reporter.report_case(problem, record)
+
+	passed, failed = [], []
+	keys = {}
+	to_run = []
+	for problem in problems:
+		file_name, _ = _get_file_and_module_name(problem)
+		if cache is None or not os.path.isfile(file_name):
+			to_run.append(problem)
+			continue
+		limits = _get_limits(problem, args.timeout, args.memory_limit)
+		limits["CASE_TIMEOUT"] = getattr(args, "case_timeout", None)
+		keys[problem] = cache.key(file_name, limits)
+		if cache.hit(problem, keys[problem]):
+			LOGGER.info(f"{problem} {PASSED} (cached)")
+			passed.append(problem)
+			for reporter in reporters:
+				reporter.report_problem(problem, PASSED, 0.0, "cached")
+		else:
+			to_run.append(problem)
+
+	results = _iter_results(task, to_run, args, on_record)
+	for problem, status, message, duration in results:
+		for reporter in reporters:
+			reporter.report_problem(problem, status, duration, message)
+		if status == PASSED:
+			LOGGER.info(f"{problem} {status}" + (f" ({message})" if message else ""))
+			passed.append(problem)
+			if problem in keys:
+				file_name, _ = _get_file_and_module_name(problem)
+				cache.add(problem, file_name, keys[problem])
+			continue
+		LOGGER.error(f"{problem} {status}\n{message}")
+		failed.append((problem, status))
+		if args.fail_fast:
+			results.close()
+			break
+	if cache is not None:
+		cache.save()
+	for reporter in reporters:
+		reporter.close()
+
+	statuses = collections.Counter(status for _, status in failed)
+	LOGGER.info(
+		f"Summary: {len(problems)} problems, {len(passed)} passed, "
+		f"{statuses[FAILED]} failed, {statuses[TIMEOUT]} timed out, "
+		f"{statuses[OOM]} out of memory"
+	)
+	for problem, status in failed:
+		LOGGER.info(f"Failed: {problem} ({status})")
+	return 1 if failed else 0
+
+
+def lint(args) -> int:
+	"""
+	Lints all solutions that have been written, or those with args.tag, by
+	parsing them unless args.import_modules asks for them to be imported
+	:param args: The arguments passed (args.tag, args.import_modules,
+		args.jobs, args.timeout, args.memory_limit and args.fail_fast are
+		used)
+	:return: The exit code of the run, 0 if all solutions are well written
+	"""
+	task = lint_import_task if args.import_modules else lint_task
+	return _run_problems(task, _get_all_problems(args.tag), args)
+
+
+def check(args) -> int:
 	"""
 	Checks solutions that have been written
 	:param args: The arguments passed (if args.problem is specified it only
-		checks that problem, else it checks asll)
-	:raises: AssertionError: When the solution is incorrect
-	:return: None
+		checks that problem, else it checks all those with args.tag;
+		args.batch_size,
+		args.case_timeout, args.profile, args.profile_dir, args.jsonl,
+		args.junit, args.jobs, args.timeout, args.memory_limit,
+		args.fail_fast, args.no_cache, args.cache and args.cache_max_age
+		are used as well)
+	:return: The exit code of the run, 0 if all solutions are correct
 	"""
 	if args.problem:
 		file_names = [args.problem]
 	else:
-		file_names = _get_all_problems()
+		file_names = _get_all_problems(args.tag)
+
+	# Profiling needs every solution to be run, so the cache is skipped
+	cache = None
+	if not args.no_cache and not args.profile:
+		cache = CheckCache(args.cache, max_age_days=args.cache_max_age)
+	reporters = []
+	if args.jsonl:
+		from components import JsonLinesReporter
+		reporters.append(JsonLinesReporter(args.jsonl))
+	if args.junit:
+		from components import JUnitReporter
+		reporters.append(JUnitReporter(args.junit))
+	task = functools.partial(
+		check_task, batch_size=args.batch_size, case_timeout=args.case_timeout,
+		profile_dir=args.profile_dir if args.profile else None,
+		report=bool(reporters)
+	)
+	exit_code = _run_problems(task, file_names, args, cache, reporters)
+	if exit_code == 0:
+		LOGGER.info("All solutions are correct")
+	return exit_code
+
+
+def list_problems(args) -> int:
+	"""
+	Lists the solutions that have been written, or those with args.tag,
+	along with their declared tags and time complexity, without importing
+	any of them
+	:param args: The arguments passed (args.tag is used)
+	:return: The exit code of the run, which is always 0
+	"""
+	for problem in _get_all_problems(args.tag):
+		entry = REGISTRY.entry(problem)
+		complexity = f"O({entry['complexity']})" if entry["complexity"] else "-"
+		print(f"{problem}\t{complexity}\t{', '.join(entry['tags'])}")
+	return 0
+
+
+def _get_bench_inputs(
+		problem: str
+) -> typing.List[typing.Tuple[str, typing.Callable]]:
+	"""
+	Identifies the input generators a solution is benchmarked with, which is
+	its generate_input, or one per variant of the solution when it lists
+	them in a module level BENCH_VARIANTS, each being passed to
+	generate_input as its variant argument. The results of each variant are
+	recorded under a name of their own, such as "problem.py[variant]", so
+	that the variants keep baselines of their own
+	:param problem: The problem to be benchmarked
+	:return: The names to record the results under along with their input
+		generators, which is empty if the solution has no input generator
+	"""
+	module = REGISTRY.module(problem)
+	generate_input = getattr(module, GENERATOR, None)
+	if generate_input is None:
+		LOGGER.info(f"Skipping {problem} as it has no {GENERATOR}")
+		return []
+	# The results are recorded under the file name of the solution, whether
+	# or not the problem was passed with its extension
+	name = f"{problem.replace('.py', '')}.py"
+	variants = getattr(module, VARIANTS, None)
+	if not variants:
+		return [(name, generate_input)]
+	return [
+		(f"{name}[{variant}]", functools.partial(generate_input, variant=variant))
+		for variant in variants
+	]
 
-	for file_name in file_names:
-		LOGGER.info(f"Checking {file_name}")
-		lint_solution(file_name)
-		check_solution(file_name)
-		LOGGER.info(f"{file_name} is correct")
-	LOGGER.info("All solutions are correct")
+
+def _bench_problem(
+		problem: str, name: str, generate_input: typing.Callable, args
+) -> typing.List[dict]:
+	"""
+	Times the given solution over a sweep of input sizes, logging the
+	timing statistics of each size
+	:param problem: The problem to be benchmarked
+	:param name: The name the results are logged and recorded under
+	:param generate_input: The input generator of the solution
+	:param args: The arguments passed (args.sizes, args.repeat and
+		args.warmup are used)
+	:return: The benchmark results for each size
+	"""
+	LOGGER.info(f"Benchmarking {name}")
+	results = BenchSolver.bench_solver(
+		generate_input, REGISTRY.module(problem).ProblemSolver(), args.sizes,
+		repeat=args.repeat, warmup=args.warmup
+	)
+	for result in results:
+		LOGGER.info(
+			f"  N={result['size']:<10} min={result['min']:.6f}s "
+			f"median={result['median']:.6f}s p95={result['p95']:.6f}s "
+			f"peak={result['peak_memory']}B"
+		)
+	return results
+
+
+def bench_solution(problem: str, args, store: BenchStore) -> int:
+	"""
+	Benchmarks the given solution over a sweep of input sizes, records the
+	results and compares the fitted complexity exponent against the one
+	claimed in its comments, for each of its variants if it has several
+	:param problem: The problem to be benchmarked
+	:param args: The arguments passed (args.sizes, args.repeat, args.warmup
+		and args.tolerance are used)
+	:param store: The store to record the benchmark results in
+	:return: 1 if the measured complexity is worse than claimed, else 0
+	"""
+	file_name, _ = _get_file_and_module_name(problem)
+	with open(file_name) as source_file:
+		complexity = BenchSolver.declared_complexity(source_file.read())
+	exit_code = 0
+	for name, generate_input in _get_bench_inputs(problem):
+		results = _bench_problem(problem, name, generate_input, args)
+		store.add(name, BenchStore.hash_files([file_name]), results)
+		try:
+			exponent = BenchSolver.fit_exponent(
+				[result["size"] for result in results],
+				[result["median"] for result in results]
+			)
+		except ValueError as error:
+			LOGGER.info(f"  Fitted exponent: unavailable ({error})")
+			continue
+		if complexity is None:
+			LOGGER.info(f"  Fitted exponent: {exponent:.2f} (nothing declared)")
+			continue
+		declared_exponent = BenchSolver.complexity_exponent(complexity)
+		LOGGER.info(f"  Fitted exponent: {exponent:.2f} (declared O({complexity}))")
+		if declared_exponent is not None and exponent > declared_exponent + args.tolerance:
+			LOGGER.warning(
+				f"  {name} scales worse than its declared O({complexity})"
+			)
+			exit_code = 1
+	return exit_code
+
+
+def compare_solution(problem: str, args, store: BenchStore) -> int:
+	"""
+	Benchmarks the given solution and compares the results against the
+	baseline recorded for it by the bench command, for each of its variants
+	if it has several
+	:param problem: The problem to be compared
+	:param args: The arguments passed (args.sizes, args.repeat, args.warmup,
+		args.time_threshold and args.memory_threshold are used)
+	:param store: The store holding the baseline results
+	:return: 1 if the solution has regressed, else 0
+	"""
+	file_name, _ = _get_file_and_module_name(problem)
+	exit_code = 0
+	for name, generate_input in _get_bench_inputs(problem):
+		baseline = store.baseline(name)
+		if baseline is None:
+			LOGGER.info(f"Skipping {name} as it has no baseline")
+			continue
+		results = _bench_problem(problem, name, generate_input, args)
+		if BenchStore.hash_files([file_name]) != baseline["file_hash"]:
+			LOGGER.info(f"  {name} has changed since {baseline['timestamp']}")
+		regressions = BenchStore.compare(
+			baseline["results"], results,
+			args.time_threshold, args.memory_threshold
+		)
+		missing = BenchStore.missing_sizes(baseline["results"], results)
+		if missing:
+			LOGGER.warning(
+				f"  {name} has no baseline for N={', '.join(map(str, missing))}, "
+				f"which was not compared"
+			)
+		for regression in regressions:
+			LOGGER.warning(f"  {name} regressed: {regression}")
+		exit_code |= 1 if regressions else 0
+	return exit_code
+
+
+def _get_problems(args) -> typing.List[str]:
+	"""
+	Identifies the problems to be benchmarked or profiled
+	:param args: The arguments passed (if args.problem is specified it only
+		returns that problem, else it returns all those with args.tag)
+	:return: A list of problems
+	"""
+	if args.problem:
+		return [args.problem]
+	return _get_all_problems(args.tag)
+
+
+def bench(args) -> int:
+	"""
+	Benchmarks the solutions that provide an input generator and records
+	the results as the baseline for the compare command
+	:param args: The arguments passed (if args.problem is specified it only
+		benchmarks that problem, else it benchmarks all; args.store is used)
+	:return: The exit code of the run, 1 if any solution scales worse
+		than its declared complexity else 0
+	"""
+	store = BenchStore(args.store)
+	exit_code = 0
+	for file_name in _get_problems(args):
+		exit_code |= bench_solution(file_name, args, store)
+	store.save()
+	return exit_code
+
+
+def compare(args) -> int:
+	"""
+	Benchmarks the solutions that provide an input generator and compares
+	them against the baselines recorded by the bench command
+	:param args: The arguments passed (if args.problem is specified it only
+		compares that problem, else it compares all; args.store is used)
+	:return: The exit code of the run, 1 if any solution has regressed
+		beyond the thresholds else 0
+	"""
+	store = BenchStore(args.store)
+	exit_code = 0
+	for file_name in _get_problems(args):
+		exit_code |= compare_solution(file_name, args, store)
+	if exit_code == 0:
+		LOGGER.info("No solution has regressed")
+	return exit_code
+
+
+def _log_import_profile(name: str, profile: dict, top: int):
+	"""
+	Logs the cost of importing a module along with its costliest direct
+	dependencies
+	:param name: The name to log the module under
+	:param profile: The profile of the module, as made by ImportProfiler
+	:param top: The number of dependencies to log
+	:return: None
+	"""
+	LOGGER.info(
+		f"{name}: total={profile['total'] * 1e3:.1f}ms "
+		f"imports={profile['imports'] * 1e3:.1f}ms "
+		f"execution={profile['execution'] * 1e3:.1f}ms"
+	)
+	dependencies = sorted(
+		profile["dependencies"], key=lambda dependency: -dependency["cumulative"]
+	)
+	for dependency in dependencies[:top]:
+		LOGGER.info(
+			f"  {dependency['name']:<30} {dependency['kind']:<12} "
+			f"{dependency['cumulative'] * 1e3:.1f}ms"
+		)
+
+
+def importtime_solution(
+		problem: str, args, profiler: "ImportProfiler",
+		third_party: typing.Dict[str, typing.List[float]]
+) -> int:
+	"""
+	Measures the cost of importing the given solution in a fresh
+	interpreter and flags the heavy dependencies it imports but never uses
+	:param problem: The problem to be profiled
+	:param args: The arguments passed (args.repeat, args.top and
+		args.heavy_threshold are used)
+	:param profiler: The profiler to import the solution with
+	:param third_party: The costs of the third-party packages imported so
+		far, to which the ones imported by this solution are added
+	:return: 1 if the solution fails to be imported or imports a heavy
+		dependency that it never uses, else 0
+	"""
+	file_name, module_name = _get_file_and_module_name(problem)
+	try:
+		profile = profiler.profile(module_name, repeat=args.repeat)
+	except ImportError as error:
+		LOGGER.error(f"{problem} {FAILED}\n{error}")
+		return 1
+	_log_import_profile(problem, profile, args.top)
+	for package, cost in profile["packages"].items():
+		if profiler.classify(package) == "third-party":
+			third_party[package].append(cost)
+
+	with open(file_name) as source_file:
+		unused_imports = profiler.unused_imports(source_file.read())
+	exit_code = 0
+	for imported_module in sorted(set(unused_imports.values())):
+		cost = profile["packages"].get(imported_module.split(".")[0], 0.0)
+		if cost * 1e3 >= args.heavy_threshold:
+			LOGGER.warning(
+				f"  {problem} imports {imported_module} ({cost * 1e3:.1f}ms) "
+				f"but never uses it"
+			)
+			exit_code = 1
+	return exit_code
+
+
+def importtime(args) -> int:
+	"""
+	Reports the cost of importing the components package, which the runner
+	and every solution import, and of importing each solution, broken down
+	into the time spent on imports and on module level execution, followed
+	by the cost of every third-party package imported by the solutions
+	:param args: The arguments passed (if args.problem is specified it only
+		profiles that problem, else it profiles all those with args.tag;
+		args.repeat, args.top and args.heavy_threshold are used as well)
+	:return: The exit code of the run, 1 if any solution fails to be
+		imported or imports a heavy dependency that it never uses else 0
+	"""
+	from components import ImportProfiler
+
+	package = os.path.basename(os.path.normpath(SOLUTIONS_DIR))
+	profiler = ImportProfiler(
+		paths=[os.path.dirname(os.path.abspath(SOLUTIONS_DIR))],
+		first_party=["components", package]
+	)
+	_log_import_profile(
+		"components", profiler.profile("components", repeat=args.repeat),
+		args.top
+	)
+	third_party = collections.defaultdict(list)
+	exit_code = 0
+	for problem in _get_problems(args):
+		exit_code |= importtime_solution(problem, args, profiler, third_party)
+
+	LOGGER.info("Third-party packages by import time:")
+	for package, costs in sorted(
+			third_party.items(), key=lambda item: -max(item[1])
+	):
+		LOGGER.info(
+			f"  {package:<30} {max(costs) * 1e3:.1f}ms, imported by "
+			f"{len(costs)} solutions"
+		)
+	return exit_code
+
+
+def _parse_sizes(sizes: str) -> typing.List[int]:
+	"""
+	Parses a comma separated list of input sizes, such as "1e2,1e3,1e4"
+	:param sizes: The sizes to be parsed
+	:return: The list of sizes
+	"""
+	return [int(float(size)) for size in sizes.split(",")]
+
+
+def _add_tag_argument(parser: argparse.ArgumentParser):
+	"""
+	Adds the argument selecting problems by their declared tags to a
+	sub-parser
+	:param parser: The sub-parser to add the argument to
+	:return: None
+	"""
+	parser.add_argument("--tag", action="append", default=[],
+						help="Only select the problems that declare this tag "
+							 "in a '# Tags:' comment, which can be repeated "
+							 "to require several tags")
+
+
+def _add_bench_arguments(parser: argparse.ArgumentParser):
+	"""
+	Adds the arguments controlling how problems are benchmarked to a
+	sub-parser
+	:param parser: The sub-parser to add the arguments to
+	:return: None
+	"""
+	parser.add_argument("--problem", required=False, default="",
+						help="Problem statement to benchmark")
+	_add_tag_argument(parser)
+	parser.add_argument("--sizes", type=_parse_sizes,
+						default="1e2,1e3,1e4,1e5",
+						help="Comma separated input sizes to sweep over")
+	parser.add_argument("--repeat", type=int, default=5,
+						help="Number of timed runs per size")
+	parser.add_argument("--warmup", type=int, default=1,
+						help="Number of untimed runs per size")
+	parser.add_argument("--store", default=BENCH_STORE,
+						help="JSON file holding the history of benchmarks")
+
+
+def _add_run_arguments(parser: argparse.ArgumentParser):
+	"""
+	Adds the arguments controlling how problems are run to a sub-parser
+	:param parser: The sub-parser to add the arguments to
+	:return: None
+	"""
+	parser.add_argument("--jobs", type=int, default=1,
+						help="Number of worker processes, each problem is "
+							 "imported in its own process (0 uses all cores)")
+	parser.add_argument("--fail-fast", action="store_true",
+						help="Stop at the first problem that fails")
+	parser.add_argument("--timeout", type=float, default=0,
+						help="Time limit in seconds for each problem, which "
+							 "solutions can override with a module level "
+							 "TIMEOUT (0 for no limit)")
+	parser.add_argument("--memory-limit", type=float, default=0,
+						help="Address space limit in MB for each problem, "
+							 "which solutions can override with a module "
+							 "level MEMORY_LIMIT (0 for no limit)")
 
 
 if __name__ == "__main__":
 	parser = argparse.ArgumentParser()
 	subparsers = parser.add_subparsers()
 
+	# List problems
+	list_parser = subparsers.add_parser(
+		'list', help='List problems without importing them'
+	)
+	_add_tag_argument(list_parser)
+	list_parser.set_defaults(func=list_problems)
+
 	# Lint problems
 	lint_parser = subparsers.add_parser('lint', help='Lint all problems')
+	_add_tag_argument(lint_parser)
+	_add_run_arguments(lint_parser)
+	lint_parser.add_argument("--import", dest="import_modules",
+							 action="store_true",
+							 help="Import the solutions instead of parsing "
+								  "them, which runs their module level code")
 	lint_parser.set_defaults(func=lint)
 
 	# Check problems
 	check_parser = subparsers.add_parser('check', help='Check all problems')
 	check_parser.add_argument("--problem", required=False, default="",
 						      help="Problem statement to check")
+	_add_tag_argument(check_parser)
+	_add_run_arguments(check_parser)
+	check_parser.add_argument("--batch-size", type=int, default=64,
+							  help="Number of test cases passed to "
+								   "solve_batch at once")
+	check_parser.add_argument("--case-timeout", type=float, default=None,
+							  help="Time limit in seconds for each test "
+								   "case, which solutions can override with "
+								   "a module level CASE_TIMEOUT")
+	check_parser.add_argument("--profile", action="store_true",
+							  help="Profile the solvers with cProfile and "
+								   "tracemalloc while checking them")
+	check_parser.add_argument("--profile-dir", default="profiles",
+							  help="Directory to write the profiling "
+								   "reports to")
+	check_parser.add_argument("--jsonl", default="",
+							  help="File to stream a JSON record of each "
+								   "test case to as it completes ('-' for "
+								   "stdout)")
+	check_parser.add_argument("--junit", default="",
+							  help="File to write a JUnit XML report to")
+	check_parser.add_argument("--no-cache", action="store_true",
+							  help="Check every problem, even the unchanged "
+								   "ones that passed before")
+	check_parser.add_argument("--cache", default=CHECK_CACHE,
+							  help="JSON file caching the problems that passed")
+	check_parser.add_argument("--cache-max-age", type=float, default=30,
+							  help="Days after which unused cache entries "
+								   "are pruned")
 	check_parser.set_defaults(func=check)
 
+	# Benchmark problems
+	bench_parser = subparsers.add_parser(
+		'bench', help='Benchmark problems over a sweep of input sizes'
+	)
+	_add_bench_arguments(bench_parser)
+	bench_parser.add_argument("--tolerance", type=float, default=0.3,
+							  help="Allowed excess of the fitted exponent "
+								   "over the declared one")
+	bench_parser.set_defaults(func=bench)
+
+	# Compare problems against their benchmark baselines
+	compare_parser = subparsers.add_parser(
+		'compare', help='Fail when problems regress against their baseline'
+	)
+	_add_bench_arguments(compare_parser)
+	compare_parser.add_argument("--time-threshold", type=float, default=0.1,
+								help="Allowed relative increase of the "
+									 "fastest time over the p95 of the "
+									 "baseline")
+	compare_parser.add_argument("--memory-threshold", type=float, default=0.1,
+								help="Allowed relative increase of the "
+									 "peak memory")
+	compare_parser.set_defaults(func=compare)
+
+	# Profile the imports of problems
+	importtime_parser = subparsers.add_parser(
+		'importtime', help='Report the cost of importing every problem'
+	)
+	importtime_parser.add_argument("--problem", required=False, default="",
+								   help="Problem statement to profile")
+	_add_tag_argument(importtime_parser)
+	importtime_parser.add_argument("--repeat", type=int, default=3,
+								   help="Number of imports per problem, of "
+										"which the fastest is reported")
+	importtime_parser.add_argument("--top", type=int, default=5,
+								   help="Number of direct dependencies "
+										"reported per problem")
+	importtime_parser.add_argument("--heavy-threshold", type=float,
+								   default=10,
+								   help="Import time in ms above which an "
+										"unused dependency is flagged")
+	importtime_parser.set_defaults(func=importtime)
+
 	args = parser.parse_args()
-	args.func(args)
+	sys.exit(args.func(args))
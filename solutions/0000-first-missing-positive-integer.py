@@ -4,20 +4,60 @@
 # You can modify the input array in-place.
 # Example: The array [3, 4, -1, 1] should give 2 and the array
 # [1, 2, 0] should give 3.
+# Tags: arrays, hashing
 
-# Approach:
-# We begin by removing negative numbers in-place and then finding
-# the minimum of the array. 
+# Approach #1:
+# We begin by removing the numbers that are not positive.
 # After that we turn the array into a set to reduce the time complexity
 # of checking whether a number exists in the input array to O(1).
-# Finally, we start with the min_val + 1 and check whether it exists
-# in the set. If so, we check for min_value + 2, min_value + 3 and so on
-# until we finally arrive at a number that does not exist.
+# Finally, we start with 1 and check whether it exists in the set.
+# If so, we check for 2, 3 and so on until we finally arrive at a
+# number that does not exist.
 # This number is the first positive hole to be returned.
 # The time complexity of this approach is O(N) because we need to perform
 # at most as many look ups as elements in an array in the worst case
 # scenario which occurs when the array is of the form [1, 2, ..., N]
-# i.e. when it has no holes at all.
+# i.e. when it has no holes at all. The set takes up O(N) space though.
+
+# Approach #2:
+# The answer for an array of length N is at most N+1, so only the values
+# 1..N matter, and the array itself has exactly as many slots to record them
+# in. We go over the array and keep swapping each value v in 1..N into its
+# own slot at index v-1, unless that slot already holds v. Every swap puts
+# one more value into its own slot, so there are at most N swaps in total.
+# The first slot at index i that does not hold i+1 then gives the answer,
+# or N+1 if every slot does.
+# Time Complexity: O(N) and Space Complexity: O(1)
+
+# For arrays that are too large to fit into memory, such as binary dumps of
+# integers, approach #1 is adapted to scan the dump in fixed-size chunks
+# through a memory map. Rather than a set, it marks the values 1..N that
+# are seen in a bitmap of N+1 bits, whose first unmarked bit gives the
+# answer. This takes O(N) time and N/8 bytes besides a chunk.
+
+# When the array keeps changing and the question is asked again after every
+# change, the values are kept as a multiset along with a hierarchical bitset
+# over the values 1..C, for a capacity C that is a power of 64. The bottom
+# level has a bit per value, set while the value is present, and each level
+# above has a bit per word of the level below, set while that word is full.
+# The first missing positive integer is found by descending from the single
+# word at the top, each time into the first word that is not full, and a
+# value is added or removed by updating the words on its path. As there are
+# log64(C) levels, every operation is O(logN) with a base of 64. The answer
+# is at most one more than the number of distinct positive values, so the
+# capacity is grown whenever they outnumber it, which is amortized O(1).
+
+# To solve a batch of arrays at once with NumPy, we lay out a bitmap with
+# one segment of length N+1 per array of length N. Since the answer for an
+# array of length N is at most N+1, only the values 1..N need to be marked.
+# The first unmarked slot of each segment then gives its answer, and all
+# of them can be found with a single binary search over the unmarked slots.
+
+import mmap
+import os
+import random
+import struct
+import typing
 
 from components import Solver
 
@@ -34,9 +74,64 @@ test_cases = [
 			"array": [1, 2, 0]
 		},
 		"output": 3
+	},
+	{
+		"input": {
+			"array": [7, 2, 3]
+		},
+		"output": 1
+	},
+	{
+		"input": {
+			"array": [1, 1, 2, 2, 4]
+		},
+		"output": 3
+	},
+	{
+		"input": {
+			"buffer": struct.pack("<6q", 3, 4, -1, 1, 2, 6)
+		},
+		"output": 5
+	},
+	{
+		"input": {
+			"values": [3, 4, -1, 1, 1],
+			"operations": [
+				["mex", None], ["add", 2], ["mex", None], ["remove", 1],
+				["mex", None], ["remove", 1], ["mex", None], ["add", 1],
+				["add", 5], ["mex", None], ["remove", 3], ["mex", None]
+			]
+		},
+		"output": [2, 5, 5, 1, 6, 3]
+	},
+	{
+		"input": {
+			"values": list(range(1, 70)),
+			"operations": [
+				["mex", None], ["remove", 10], ["mex", None], ["add", 10],
+				["add", 70], ["mex", None]
+			]
+		},
+		"output": [70, 10, 71]
 	}
 ]
 
+
+def generate_input(size: int) -> dict:
+	"""
+	Generates the input for a test case of a given size to benchmark with,
+	a shuffled permutation of 1..size with a few values knocked out
+	:param size: The number of elements in the array
+	:return: The input arguments of the test case
+	"""
+	rng = random.Random(size)
+	array = list(range(1, size + 1))
+	for idx in rng.sample(range(size), max(size // 100, 1)):
+		array[idx] = -array[idx]
+	rng.shuffle(array)
+	return {"array": array}
+
+
 def first_missing_positive_integer(array: list[int]) -> int:
 	"""
 	Returns the first missing positive integer for a given array
@@ -44,25 +139,262 @@ def first_missing_positive_integer(array: list[int]) -> int:
 	:param array: The input array
 	:return: The first missing positive integer
 	"""
-	# Remove negative numbers and identify the minimum value
-	array = [val for val in array if val >= 0]
-	min_val = min(array)
+	# Remove the numbers that are not positive
+	array = [val for val in array if val > 0]
 
-	# Turn it into a set in constant memory
+	# Turn it into a set
 	array_set = set()
 	while len(array) > 0:
 		val = array.pop()
 		array_set.add(val)
 	
-	# Identify the hole by looking up elements starting from
-	# the minimum value
-	hole = min_val + 1
+	# Identify the hole by looking up elements starting from 1
+	hole = 1
 	while hole in array_set:
 		hole += 1
 
 	return hole
 
 
+def first_missing_positive_integer_in_place(array: list[int]) -> int:
+	"""
+	Returns the first missing positive integer for a given array with
+	constant extra space, by swapping its values into place as described in
+	approach #2. The array is modified in-place
+	:param array: The input array
+	:return: The first missing positive integer
+	"""
+	length = len(array)
+	for idx in range(length):
+		# Swap the value into its own slot until the slot holds a value that
+		# is out of range or that is already in its own slot
+		val = array[idx]
+		while 1 <= val <= length and array[val - 1] != val:
+			array[idx], array[val - 1] = array[val - 1], val
+			val = array[idx]
+	for idx in range(length):
+		if array[idx] != idx + 1:
+			return idx + 1
+	return length + 1
+
+
+def first_missing_positive_integer_file(
+		source: typing.Union[str, os.PathLike, bytes, mmap.mmap],
+		dtype: str = "<i8", chunk_size: int = 1 << 20
+) -> int:
+	"""
+	Returns the first missing positive integer for a binary dump of integers
+	by scanning it in chunks and marking the values seen in a bitmap
+	:param source: The path of the file holding the dump, which is memory
+		mapped, or a buffer holding it
+	:param dtype: The NumPy dtype of the integers in the dump
+	:param chunk_size: The number of integers to scan at once
+	:return: The first missing positive integer
+	"""
+	import numpy as np
+	if isinstance(source, (str, os.PathLike)):
+		if os.path.getsize(source) == 0:
+			return 1
+		array = np.memmap(source, dtype=dtype, mode="r")
+	else:
+		array = np.frombuffer(source, dtype=dtype)
+	length = len(array)
+
+	# The bit for the value v is bit (v-1)%8 of byte (v-1)//8, and the bit
+	# for N+1 is never marked, so that there is always an unmarked bit
+	bitmap = np.zeros(length // 8 + 1, dtype=np.uint8)
+	for start in range(0, length, chunk_size):
+		chunk = np.asarray(array[start:start + chunk_size])
+		offsets = chunk[(chunk >= 1) & (chunk <= length)].astype(np.int64) - 1
+		np.bitwise_or.at(
+			bitmap, offsets >> 3, np.left_shift(1, offsets & 7).astype(np.uint8)
+		)
+
+	# The first byte with an unmarked bit holds the answer
+	byte_idx = int(np.flatnonzero(bitmap != 0xFF)[0])
+	bits = np.unpackbits(bitmap[byte_idx:byte_idx + 1], bitorder="little")
+	return byte_idx * 8 + int(np.flatnonzero(bits == 0)[0]) + 1
+
+
+def first_missing_positive_integer_batch(arrays: list[list[int]]) -> list[int]:
+	"""
+	Returns the first missing positive integer for each of the given arrays
+	using the vectorized bitmap described above
+	:param arrays: The input arrays
+	:return: The first missing positive integer of each array
+	"""
+	if len(arrays) == 0:
+		return []
+	import numpy as np
+	lengths = np.array([len(array) for array in arrays], dtype=np.int64)
+	values = np.concatenate(
+		[np.asarray(array, dtype=np.int64) for array in arrays]
+	)
+	# Each array owns the segment of the bitmap that starts at starts[i]
+	starts = np.concatenate(([0], np.cumsum(lengths + 1)[:-1]))
+	case_ids = np.repeat(np.arange(len(arrays)), lengths)
+
+	present = np.zeros(int(np.sum(lengths + 1)), dtype=bool)
+	in_range = (values >= 1) & (values <= lengths[case_ids])
+	present[starts[case_ids[in_range]] + values[in_range] - 1] = True
+
+	# The last slot of every segment is never marked, so each of them
+	# is guaranteed to contain an unmarked slot
+	unmarked = np.flatnonzero(~present)
+	first_unmarked = unmarked[np.searchsorted(unmarked, starts)]
+	return (first_unmarked - starts + 1).tolist()
+
+
+class MexMultiset:
+	"""
+	A multiset of integers that finds its first missing positive integer
+	with the hierarchical bitset described above
+	"""
+	# The number of bits in a word of the bitset, and a word with all set
+	WORD_BITS = 64
+	FULL_WORD = (1 << 64) - 1
+
+	def __init__(self, values: typing.Iterable[int] = ()):
+		"""
+		Initializing the multiset
+		:param values: The values to be added to the multiset
+		"""
+		# The multiplicity of every value in the multiset
+		self.counts = {}
+		self.length = 0
+		self.distinct_positives = 0
+		self.build(self.WORD_BITS)
+		for val in values:
+			self.add(val)
+
+	def build(self, capacity: int):
+		"""
+		Builds the bitset for a given capacity from the values present
+		:param capacity: The capacity, a power of WORD_BITS
+		:return: None
+		"""
+		self.capacity = capacity
+		# The levels of the bitset from the bottom up, the top being one word
+		self.levels = []
+		words = capacity // self.WORD_BITS
+		while True:
+			self.levels.append([0] * words)
+			if words == 1:
+				break
+			words //= self.WORD_BITS
+		for val in self.counts:
+			if 1 <= val <= capacity:
+				self.mark(val - 1)
+
+	def mark(self, idx: int):
+		"""
+		Sets the bit at a given index of the bottom level, along with the bits
+		of the words above it that become full
+		:param idx: The index of the bit
+		:return: None
+		"""
+		for words in self.levels:
+			word_idx = idx // self.WORD_BITS
+			words[word_idx] |= 1 << (idx % self.WORD_BITS)
+			if words[word_idx] != self.FULL_WORD:
+				break
+			idx = word_idx
+
+	def unmark(self, idx: int):
+		"""
+		Clears the bit at a given index of the bottom level, along with the
+		bits of the words above it that are no longer full
+		:param idx: The index of the bit
+		:return: None
+		"""
+		for words in self.levels:
+			word_idx = idx // self.WORD_BITS
+			was_full = words[word_idx] == self.FULL_WORD
+			words[word_idx] &= ~(1 << (idx % self.WORD_BITS))
+			if not was_full:
+				break
+			idx = word_idx
+
+	def __len__(self) -> int:
+		return self.length
+
+	def __contains__(self, val: int) -> bool:
+		return val in self.counts
+
+	def add(self, val: int):
+		"""
+		Adds a value to the multiset
+		:param val: The value to be added
+		:return: None
+		"""
+		count = self.counts.get(val, 0)
+		self.counts[val] = count + 1
+		self.length += 1
+		if count > 0 or val <= 0:
+			return
+		self.distinct_positives += 1
+		if self.distinct_positives > self.capacity:
+			self.build(self.capacity * self.WORD_BITS)
+		elif val <= self.capacity:
+			self.mark(val - 1)
+
+	def remove(self, val: int):
+		"""
+		Removes one occurrence of a value from the multiset
+		:param val: The value to be removed
+		:raises: KeyError: When the value is not in the multiset
+		:return: None
+		"""
+		count = self.counts[val]
+		self.length -= 1
+		if count > 1:
+			self.counts[val] = count - 1
+			return
+		del self.counts[val]
+		if val > 0:
+			self.distinct_positives -= 1
+			if val <= self.capacity:
+				self.unmark(val - 1)
+
+	def mex(self) -> int:
+		"""
+		Returns the first missing positive integer of the multiset
+		:return: The first missing positive integer
+		"""
+		if self.levels[-1][0] == self.FULL_WORD:
+			return self.capacity + 1
+		idx = 0
+		for words in reversed(self.levels):
+			word = words[idx]
+			# The lowest bit that is not set in the word
+			idx = idx * self.WORD_BITS + ((~word & (word + 1)).bit_length() - 1)
+		return idx + 1
+
+
 class ProblemSolver(Solver):
 	def solve(self, input_value: dict):
-		return first_missing_positive_integer(input_value["array"])
\ No newline at end of file
+		if "operations" in input_value:
+			# Applies the operations to the multiset in order, answering
+			# every query for its first missing positive integer
+			multiset = MexMultiset(input_value["values"])
+			answers = []
+			for operation, val in input_value["operations"]:
+				if operation == "mex":
+					answers.append(multiset.mex())
+				else:
+					getattr(multiset, operation)(val)
+			return answers
+		if "array" not in input_value:
+			return first_missing_positive_integer_file(input_value["buffer"])
+		return first_missing_positive_integer_in_place(input_value["array"])
+
+	def solve_batch(self, input_values: list) -> list:
+		if any("array" not in input_value for input_value in input_values):
+			return super().solve_batch(input_values)
+		try:
+			return first_missing_positive_integer_batch(
+				[input_value["array"] for input_value in input_values]
+			)
+		except OverflowError:
+			# Integers too large for int64 are left to the scalar solution
+			return super().solve_batch(input_values)
\ No newline at end of file
@@ -3,6 +3,7 @@
 # Example: 
 # [2, 4, 6, 2, 5] should return 13, since we pick 2 + 6 + 5
 # [5, 1, 1, 5] should return 10, since we pick 5 + 5
+# Tags: arrays, dynamic-programming
 
 # Approach: Let S(k) be the maximum sum for the array up to idx k.
 # Since we cannot select adjacent numbers, the maximum sum possible
@@ -22,29 +23,130 @@
 # using the above to compute the maximum sum upto the iterator idx.
 # Time Complexity: O(N) and Space Complexity: O(1)
 
+# To spread the iteration over several cores, we note that each step of the
+# recurrence (with the redundant S(k) dropped, as S(k+1) is never smaller)
+# S(k+2) = max(S(k) + array[k+2], S(k+1)) and S(k+1) = max(-inf + S(k), S(k+1))
+# is a matrix product in the max-plus algebra, where max takes the place of
+# addition and addition that of multiplication:
+# [S(k+2), S(k+1)] = [[0, array[k+2]], [0, -inf]] * [S(k+1), S(k)]
+# As matrix products are associative, the array can be cut into chunks whose
+# steps are reduced to a single 2x2 matrix each, independently of the rest.
+# The matrix of a chunk is found by running the recurrence over it from the
+# two unit vectors [0, -inf] and [-inf, 0], which give its two columns, and
+# the chunks can be reduced in a pool of processes. Within a chunk, NumPy
+# reduces many segments at once by running the recurrence over all of them
+# side by side. The matrices are then applied in order to [S(1), S(0)], which
+# yields the same result as the sequential iteration, exactly so for integers.
+
+# When the numbers arrive as a stream, the pair S(k), S(k+1) is all the state
+# there is, so it is kept in an accumulator that takes one number at a time
+# and can report the maximum sum so far after each of them. Numbers that
+# arrive in bulk are reduced to a max-plus matrix first, as above.
+
+import collections
+import collections.abc
+import itertools
+import math
+import random
+import typing
+
 from components import Solver
 
 
-test_cases = [
-	{
+def test_cases() -> typing.Iterator[dict]:
+	"""
+	Generates the test cases, so that the stress input of the chunked
+	reduction is only built when the test cases are checked rather than
+	whenever the solution is imported
+	:return: A generator of the test cases
+	"""
+	yield from [
+		{
+			"input": {
+				"array": [2, 4, 6, 2, 5]
+			},
+			"output": 13
+		},
+		{
+			"input": {
+				"array": [5, 1, 1, 5]
+			},
+			"output": 10
+		},
+		{
+			"input": {
+				"array": [5, 1, -1, -5, 10]
+			},
+			"output": 15
+		},
+		{
+			"input": {
+				"array": [-5, -5, 10, -1, 3, 4, -2],
+				"chunk_size": 2
+			},
+			"output": 9
+		}
+	]
+	import numpy as np
+	yield {
 		"input": {
-			"array": [2, 4, 6, 2, 5]
+			"array": np.tile(np.array([3, -1, 2, 7, -4], dtype=np.int64), 1000),
+			"chunk_size": 4096
 		},
-		"output": 13
-	},
-	{
+		"output": 10000
+	}
+	yield {
 		"input": {
-			"array": [5, 1, 1, 5]
+			"array": np.array([2 ** 62, 0] * 3, dtype=np.int64),
+			"chunk_size": 2
 		},
-		"output": 10
-	},
-	{
+		"output": 3 * 2 ** 62
+	}
+	yield {
 		"input": {
-			"array": [5, 1, -1, -5, 10]
+			"array": np.array([2 ** 62, 0] * 2048, dtype=np.int64),
+			"chunk_size": 1 << 20
 		},
-		"output": 15
+		"output": 2048 * 2 ** 62
 	}
-]
+	yield from [
+		{
+			"input": {
+				"array": [7]
+			},
+			"output": 7
+		},
+		{
+			"input": {
+				"stream": stream()
+			},
+			"output": [-5, -5, 5, 8, 9, 15]
+		}
+	]
+
+
+def stream() -> typing.Iterator:
+	"""
+	Generates the batches of numbers of a stream, in each of the forms they
+	can be pushed in
+	:return: A generator of the batches
+	"""
+	import numpy as np
+	yield [-5]
+	yield [-5, 10]
+	yield (val for val in (-1, 3))
+	yield np.array([4, -2])
+	yield collections.deque([1, 6])
+
+
+def generate_input(size: int) -> dict:
+	"""
+	Generates the input for a test case of a given size to benchmark with
+	:param size: The number of elements in the array
+	:return: The input arguments of the test case
+	"""
+	rng = random.Random(size)
+	return {"array": [rng.randint(-100, 100) for _ in range(size)]}
 
 
 def maximum_non_adjacent_sum(array: list[int]) -> int:
@@ -56,7 +158,6 @@ def maximum_non_adjacent_sum(array: list[int]) -> int:
 	"""
 	length = len(array)
 	# The maximum sum for an array with one element is the element itself
-	assert length > 1
 	if length == 1:
 		return array[0]
 	sum_k = array[0]
@@ -76,6 +177,248 @@ def maximum_non_adjacent_sum(array: list[int]) -> int:
 	return sum_k_plus_2
 
 
+# A max-plus matrix [[m11, m12], [m21, m22]], flattened in that order
+Matrix = typing.Tuple[float, float, float, float]
+
+# The number of elements in each of the segments NumPy reduces side by side
+SEGMENT_LENGTH = 1024
+
+
+def apply_matrix(
+		matrix: Matrix, sums: typing.Tuple[float, float]
+) -> typing.Tuple[float, float]:
+	"""
+	Applies a max-plus matrix to the pair of sums [S(k+1), S(k)]
+	:param matrix: The matrix of the steps to be applied
+	:param sums: The pair of sums
+	:return: The pair of sums after the steps
+	"""
+	m11, m12, m21, m22 = matrix
+	sum_k_plus_1, sum_k = sums
+	return (
+		max(m11 + sum_k_plus_1, m12 + sum_k),
+		max(m21 + sum_k_plus_1, m22 + sum_k)
+	)
+
+
+def as_python(val):
+	"""
+	Converts a NumPy scalar into the Python number it holds, leaving Python
+	numbers as they are
+	:param val: The number
+	:return: The Python number
+	"""
+	return val.item() if hasattr(val, "item") else val
+
+
+def chunk_matrix(chunk) -> Matrix:
+	"""
+	Reduces the steps of the recurrence over a chunk of the array to a single
+	max-plus matrix, using NumPy for large chunks of integers
+	:param chunk: The chunk of the array
+	:return: The matrix of the chunk
+	"""
+	if len(chunk) >= 2 * SEGMENT_LENGTH:
+		import numpy as np
+		try:
+			matrix = segment_matrix(np.asarray(chunk))
+		except OverflowError:
+			# Integers too large for NumPy are left to the scalar iteration
+			matrix = None
+		if matrix is not None:
+			return matrix
+	if hasattr(chunk, "tolist"):
+		# NumPy scalars would wrap around rather than grow on overflow
+		chunk = chunk.tolist()
+	# The columns of the matrix are the sums reached from the unit vectors
+	m11, m21 = 0, -math.inf
+	m12, m22 = -math.inf, 0
+	for val in chunk:
+		m21, m11 = m11, max(m21 + val, m11)
+		m22, m12 = m12, max(m22 + val, m12)
+	return m11, m12, m21, m22
+
+
+def segment_matrix(chunk: "np.ndarray") -> typing.Optional[Matrix]:
+	"""
+	Reduces a chunk of integers to a single max-plus matrix by reducing its
+	segments side by side with NumPy and then multiplying their matrices
+	:param chunk: The chunk of the array
+	:return: The matrix of the chunk, or None if its sums may not fit into
+		an int64
+	"""
+	import numpy as np
+	if chunk.dtype.kind not in "iu":
+		# Such as floats, whose sums NumPy would round differently
+		return None
+	# -inf is stood in for by a number so negative that the sums stay far
+	# below any real sum, which is bounded by the sum of the magnitudes
+	if np.abs(chunk).sum(dtype=np.float64) >= 2 ** 60:
+		return None
+	neg_inf = -(2 ** 62)
+	segments = len(chunk) // SEGMENT_LENGTH
+	columns = chunk[:segments * SEGMENT_LENGTH].astype(np.int64).reshape(
+		segments, SEGMENT_LENGTH
+	).T.copy()
+	m11 = np.zeros(segments, dtype=np.int64)
+	m21 = np.full(segments, neg_inf, dtype=np.int64)
+	m12 = np.full(segments, neg_inf, dtype=np.int64)
+	m22 = np.zeros(segments, dtype=np.int64)
+	for column in columns:
+		m21, m11 = m11, np.maximum(m21 + column, m11)
+		m22, m12 = m12, np.maximum(m22 + column, m12)
+
+	def entry(val) -> float:
+		return -math.inf if val < neg_inf // 2 else int(val)
+
+	matrix = None
+	for segment in zip(m11.tolist(), m12.tolist(), m21.tolist(), m22.tolist()):
+		segment = tuple(entry(val) for val in segment)
+		matrix = segment if matrix is None else multiply_matrices(segment, matrix)
+	remainder = chunk[segments * SEGMENT_LENGTH:]
+	if len(remainder) > 0:
+		matrix = multiply_matrices(chunk_matrix(remainder.tolist()), matrix)
+	return matrix
+
+
+def multiply_matrices(second: Matrix, first: Matrix) -> Matrix:
+	"""
+	Multiplies two max-plus matrices, which gives the matrix of the steps of
+	the first followed by those of the second
+	:param second: The matrix of the later steps
+	:param first: The matrix of the earlier steps
+	:return: The product of the matrices
+	"""
+	m11, m21 = apply_matrix(second, (first[0], first[2]))
+	m12, m22 = apply_matrix(second, (first[1], first[3]))
+	return m11, m12, m21, m22
+
+
+def maximum_non_adjacent_sum_chunked(
+		array, chunk_size: int = 1 << 20, processes: typing.Optional[int] = 1
+) -> int:
+	"""
+	Computes the maximum sum of non adjacent numbers from the given array by
+	reducing it in chunks as max-plus matrices, which gives the same result
+	as maximum_non_adjacent_sum
+	:param array: The array to be processed, a list or a NumPy array
+	:param chunk_size: The number of elements in each chunk
+	:param processes: The number of processes to reduce the chunks in, with
+		None using all cores and 1 reducing them in the current process
+	:return: The maximum non adjacent sum
+	"""
+	# NumPy scalars would wrap around rather than grow on overflow, so the
+	# first numbers are taken as Python numbers like the chunks are
+	if len(array) <= 2:
+		return maximum_non_adjacent_sum([as_python(val) for val in array])
+	first, second = as_python(array[0]), as_python(array[1])
+	sums = (max(first, second), first)
+	chunks = [
+		array[start:start + chunk_size]
+		for start in range(2, len(array), chunk_size)
+	]
+	if processes == 1:
+		matrices = map(chunk_matrix, chunks)
+	else:
+		import multiprocessing
+		with multiprocessing.Pool(processes) as pool:
+			matrices = pool.map(chunk_matrix, chunks)
+	for matrix in matrices:
+		sums = apply_matrix(matrix, sums)
+	return sums[0]
+
+
+class NonAdjacentSumAccumulator:
+	"""
+	Keeps the maximum sum of non adjacent numbers of a stream of numbers,
+	as they arrive
+	"""
+	def __init__(self):
+		"""
+		Initializing the accumulator for an empty stream
+		"""
+		self.count = 0
+		# The maximum sums up to the last two numbers, S(k) and S(k+1)
+		self.sum_k = None
+		self.sum_k_plus_1 = None
+
+	def push(self, val):
+		"""
+		Adds a number to the stream
+		:param val: The number
+		:return: None
+		"""
+		if self.count == 0:
+			self.sum_k_plus_1 = val
+		elif self.count == 1:
+			self.sum_k = self.sum_k_plus_1
+			self.sum_k_plus_1 = max(self.sum_k, val)
+		else:
+			self.sum_k, self.sum_k_plus_1 = (
+				self.sum_k_plus_1, max(self.sum_k + val, self.sum_k_plus_1)
+			)
+		self.count += 1
+
+	def push_many(self, values):
+		"""
+		Adds several numbers to the stream in order
+		:param values: The numbers, as an iterable or a NumPy array
+		:return: None
+		"""
+		is_array = hasattr(values, "__array__")
+		if not isinstance(values, collections.abc.Sequence) and not is_array:
+			# Such as generators or sets, which cannot be indexed
+			for val in values:
+				self.push(val)
+			return
+		# The first two numbers set up S(0) and S(1), after which the rest
+		# can be applied as a single max-plus matrix
+		idx = 0
+		while idx < len(values) and self.count < 2:
+			val = values[idx]
+			# NumPy scalars would wrap around rather than grow on overflow
+			self.push(as_python(val))
+			idx += 1
+		if idx < len(values):
+			if is_array:
+				rest = values[idx:]
+			else:
+				# Sequences such as deques cannot be sliced
+				rest = list(itertools.islice(values, idx, None))
+			self.sum_k_plus_1, self.sum_k = apply_matrix(
+				chunk_matrix(rest), (self.sum_k_plus_1, self.sum_k)
+			)
+			self.count += len(values) - idx
+
+	def best(self):
+		"""
+		Returns the maximum sum of non adjacent numbers of the stream so far
+		:raises: ValueError: When no numbers have arrived yet
+		:return: The maximum non adjacent sum
+		"""
+		if self.count == 0:
+			raise ValueError("No numbers have been pushed yet")
+		return self.sum_k_plus_1
+
+
 class ProblemSolver(Solver):
 	def solve(self, input_value: dict):
-			return maximum_non_adjacent_sum(input_value["array"])
+		if "stream" in input_value:
+			# The best sum after every batch of numbers pushed, one at a time
+			# for lists and in bulk otherwise
+			accumulator = NonAdjacentSumAccumulator()
+			best_sums = []
+			for values in input_value["stream"]:
+				if isinstance(values, list):
+					for val in values:
+						accumulator.push(val)
+						best_sums.append(accumulator.best())
+				else:
+					accumulator.push_many(values)
+					best_sums.append(accumulator.best())
+			return best_sums
+		if "chunk_size" in input_value:
+			return maximum_non_adjacent_sum_chunked(
+				input_value["array"], input_value["chunk_size"]
+			)
+		return maximum_non_adjacent_sum(input_value["array"])
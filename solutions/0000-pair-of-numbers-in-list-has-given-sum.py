@@ -2,6 +2,7 @@
 # pair of numbers adds up to k in a single pass
 # Example: With nums = [10, 15, 3, 7] and sum_val = 17, return True
 # since 10+7=17
+# Tags: arrays, hashing
 
 # Approach: 
 # We define the complement of a number as (sum_val - number)
@@ -15,6 +16,47 @@
 # (current number, sum_val - current number)
 # Time Complexity: O(N)
 
+# When the same nums are queried with many sums, the work of going over nums
+# is shared between the queries by building an index of nums once: its
+# distinct numbers, sorted, along with the number of times each occurs.
+# A sum then has a pair if the complement of any distinct number is found
+# among them with a binary search, and the complement is a different number
+# or the same number occurring at least twice. With NumPy the binary searches
+# for all distinct numbers, and for many sums at once, are vectorized.
+# Time Complexity: O(NlogN) to build the index and O(NlogN) per sum
+
+# For nums too large for the set of complements to fit into memory, we note
+# that a pair of numbers x and sum_val - x share the smaller of the two as a
+# key. So nums can be split into partitions by a hash of that key, which
+# keeps every pair within a single partition, and each partition can then be
+# checked on its own with the index above. The partitions are held in
+# fixed-size buffers that are spilled to files on disk whenever they fill
+# up, and are read back one at a time, so only the buffers and the index of
+# a single partition are ever in memory. A partition that is too large to be
+# indexed is scanned with the set of complements instead, which only grows
+# with its distinct numbers, and is split again with another hash only if
+# the set outgrows the memory too. Optionally, a Bloom filter of the numbers
+# seen so far flags the partitions in which the complement of a number may
+# have been seen before it. Since a Bloom filter has no false negatives, the
+# partitions that are never flagged have no pair and need not be read back.
+# Time Complexity: O(NlogN) with one pass over nums and one over the partitions
+
+# To solve a batch of test cases at once with NumPy, we tag every number
+# with the test case it belongs to and look up all (test case, complement)
+# pairs in the sorted (test case, number) pairs with a binary search. A
+# complement equal to the number itself only counts if it occurs twice.
+# Complements are computed in int64, which would silently wrap around for
+# numbers or sums of a magnitude of 2**62 or more, so batches holding any
+# are solved one test case at a time with Python integers instead.
+
+import collections
+import functools
+import itertools
+import os
+import random
+import tempfile
+import typing
+
 from components import Solver
 
 
@@ -31,18 +73,499 @@ test_cases = [
 			"nums": [10, 15, 3, 7], 
 			"sum_val": 19
 		},
+		"output": False
+	},
+	{
+		"input": {
+			"nums": [10, 15, 3, 7, 5],
+			"sum_vals": [17, 19, 10, 20, 30, 25, 8]
+		},
+		"output": [True, False, True, True, False, True, True]
+	},
+	{
+		"input": {
+			"nums": [2 ** 70, 3, 2 ** 70],
+			"sum_vals": [2 ** 71, 2 ** 70, 2 ** 70 + 3, 6]
+		},
+		"output": [True, False, True, False]
+	},
+	{
+		"input": {
+			"nums": [2 ** 62 - 1, 2 ** 62, -2 ** 62, 1],
+			"sum_vals": [-2 ** 63, 2 ** 62, 2 ** 63 - 1, 0, -2 ** 62 + 1]
+		},
+		"output": [False, True, True, True, True]
+	},
+	{
+		"input": {
+			"nums": [2 ** 62, 2 ** 62],
+			"sum_val": -2 ** 63
+		},
+		"output": False
+	},
+	{
+		"input": {
+			"nums": range(0, 20000, 2),
+			"sum_val": 19999,
+			"memory_limit": 4096,
+			"bloom_bits": 1 << 16
+		},
+		"output": False
+	},
+	{
+		"input": {
+			"nums": range(0, 20000, 2),
+			"sum_val": 19998,
+			"memory_limit": 4096
+		},
 		"output": True
 	}
 ]
 
 
-# 'complement_values' is a set containing the complements of the numbers
-# observed so far while iterating through nums
-complement_values = set()
+def generate_input(size: int) -> dict:
+	"""
+	Generates the input for a test case of a given size to benchmark with.
+	The numbers are all even and the sum odd so that no pair exists and
+	every number has to be looked at, which is the worst case
+	:param size: The number of elements in nums
+	:return: The input arguments of the test case
+	"""
+	rng = random.Random(size)
+	return {
+		"nums": [2 * rng.randint(-size, size) for _ in range(size)],
+		"sum_val": 1
+	}
+
+
+# Integers of a smaller magnitude have complements that fit into an int64,
+# beyond which NumPy would silently wrap them around
+SAFE_MAGNITUDE = 2 ** 62
+
+
+def vectorizable(*arrays: "np.ndarray") -> bool:
+	"""
+	Checks whether the complements of numbers can be computed exactly with
+	NumPy, which needs them to be of a numeric dtype and the integers among
+	them to be small enough not to wrap around, or not to be rounded when
+	mixed with floats
+	:param arrays: The arrays of numbers and sums
+	:return: True if they can be, else False
+	"""
+	kinds = {array.dtype.kind for array in arrays}
+	if not kinds <= set("iuf"):
+		return False
+	# Integers are only exact in a float64 up to 2**53
+	limit = 2 ** 53 if "f" in kinds else SAFE_MAGNITUDE
+	return all(
+		array.dtype.kind == "f" or len(array) == 0
+		or -limit < int(array.min()) and int(array.max()) < limit
+		for array in arrays
+	)
+
+
+def has_pair_batch(nums_list: list[list[int]], sum_vals: list[int]) -> list[bool]:
+	"""
+	Returns whether any pair of numbers adds up to the sum for each of the
+	given lists of numbers using the vectorized lookup described above
+	:param nums_list: The lists of numbers
+	:param sum_vals: The sum to look for in each of the lists
+	:raises: TypeError: When the numbers or sums are not of a numeric dtype
+		or too large for their complements to be computed exactly
+	:return: Whether a pair exists in each of the lists
+	"""
+	if len(nums_list) == 0:
+		return []
+	import numpy as np
+	lengths = np.array([len(nums) for nums in nums_list], dtype=np.int64)
+	values = np.concatenate([np.asarray(nums) for nums in nums_list])
+	sum_vals = np.asarray(sum_vals)
+	if not vectorizable(values, sum_vals):
+		raise TypeError("Only numbers that fit into an int64 can be vectorized")
+	# Mixing unsigned and signed integers would promote them to floats
+	if values.dtype.kind == "u":
+		values = values.astype(np.int64)
+	if sum_vals.dtype.kind == "u":
+		sum_vals = sum_vals.astype(np.int64)
+	case_ids = np.repeat(np.arange(len(nums_list)), lengths)
+	complements = sum_vals[case_ids] - values
+
+	# Numbers and complements are replaced by their ranks among each other,
+	# so that a (test case, value) pair fits into a single int64 key
+	uniques, ranks = np.unique(
+		np.concatenate((values, complements)), return_inverse=True
+	)
+	ranks = ranks.reshape(-1)
+	value_keys = case_ids * len(uniques) + ranks[:len(values)]
+	complement_keys = case_ids * len(uniques) + ranks[len(values):]
+
+	sorted_keys = np.sort(value_keys)
+	matches = (
+		np.searchsorted(sorted_keys, complement_keys, side="right")
+		- np.searchsorted(sorted_keys, complement_keys, side="left")
+	)
+	# A number cannot pair with itself
+	matches -= (complements == values)
+	found = np.bincount(case_ids, weights=matches > 0, minlength=len(nums_list))
+	return (found > 0).tolist()
+
+
+class PairSumIndex:
+	"""
+	An index of a list of numbers that answers whether any pair of them adds
+	up to a given sum, for many sums, as described above
+	"""
+	# The largest number of (sum, number) pairs looked up at once
+	MAX_LOOKUPS = 1 << 22
+
+	def __init__(self, nums: list):
+		"""
+		Builds the index of the numbers
+		:param nums: The list of numbers
+		"""
+		import numpy as np
+		values = np.asarray(nums)
+		self.vectorized = vectorizable(values)
+		self.counter = None
+		if self.vectorized:
+			if values.dtype.kind == "u":
+				values = values.astype(np.int64)
+			self.uniques, self.counts = np.unique(values, return_counts=True)
+		else:
+			# Such as integers too large for int64, which are looked up in
+			# a dictionary instead
+			self.counter = collections.Counter(nums)
+
+	def _has_pair_counted(self, sum_val) -> bool:
+		"""
+		Returns whether any pair of the numbers adds up to the sum by
+		looking up the complements in a dictionary of the numbers, which
+		holds Python integers of any size
+		:param sum_val: The sum
+		:return: True if a pair exists, else False
+		"""
+		if self.counter is None:
+			self.counter = dict(zip(self.uniques.tolist(), self.counts.tolist()))
+		return any(
+			self.counter.get(sum_val - num, 0) > (sum_val - num == num)
+			for num in self.counter
+		)
+
+	def has_pair(self, sum_val) -> bool:
+		"""
+		Returns whether any pair of the numbers adds up to the sum
+		:param sum_val: The sum
+		:return: True if a pair exists, else False
+		"""
+		return self.has_pair_batch([sum_val])[0]
+
+	def has_pair_batch(self, sum_vals: typing.Iterable) -> list[bool]:
+		"""
+		Returns whether any pair of the numbers adds up to each of the sums
+		:param sum_vals: The sums
+		:return: Whether a pair exists for each of the sums
+		"""
+		import numpy as np
+		sum_vals = list(sum_vals)
+		sums = np.asarray(sum_vals)
+		if not self.vectorized or not vectorizable(self.uniques, sums):
+			# The complements would wrap around in int64
+			return [self._has_pair_counted(sum_val) for sum_val in sum_vals]
+		if sums.dtype.kind == "u":
+			sums = sums.astype(np.int64)
+		sum_vals = sums
+		found = np.zeros(len(sum_vals), dtype=bool)
+		if len(self.uniques) == 0:
+			return found.tolist()
+		# The sums are looked up in groups, each with a complement per
+		# distinct number, to bound the memory taken up by the lookups
+		group_size = max(self.MAX_LOOKUPS // len(self.uniques), 1)
+		for start in range(0, len(sum_vals), group_size):
+			group = sum_vals[start:start + group_size]
+			complements = group[:, np.newaxis] - self.uniques[np.newaxis, :]
+			positions = np.searchsorted(self.uniques, complements)
+			positions[positions == len(self.uniques)] = 0
+			matches = self.uniques[positions] == complements
+			# A number cannot pair with itself unless it occurs twice
+			matches &= (complements != self.uniques) | (self.counts > 1)
+			found[start:start + group_size] = matches.any(axis=1)
+		return found.tolist()
+
+
+def mix64(keys: "np.ndarray", seed: int = 0) -> "np.ndarray":
+	"""
+	Hashes integers with splitmix64, every bit of whose hash depends on every
+	bit of the integer, unlike the hash of a small int, which is the int
+	:param keys: The integers to be hashed, as an int64 array
+	:param seed: The seed of the hash
+	:return: The hashes, as a uint64 array
+	"""
+	# Arithmetic on uint64 arrays wraps around, just as splitmix64 does
+	import numpy as np
+	offset = np.uint64((seed + 1) * 0x9E3779B97F4A7C15 % (1 << 64))
+	mixed = keys.astype(np.uint64) + offset
+	mixed = (mixed ^ (mixed >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+	mixed = (mixed ^ (mixed >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+	return mixed ^ (mixed >> np.uint64(31))
+
+
+class BloomFilter:
+	"""
+	A set of numbers that may report a number as present when it is not,
+	but never the other way around, in a fixed number of bits
+	"""
+	def __init__(self, size: int, hash_count: int = 3):
+		"""
+		Initializing an empty filter
+		:param size: The number of bits of the filter
+		:param hash_count: The number of bits set for every number
+		"""
+		self.size = size
+		self.hash_count = hash_count
+		import numpy as np
+		self.bits = np.zeros((size + 7) // 8, dtype=np.uint8)
+
+	def positions(self, nums: "np.ndarray") -> "np.ndarray":
+		"""
+		Returns the positions of the bits of every number, which are derived
+		from the two halves of a single hash of it
+		:param nums: The numbers, as an int64 array
+		:return: The positions, with a row per number
+		"""
+		mixed = mix64(nums, seed=-1)
+		import numpy as np
+		first = mixed & np.uint64(0xFFFFFFFF)
+		second = (mixed >> np.uint64(32)) | np.uint64(1)
+		steps = np.arange(self.hash_count, dtype=np.uint64)
+		positions = first[:, np.newaxis] + steps * second[:, np.newaxis]
+		return positions % np.uint64(self.size)
+
+	def add(self, nums: "np.ndarray"):
+		"""
+		Adds numbers to the filter
+		:param nums: The numbers to be added, as an int64 array
+		:return: None
+		"""
+		positions = self.positions(nums).reshape(-1)
+		import numpy as np
+		np.bitwise_or.at(
+			self.bits, positions >> np.uint64(3),
+			np.left_shift(1, positions & np.uint64(7)).astype(np.uint8)
+		)
+
+	def contains(self, nums: "np.ndarray") -> "np.ndarray":
+		"""
+		Checks which of the numbers may have been added to the filter
+		:param nums: The numbers to be checked, as an int64 array
+		:return: Whether each of the numbers may have been added
+		"""
+		positions = self.positions(nums)
+		import numpy as np
+		shifts = (positions & np.uint64(7)).astype(np.uint8)
+		bits = self.bits[positions >> np.uint64(3)] >> shifts
+		return np.all(bits & 1, axis=1)
+
+
+def iter_chunks(nums, chunk_size: int) -> typing.Iterator["np.ndarray"]:
+	"""
+	Splits numbers into chunks of int64 arrays
+	:param nums: The numbers, as a NumPy array or any iterable of integers
+	:param chunk_size: The largest number of numbers in a chunk
+	:return: A generator of the chunks
+	"""
+	import numpy as np
+	if isinstance(nums, np.ndarray):
+		for start in range(0, len(nums), chunk_size):
+			yield nums[start:start + chunk_size].astype(np.int64)
+		return
+	nums = iter(nums)
+	while True:
+		chunk = np.fromiter(itertools.islice(nums, chunk_size), dtype=np.int64)
+		if len(chunk) == 0:
+			return
+		yield chunk
+
+
+def has_pair_partitioned(
+		nums, sum_val: int, memory_limit: int = 1 << 26, partitions: int = 64,
+		bloom_bits: typing.Optional[int] = None,
+		directory: typing.Optional[str] = None
+) -> bool:
+	"""
+	Returns whether any pair of numbers adds up to the sum by splitting the
+	numbers into partitions that are spilled to disk, as described above
+	:param nums: The numbers, as a NumPy array or any iterable of integers
+		whose sums with the sum fit into an int64, such as a stream that is
+		too large to fit into memory
+	:param sum_val: The sum to look for
+	:param memory_limit: The approximate number of bytes the buffers of the
+		partitions, or the numbers of a partition being checked, may take up
+	:param partitions: The number of partitions to split the numbers into
+	:param bloom_bits: The number of bits of the Bloom filter, if any
+	:param directory: The directory to create the files of the partitions in,
+		with the default temporary directory being used if None
+	:raises: ValueError: When there are fewer than two partitions
+	:return: True if a pair exists, else False
+	"""
+	if partitions < 2:
+		raise ValueError("The numbers must be split into at least two partitions")
+	# A number takes up 8 bytes when buffered, and about 64 bytes while the
+	# numbers of a partition are being checked with an index
+	chunk_size = max(min(memory_limit // 8, 1 << 16), 1)
+	return has_pair_in_chunks(
+		iter_chunks(nums, chunk_size), sum_val, memory_limit, partitions,
+		bloom_bits, directory, seed=0
+	)
+
+
+def has_pair_in_chunks(
+		chunks: typing.Iterable["np.ndarray"], sum_val: int, memory_limit: int,
+		partitions: int, bloom_bits: typing.Optional[int],
+		directory: typing.Optional[str], seed: int
+) -> bool:
+	"""
+	Returns whether any pair of numbers adds up to the sum, with the numbers
+	arriving in chunks, as has_pair_partitioned does
+	:param chunks: The chunks of numbers, as int64 arrays
+	:param sum_val: The sum to look for
+	:param memory_limit: The approximate number of bytes to be used
+	:param partitions: The number of partitions to split the numbers into
+	:param bloom_bits: The number of bits of the Bloom filter, if any
+	:param directory: The directory to create the files of the partitions in
+	:param seed: The seed of the hash the numbers are partitioned with,
+		which differs every time a partition is split again
+	:return: True if a pair exists, else False
+	"""
+	buffer_capacity = max(memory_limit // 8, 1)
+	index_capacity = max(memory_limit // 64, 1)
+	import numpy as np
+	bloom_filter = None if bloom_bits is None else BloomFilter(bloom_bits)
+	flagged = np.zeros(partitions, dtype=bool)
+	counts = np.zeros(partitions, dtype=np.int64)
+
+	with tempfile.TemporaryDirectory(dir=directory) as spill_directory:
+		paths = [
+			os.path.join(spill_directory, f"partition-{idx}.bin")
+			for idx in range(partitions)
+		]
+		buffers = [[] for _ in range(partitions)]
+		buffered = 0
+
+		def spill():
+			for path, buffer in zip(paths, buffers):
+				if len(buffer) > 0:
+					with open(path, "ab") as partition_file:
+						np.concatenate(buffer).tofile(partition_file)
+					buffer.clear()
+
+		for chunk in chunks:
+			complements = sum_val - chunk
+			keys = np.minimum(chunk, complements)
+			chunk_partitions = (
+				mix64(keys, seed) % np.uint64(partitions)
+			).astype(np.int64)
+			if bloom_filter is not None:
+				# Adding the chunk before looking up its complements may flag
+				# a number pairing with itself too, which is only a false
+				# positive that the partition is checked for
+				bloom_filter.add(chunk)
+				flagged[chunk_partitions[bloom_filter.contains(complements)]] = True
+			# The chunk is sorted by partition and split into the buffers
+			order = np.argsort(chunk_partitions, kind="stable")
+			chunk_counts = np.bincount(chunk_partitions, minlength=partitions)
+			ends = np.cumsum(chunk_counts)
+			for partition in np.flatnonzero(chunk_counts).tolist():
+				start = ends[partition] - chunk_counts[partition]
+				buffers[partition].append(chunk[order[start:ends[partition]]])
+			counts += chunk_counts
+			buffered += len(chunk)
+			if buffered >= buffer_capacity:
+				spill()
+				buffered = 0
+
+		def read_partition(partition: int) -> typing.Iterator["np.ndarray"]:
+			# The spilled part of the partition is read back in chunks, and
+			# then the part that is still buffered
+			if os.path.isfile(paths[partition]):
+				with open(paths[partition], "rb") as partition_file:
+					while True:
+						chunk = np.fromfile(
+							partition_file, dtype=np.int64, count=1 << 16
+						)
+						if len(chunk) == 0:
+							break
+						yield chunk
+			yield from buffers[partition]
+
+		for partition in range(partitions):
+			if counts[partition] < 2:
+				continue
+			if bloom_filter is not None and not flagged[partition]:
+				continue
+			if counts[partition] <= index_capacity:
+				index = PairSumIndex(np.concatenate(list(read_partition(partition))))
+				if index.has_pair(sum_val):
+					return True
+			elif has_pair_in_large_partition(
+					functools.partial(read_partition, partition), sum_val,
+					memory_limit, partitions, spill_directory, seed
+			):
+				return True
+	return False
+
+
+def has_pair_in_large_partition(
+		read_chunks: typing.Callable[[], typing.Iterator["np.ndarray"]],
+		sum_val: int, memory_limit: int, partitions: int, directory: str,
+		seed: int
+) -> bool:
+	"""
+	Returns whether any pair of numbers of a partition too large to be
+	indexed adds up to the sum. The partition is scanned with the set of
+	complements, which only grows with the distinct keys, as a partition may
+	well hold many copies of a few numbers. Only if the set outgrows the
+	memory is the partition split again with another hash
+	:param read_chunks: A function that reads the chunks of numbers of the
+		partition, which may be called again to read them anew
+	:param sum_val: The sum to look for
+	:param memory_limit: The approximate number of bytes to be used
+	:param partitions: The number of partitions to split the numbers into
+	:param directory: The directory to create the files of the partitions in
+	:param seed: The seed of the hash the partition was split with
+	:return: True if a pair exists, else False
+	"""
+	# The numbers sharing a key only have two complements between them, so
+	# a set that outgrows two holds several keys and can be split further
+	set_capacity = max(memory_limit // 100, 2)
+	complement_values = set()
+	for chunk in read_chunks():
+		for num in chunk.tolist():
+			if num in complement_values:
+				return True
+			complement_values.add(sum_val - num)
+		if len(complement_values) > set_capacity:
+			return has_pair_in_chunks(
+				read_chunks(), sum_val, memory_limit, partitions, None,
+				directory, seed + 1
+			)
+	return False
 
 
 class ProblemSolver(Solver):
 	def solve(self, input_value: dict):
+		if "memory_limit" in input_value:
+			return has_pair_partitioned(
+				input_value["nums"], input_value["sum_val"],
+				memory_limit=input_value["memory_limit"],
+				bloom_bits=input_value.get("bloom_bits")
+			)
+		if "sum_vals" in input_value:
+			return PairSumIndex(input_value["nums"]).has_pair_batch(
+				input_value["sum_vals"]
+			)
+		# 'complement_values' is a set containing the complements of the
+		# numbers observed so far while iterating through nums
+		complement_values = set()
 		for num in input_value["nums"]:
 			# We check whether complement_values contains the current num -
 			# if so, then its complement value has been seen before
@@ -51,3 +574,18 @@ class ProblemSolver(Solver):
 			# Else update it with another complement value to search for
 			complement_values.add(input_value["sum_val"] - num)
 		return False
+
+	def solve_batch(self, input_values: list) -> list:
+		if any(
+				"sum_vals" in input_value or "memory_limit" in input_value
+				for input_value in input_values
+		):
+			return super().solve_batch(input_values)
+		try:
+			return has_pair_batch(
+				[input_value["nums"] for input_value in input_values],
+				[input_value["sum_val"] for input_value in input_values]
+			)
+		except TypeError:
+			# Such as integers too large for int64
+			return super().solve_batch(input_values)
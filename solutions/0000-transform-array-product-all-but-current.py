@@ -3,6 +3,9 @@
 # Example: With nums = [1, 2, 3, 4, 5], the array to be returned is
 # [2*3*4*5, 1*3*4*5, 1*2*4*5, 1*2*3*5, 1*2*3*4] i.e. [120, 60, 40, 30, 24]
 # Additional Challenge: Try not to use division
+# Follow-up: nums receives a sequence of point updates, each setting one of
+# its elements to a new value, and the transformed array is needed again
+# Tags: arrays, prefix-products
 
 # Approach #1:
 # Multiply all elements of the array to get the overall product. Then create
@@ -32,14 +35,58 @@
 # make up the entire array minus the element under consideration.
 # Therefore, multiplying the complement children along the path will give
 # the product of all elements in the array minus the current one.
-# Time Complexity: O(NlogN) and Space Complexity: O(NlogN)
+# Rather than allocating an object per node, the tree is laid out flat in a
+# list of 2N entries like a binary heap: the leaves are stored at N..2N-1,
+# the children of the node at idx are at 2*idx and 2*idx+1, its parent is at
+# idx//2 and its complement child (sibling) at idx^1. Every node below N has
+# both children, so the root at 1 covers all leaves even when N is not a
+# power of two, which suffices since multiplication is commutative.
+# Time Complexity: O(NlogN) and Space Complexity: O(N)
 
-# We implement the approach that adheres to the constraint of the
-# additional challenge
+# Approach #3:
+# The product of all elements but the current one is the product of all
+# elements before it times the product of all elements after it. Both of
+# these can be built up in a single pass each, from the left and from the
+# right, which avoids division too while skipping the tree altogether.
+# With NumPy the two passes are cumulative products, which are vectorized
+# for fixed-width dtypes. These wrap around on overflow though, so arrays
+# of Python integers are only handed to NumPy when their products are
+# known to fit into an int64, and are otherwise multiplied out exactly
+# with Python integers.
+# When the products are only needed modulo some number, every intermediate
+# product can be reduced as we go to keep it bounded. NumPy has no modular
+# cumulative product, so the NumPy path builds one out of log(N) rounds of
+# vectorized multiplications, each doubling the span of the products.
+# To solve a batch of test cases at once with NumPy, we pad the arrays with
+# ones into a matrix and take the cumulative products along its rows.
+# Time Complexity: O(N) and Space Complexity: O(N)
+
+# Follow-up:
+# Rebuilding either of the above after every update costs O(N) at least.
+# The tree of approach #2 instead only needs the O(logN) nodes on the path
+# from the updated leaf to the root to be recomputed, after which any single
+# element of the transformed array is a walk along a path too.
+# A point update changes every other element of the transformed array, so
+# the full array is kept as a lazy view that remembers when each element was
+# last computed and only recomputes those that are stale when accessed, or
+# rebuilds the array with approach #3 when most of them are.
+# Each update, and each element accessed afterwards, then costs O(logN).
+
+# We implement approach #3, which adheres to the constraint of the
+# additional challenge, and the tree of approach #2 for the follow-up
+
+import collections.abc
+import math
+import random
+import typing
 
 from components import Solver
 
 
+# The largest modulus whose residues can be multiplied in an int64
+MAX_NUMPY_MODULUS = math.isqrt(2 ** 63 - 1)
+
+
 test_cases = [
 	{
 		"input": {
@@ -52,80 +99,383 @@ test_cases = [
 			"nums": [0, 1, 2, 3]
 		},
 		"output": [6, 0, 0, 0]
+	},
+	{
+		"input": {
+			"nums": [10 ** 9, 10 ** 9, 10 ** 9, 7],
+			"modulus": 10 ** 9 + 7
+		},
+		"output": [343, 343, 343, 999999664]
+	},
+	{
+		"input": {
+			"nums": [1, 2, 3, 4, 5],
+			"updates": [[0, 6], [3, 0], [3, 2]]
+		},
+		"output": [60, 180, 120, 180, 72]
 	}
 ]
 
 
-# The Tree Node containing references to left and right children as well as
-# its parent, allowing it to built from leaf to root
-class Node:
-	def __init__(self, left=None, right=None, val=None):
-		self.left = left
-		self.right = right
-		self.parent = None
-		if val is not None:
-			self.val = val
-		else:
-			self.val = (left.val if left else 1) * (right.val if right else 1)
+def generate_input(size: int) -> dict:
+	"""
+	Generates the input for a test case of a given size to benchmark with.
+	The numbers are drawn from -1 and 1 so that the products stay small
+	and the timings are not dominated by big integer multiplication
+	:param size: The number of elements in nums
+	:return: The input arguments of the test case
+	"""
+	rng = random.Random(size)
+	return {"nums": [rng.choice((-1, 1)) for _ in range(size)]}
 
 
-def build_tree(array: list[int]) -> list[Node]:
+def build_tree(array: list[int], modulus: typing.Optional[int] = None) -> list[int]:
 	"""
-	Builds the tree from the array in a bottom-up fashion
+	Builds the flat product tree from the array in a bottom-up fashion
 	:param array: The input array to be converted into a tree
-	:return: A list of Nodes
+	:param modulus: The modulus to reduce the products by, if any
+	:return: A list of 2N products, with the leaves at N..2N-1 and the root
+		at 1 (the entry at 0 is unused)
 	"""
-	leaf_node_array = [Node(val=val) for val in array]
-	node_array = [node for node in leaf_node_array]
-	# The iterator node_array contains the nodes at a given level of the tree
-	# We build the tree level by level till we hit the root level with one node
-	while len(node_array) > 1:
-		new_node_array = []
-		# While building the level we iterate in steps of two, using a node
-		# and its neighbor (if it exists) to build its parent node
-		for idx in range(0, len(node_array), 2):
+	length = len(array)
+	if modulus is None:
+		tree = [1] * length + list(array)
+	else:
+		tree = [1] * length + [val % modulus for val in array]
+	# Each internal node is the product of its two children, and these are
+	# built from the bottom up so that the children are ready before it
+	for idx in range(length - 1, 0, -1):
+		tree[idx] = tree[2 * idx] * tree[2 * idx + 1]
+		if modulus is not None:
+			tree[idx] %= modulus
+	return tree
 
-			left_node = node_array[idx]
-			right_node = node_array[idx+1] if idx+1 < len(node_array) else None
-			parent_node = Node(left_node, right_node)
 
-			left_node.parent = parent_node
-			if right_node is not None:
-				right_node.parent = parent_node
-			
-			new_node_array.append(parent_node)
-
-		node_array = new_node_array
-	return leaf_node_array
-
-
-def get_product_complement_children(node: Node) -> int:
+def get_product_complement_children(tree: list[int], index: int) -> int:
 	"""
 	Returns the product of the complement children (as defined in the approach)
-	along the path from leaf to root for the given node
-	:param node: The leaf Node to start from
+	along the path from leaf to root for the element at the given index
+	:param tree: The flat product tree
+	:param index: The index of the element in the array
 	:return: The product of the complement children along the path
 	"""
 	complement_product = 1
-	iterator = node
-	while iterator.parent is not None:
-		# If the iterator is its parent's left child, then the complement child
-		# is the right one, and vice versa
-		if iterator.parent.left == iterator:
-			complement_child = iterator.parent.right
+	# The leaf of the element is at N + index, with N being half the tree
+	node = len(tree) // 2 + index
+	while node > 1:
+		# The complement child is the sibling, which differs in the last bit
+		complement_product *= tree[node ^ 1]
+		node //= 2
+	return complement_product
+
+
+def update_tree(
+		tree: list[int], index: int, value: int,
+		modulus: typing.Optional[int] = None
+):
+	"""
+	Sets the element at the given index of the flat product tree to a value
+	and recomputes the products on the path from its leaf to the root
+	:param tree: The flat product tree
+	:param index: The index of the element in the array
+	:param value: The new value of the element
+	:param modulus: The modulus the products of the tree are reduced by, if any
+	:return: None
+	"""
+	node = len(tree) // 2 + index
+	tree[node] = value if modulus is None else value % modulus
+	while node > 1:
+		node //= 2
+		tree[node] = tree[2 * node] * tree[2 * node + 1]
+		if modulus is not None:
+			tree[node] %= modulus
+
+
+def product_all_but_current(
+		array: list[int], modulus: typing.Optional[int] = None
+) -> list[int]:
+	"""
+	Transforms the array exactly with Python integers using the products
+	before and after each element, as described in approach #3
+	:param array: The input array
+	:param modulus: The modulus to reduce the products by, if any
+	:return: The transformed array
+	"""
+	transformed = [1] * len(array)
+	# The product of all elements before the current one
+	before = 1
+	for idx in range(len(array)):
+		transformed[idx] = before
+		before *= array[idx]
+		if modulus is not None:
+			before %= modulus
+	# The product of all elements after the current one
+	after = 1
+	for idx in range(len(array) - 1, -1, -1):
+		transformed[idx] *= after
+		after *= array[idx]
+		if modulus is not None:
+			transformed[idx] %= modulus
+			after %= modulus
+	return transformed
+
+
+def cumprod_mod(array: "np.ndarray", modulus: int) -> "np.ndarray":
+	"""
+	Computes the cumulative products of the array modulo the modulus with
+	log(N) vectorized rounds, each of which multiplies every product by the
+	one just before its span so as to double the span
+	:param array: The input array of residues, of an integer dtype
+	:param modulus: The modulus, at most MAX_NUMPY_MODULUS
+	:return: The cumulative products modulo the modulus
+	"""
+	import numpy as np
+	products = array.astype(np.int64) % modulus
+	span = 1
+	while span < len(products):
+		products[span:] = products[span:] * products[:-span] % modulus
+		span *= 2
+	return products
+
+
+def product_all_but_current_numpy(
+		array: "np.ndarray", modulus: typing.Optional[int] = None
+) -> "np.ndarray":
+	"""
+	Transforms the array with vectorized cumulative products as described in
+	approach #3. Without a modulus, the arithmetic is that of the dtype of the
+	array, which wraps around on overflow for fixed-width integers
+	:param array: The input array
+	:param modulus: The modulus to reduce the products by, if any
+	:raises: ValueError: When the modulus is larger than MAX_NUMPY_MODULUS
+	:return: The transformed array
+	"""
+	import numpy as np
+	if modulus is not None and not 0 < modulus <= MAX_NUMPY_MODULUS:
+		raise ValueError(f"The modulus must be within 1..{MAX_NUMPY_MODULUS}")
+	if len(array) == 0:
+		return array.copy()
+
+	def exclusive_cumprod(values: "np.ndarray") -> "np.ndarray":
+		# The product of all values strictly before each value, which is the
+		# cumulative product shifted along by one
+		products = np.ones_like(values)
+		if modulus is None:
+			np.cumprod(values[:-1], out=products[1:])
 		else:
-			complement_child = iterator.parent.left
-		# But this does not guarantee that the complement child does indeed
-		# exist, and therefore we check whether it is not None
-		if complement_child is not None:
-			complement_product *= complement_child.val
-		iterator = iterator.parent
-	return complement_product 
+			products = products.astype(np.int64)
+			products[1:] = cumprod_mod(values[:-1], modulus)
+		return products
+
+	before = exclusive_cumprod(array)
+	after = exclusive_cumprod(array[::-1])[::-1]
+	if modulus is None:
+		return before * after
+	return before * after % modulus
+
+
+def fits_int64(array: list[int]) -> bool:
+	"""
+	Checks whether every product of the elements of the array fits into an
+	int64, which is the case when the product of the absolute values of its
+	non-zero elements needs fewer than 63 bits, since this bounds them all
+	:param array: The input array of integers
+	:return: True if they do, else False
+	"""
+	bits = 0
+	for val in array:
+		if val != 0:
+			bits += abs(val).bit_length()
+			if bits >= 63:
+				return False
+	return True
+
+
+def product_all_but_current_batch(
+		arrays: list[list[int]]
+) -> list[typing.Optional[list[int]]]:
+	"""
+	Transforms each of the given arrays using the vectorized cumulative
+	products described above
+	:param arrays: The input arrays
+	:return: The transformed version of each array, or None for the arrays
+		whose products do not fit into an int64
+	"""
+	if len(arrays) == 0:
+		return []
+	import numpy as np
+	max_length = max(len(array) for array in arrays)
+	matrix = np.ones((len(arrays), max_length + 1), dtype=np.int64)
+	for idx, array in enumerate(arrays):
+		array = np.asarray(array)
+		if len(array) > 0 and array.dtype.kind not in "iub":
+			raise TypeError("Only integer dtypes can be vectorized")
+		matrix[idx, 1:len(array) + 1] = array
+
+	# The product of the absolute values of the non-zero elements bounds
+	# every partial product, so the rows where it needs fewer than 63 bits
+	# can be multiplied out in int64 without overflowing
+	magnitudes = np.abs(matrix[:, 1:]).astype(np.float64)
+	bits = np.sum(np.log2(np.where(magnitudes > 0, magnitudes, 1)), axis=1)
+	fits = bits < 62
+
+	# The leading column of ones shifts the cumulative products along by one,
+	# giving the product of the elements strictly before each element, and
+	# doing the same over the reversed rows gives the product of those after
+	before = np.cumprod(matrix, axis=1)[:, :-1]
+	reversed_matrix = np.concatenate(
+		(matrix[:, :1], matrix[:, :0:-1]), axis=1
+	)
+	after = np.cumprod(reversed_matrix, axis=1)[:, -2::-1]
+	transformed = before * after
+
+	return [
+		transformed[idx, :len(array)].tolist() if fits[idx] else None
+		for idx, array in enumerate(arrays)
+	]
+
+
+class ProductTree:
+	"""
+	The product tree of approach #2 kept around between point updates of the
+	array, as described in the follow-up
+	"""
+	def __init__(self, array: list[int], modulus: typing.Optional[int] = None):
+		"""
+		Initializing the tree
+		:param array: The input array
+		:param modulus: The modulus to reduce the products by, if any
+		"""
+		self.modulus = modulus
+		self.tree = build_tree(array, modulus)
+		# The transformed array, along with the version of the tree each of
+		# its elements was computed at. An element is stale when its version
+		# is behind that of the tree, which every update moves forward
+		self.version = 0
+		self.transformed = [None] * len(array)
+		self.computed_at = [-1] * len(array)
+
+	def __len__(self) -> int:
+		return len(self.tree) // 2
+
+	def update(self, index: int, value: int):
+		"""
+		Sets the element at the given index to a value
+		:param index: The index of the element in the array
+		:param value: The new value of the element
+		:return: None
+		"""
+		if not 0 <= index < len(self):
+			raise IndexError(f"Index {index} out of range for {len(self)} elements")
+		update_tree(self.tree, index, value, self.modulus)
+		self.version += 1
+
+	def query(self, index: int) -> int:
+		"""
+		Returns the product of all elements but the one at the given index
+		:param index: The index of the element in the array
+		:return: The product of the other elements
+		"""
+		if not 0 <= index < len(self):
+			raise IndexError(f"Index {index} out of range for {len(self)} elements")
+		if self.computed_at[index] != self.version:
+			product = get_product_complement_children(self.tree, index)
+			if self.modulus is not None:
+				product %= self.modulus
+			self.transformed[index] = product
+			self.computed_at[index] = self.version
+		return self.transformed[index]
+
+	def view(self) -> "ProductView":
+		"""
+		Returns the lazy view of the transformed array
+		:return: The view
+		"""
+		return ProductView(self)
+
+	def tolist(self) -> list[int]:
+		"""
+		Returns the transformed array, recomputing the stale elements only.
+		When most of them are stale, the array is rebuilt from the leaves in
+		linear time rather than querying each of them
+		:return: The transformed array
+		"""
+		length = len(self)
+		stale = length - self.computed_at.count(self.version)
+		if stale * max(length.bit_length(), 1) > 2 * length:
+			self.transformed = product_all_but_current(
+				self.tree[length:], self.modulus
+			)
+			self.computed_at = [self.version] * length
+			return list(self.transformed)
+		return [self.query(idx) for idx in range(length)]
+
+
+class ProductView(collections.abc.Sequence):
+	"""
+	A read-only view of the transformed array of a product tree, which
+	computes its elements on access and so always reflects the latest updates
+	"""
+	def __init__(self, product_tree: ProductTree):
+		self.product_tree = product_tree
+
+	def __len__(self) -> int:
+		return len(self.product_tree)
+
+	def __getitem__(self, index):
+		if isinstance(index, slice):
+			return [
+				self.product_tree.query(idx)
+				for idx in range(*index.indices(len(self)))
+			]
+		if index < 0:
+			index += len(self)
+		return self.product_tree.query(index)
+
+	def __iter__(self):
+		return iter(self.product_tree.tolist())
 
 
 class ProblemSolver(Solver):
 	def solve(self, input_value: dict):
-		leaf_node_array = build_tree(input_value["nums"])
-		transformed_array = [get_product_complement_children(node) 
-							 for node in leaf_node_array]
-		return transformed_array
+		nums = input_value["nums"]
+		modulus = input_value.get("modulus")
+		if "updates" in input_value:
+			product_tree = ProductTree(nums, modulus)
+			for index, value in input_value["updates"]:
+				product_tree.update(index, value)
+			return product_tree.tolist()
+		import numpy as np
+		# Arrays of fixed-width dtypes are transformed in their own arithmetic
+		if isinstance(nums, np.ndarray) and nums.dtype.kind in "iuf":
+			return product_all_but_current_numpy(nums, modulus)
+		# Arrays of Python integers are only vectorized when that is exact
+		if modulus is not None:
+			if modulus <= MAX_NUMPY_MODULUS:
+				residues = np.array([num % modulus for num in nums], dtype=np.int64)
+				return product_all_but_current_numpy(residues, modulus).tolist()
+		elif fits_int64(nums):
+			return product_all_but_current_numpy(
+				np.array(nums, dtype=np.int64)
+			).tolist()
+		return product_all_but_current(nums, modulus)
+
+	def solve_batch(self, input_values: list) -> list:
+		if any(
+				"modulus" in input_value or "updates" in input_value
+				for input_value in input_values
+		):
+			return super().solve_batch(input_values)
+		try:
+			transformed_arrays = product_all_but_current_batch(
+				[input_value["nums"] for input_value in input_values]
+			)
+		except (OverflowError, TypeError, ValueError):
+			# Such as integers too large for int64 or non integer elements
+			return super().solve_batch(input_values)
+		return [
+			transformed_array if transformed_array is not None
+			else self.solve(input_value)
+			for input_value, transformed_array
+			in zip(input_values, transformed_arrays)
+		]
@@ -1,37 +1,61 @@
 # Given the root of a binary tree, implement functions to serialize()
 # the tree into a string and deserialize() it back into a tree
+# Tags: trees, serialization
 
 # Approach: 
 # In order to convert a tree into a string we proceed with an pre-order
 # traversal of the tree and create a string of the following format:
 # Node [Representation for Left SubTree] [Representation for Right SubTree]
-# with the Representations being generated in a recursive fashion.
-# Thereafter, in order to deserialize this tree, we define a function
-# that splits this string into three pieces:
-# - Node
-# - Left Sub Tree
-# - Right Sub Tree
-# This can be done by finding the Square Bracket that closes the first
-# opening Square Bracket
+# with the Representations of empty trees being empty strings.
+# Rather than recursing into the subtrees, which would exhaust the recursion
+# limit on deep trees, the traversal keeps an explicit stack of what is left
+# to be written: the nodes still to be visited and the brackets that close
+# the representations of their ancestors. The string is written out in
+# chunks to a sink, such as a file, rather than built up in memory.
+# Thereafter, in order to deserialize this tree, we split the string into
+# tokens, which are either a Node value, an opening Square Bracket or a
+# closing Square Bracket, and read them in a single pass:
+# - A Node value creates a Node and attaches it to the innermost Node whose
+#   representation is still open, as its left child if none of its
+#   Square Brackets have been closed yet and as its right child otherwise
+# - A closing Square Bracket closes one of the children of that Node, and
+#   its representation is complete once both have been closed
+# The Nodes with open representations are kept on an explicit stack too.
+# The tokens are read from a stream in chunks, so the string is never sliced
+# and need not even be held in memory, with only the stack and the current
+# chunk as extra memory.
 # In this way we can serialize a tree into a string in O(N) time complexity
-# and deserialize it with average time complexity O(NlogN) [since the function
-# to split a string into three pieces is at most O(N), the average height
-# of a binary tree is of the order of O(logN) and we perform as many splits
-# as the height to restore the tree].
-# However, the deserialization is worst-case O(N^2) in degenerate scenarios
-# such as when each node's right child does not exist. This occurs because
-# the height of the tree is now O(N) and each split has complexity O(N), and
-# on combining them we obtain the worst-case time complexity of O(N^2).
-# To alleviate this worst-case time complexity scenario, we build in a special
-# trick - we check if the string has an empty pair of brackets near the beginning
-# or at the end, a signal that one of the children is empty but the other is not.
-# As a result, the split becomes O(1) and this degenerate case time complexity
-# now reduces to O(N).
+# and deserialize it in O(N) time complexity as well, with the extra memory
+# being of the order of O(H) for a tree of height H.
+# For large trees that are stored away, we also have a compact binary format
+# in which the Nodes are laid out in pre-order as records of:
+# - A byte of flags for the presence of the left and right child
+# - The length of the value, followed by the value encoded in UTF-8
+# - The offset of the record of the right child, if there is a left child
+#   too, which would otherwise come between the two
+# The record of the left child, or of the only child, follows right after.
+# As every child can be found from its parent without reading anything else,
+# the binary format can be memory-mapped and its Nodes created lazily, only
+# once they are accessed, which makes loading a stored tree O(1) and reading
+# a path through it O(H).
 
 
+import io
+import mmap
+import re
+import struct
+import typing
+
 from components import Solver
 
 
+# The number of characters read from or written to a stream at once
+CHUNK_SIZE = 1 << 16
+
+# The tokens of a serialized tree, which are Square Brackets and Node values
+TOKEN_PATTERN = re.compile(r"\[|\]|[^\s\[\]]+")
+
+
 class Node:
     def __init__(self, val, left=None, right=None):
         self.val = val
@@ -39,89 +63,364 @@ class Node:
         self.right = right
 
 
-def serialize(root_node) -> str:
+# The magic bytes the binary format starts with
+BINARY_MAGIC = b"BTREE\x01"
+
+# The flags of a record in the binary format for the presence of each child
+HAS_LEFT = 1
+HAS_RIGHT = 2
+
+# The flags and the length of the value of a record, and the offset of the
+# record of the right child that follows them when there are two children
+RECORD_HEADER = struct.Struct("<BI")
+RIGHT_OFFSET = struct.Struct("<Q")
+
+
+class LazyNode(Node):
+	"""
+	A Node of a tree in the binary format, which decodes its value and
+	creates its children only once they are accessed
+	"""
+	def __init__(self, buffer, offset: int):
+		"""
+		Initializing the Node without reading its record
+		:param buffer: The buffer holding the tree in the binary format
+		:param offset: The offset of the record of the Node in the buffer
+		"""
+		self.buffer = buffer
+		self.offset = offset
+		self.loaded = False
+
+	def load(self):
+		"""
+		Reads the record of the Node, unless it has been read already
+		:return: None
+		"""
+		if self.loaded:
+			return
+		flags, length = RECORD_HEADER.unpack_from(self.buffer, self.offset)
+		offset = self.offset + RECORD_HEADER.size
+		right_offset = None
+		if flags & HAS_LEFT and flags & HAS_RIGHT:
+			right_offset, = RIGHT_OFFSET.unpack_from(self.buffer, offset)
+			offset += RIGHT_OFFSET.size
+		self._val = str(self.buffer[offset:offset + length], "utf-8")
+		offset += length
+		# The record of the left child, or of the only child, is the next one
+		self._left = LazyNode(self.buffer, offset) if flags & HAS_LEFT else None
+		if flags & HAS_RIGHT:
+			self._right = LazyNode(self.buffer, right_offset or offset)
+		else:
+			self._right = None
+		self.loaded = True
+
+	@property
+	def val(self):
+		self.load()
+		return self._val
+
+	@val.setter
+	def val(self, val):
+		self.load()
+		self._val = val
+
+	@property
+	def left(self):
+		self.load()
+		return self._left
+
+	@left.setter
+	def left(self, left):
+		self.load()
+		self._left = left
+
+	@property
+	def right(self):
+		self.load()
+		return self._right
+
+	@right.setter
+	def right(self, right):
+		self.load()
+		self._right = right
+
+
+def serialize(
+		root_node, sink: typing.Optional[typing.TextIO] = None
+) -> typing.Optional[str]:
 	"""
 	Serializes the tree into a string of the form Node [LeftTree] [RightTree]
 	:param root_node: The root of the tree
-	:return: A string representing the serialized version of the tree
+	:param sink: A file-like object to write the string to, if any
+	:return: A string representing the serialized version of the tree, or
+		None if it was written to the sink
 	"""
-	if root_node is None:
-		return ""
-	elif root_node.left is None and root_node.right is None:
-		return f"{root_node.val} [] []"
-	else:
-		return (
-			f"{root_node.val} "
-			f"[{serialize(root_node.left)}] "
-			f"[{serialize(root_node.right)}]"
-		)
+	stream = io.StringIO() if sink is None else sink
+	chunk = []
+	chunk_size = 0
+	# The stack holds the Nodes still to be visited and the strings to be
+	# written once the subtree visited before them is complete, in reverse
+	stack = [root_node]
+	while stack:
+		item = stack.pop()
+		if item is None:
+			continue
+		if isinstance(item, Node):
+			stack.extend(("]", item.right, "] [", item.left))
+			item = f"{item.val} ["
+		chunk.append(item)
+		chunk_size += len(item)
+		if chunk_size >= CHUNK_SIZE:
+			stream.write("".join(chunk))
+			chunk = []
+			chunk_size = 0
+	stream.write("".join(chunk))
+	return stream.getvalue() if sink is None else None
 
 
-def deserialize(serialized: str):
+def iter_tokens(
+		reader: typing.TextIO, chunk_size: int = CHUNK_SIZE
+) -> typing.Iterator[str]:
+	"""
+	Reads the tokens of a serialized tree from a stream, chunk by chunk
+	:param reader: A file-like object to read the serialized tree from
+	:param chunk_size: The number of characters to read at once
+	:return: A generator of the tokens
+	"""
+	remainder = ""
+	while True:
+		chunk = reader.read(chunk_size)
+		if not chunk:
+			break
+		chunk = remainder + chunk
+		# A Node value at the end of the chunk may carry on into the next
+		# one, so it is held back until the next one has been read
+		end = len(chunk)
+		while end > 0 and not (chunk[end - 1].isspace() or chunk[end - 1] in "[]"):
+			end -= 1
+		remainder = chunk[end:]
+		yield from TOKEN_PATTERN.findall(chunk, 0, end)
+	if remainder:
+		yield remainder
+
+
+def deserialize(serialized: typing.Union[str, typing.TextIO]):
 	"""
 	Deserializes a serialized tree string back into a tree
-	:param serialized: The serialized tree string
-	:return: A Node representing the root of the tree
-	"""
-	# A serialized tree is always of format val [...] [...]
-	# and with this we isolate the val from the child trees
-	val, child_trees = serialized.split(" ", 1)
-	# The child_trees of a leaf node are of the form '[] []'
-	if child_trees.endswith("[]") and child_trees.startswith("[]"):
-		return Node(val)
-	# But if only the right one is empty, child_trees ends with '[]'
-	elif child_trees.endswith("[]"):
-		left_sub_tree = child_trees[1:-4] # Removes enclosing [] too
-		return Node(val, left=deserialize(left_sub_tree))
-	# Similarly if only the left one is empty, child_trees starts with '[]'
-	elif child_trees.startswith("[]"):
-		right_sub_tree = child_trees[3:-1] # Removes enclosing [] too
-		return Node(val, left=deserialize(right_sub_tree))
-	# But if neither are empty we employ a bracket matching algorithm
+	:param serialized: The serialized tree string, or a file-like object to
+		read it from
+	:raises: ValueError: When the serialized tree is malformed
+	:return: A Node representing the root of the tree, or None for an
+		empty tree
+	"""
+	if isinstance(serialized, str):
+		tokens = (match.group() for match in TOKEN_PATTERN.finditer(serialized))
 	else:
-		# By counting '[' and ']', we try to find the idx of the
-		# closing bracket of the left sub-tree
-		brackets = 0
-		for idx in range(len(child_trees)):
-			if child_trees[idx] == "[":
-				brackets += 1
-			elif child_trees[idx] == "]":
-				brackets -= 1
-			if brackets == 0:
-				partition_idx = idx
-				break
-		left_sub_tree = child_trees[1:partition_idx]
-		right_sub_tree = child_trees[partition_idx+3:-1]
-		return Node(
-			val, left=deserialize(left_sub_tree), 
-			right=deserialize(right_sub_tree)
+		tokens = iter_tokens(serialized)
+	root_node = None
+	# The Nodes whose representations are still open, along with the number
+	# of the Square Brackets of their children that have been opened and
+	# those that have been closed
+	stack = []
+	for token in tokens:
+		if token == "[":
+			if not stack or stack[-1][1] != stack[-1][2] or stack[-1][1] == 2:
+				raise ValueError("Unexpected opening bracket in the serialized tree")
+			stack[-1][1] += 1
+		elif token == "]":
+			if not stack or stack[-1][1] == stack[-1][2]:
+				raise ValueError("Unmatched closing bracket in the serialized tree")
+			stack[-1][2] += 1
+			if stack[-1][2] == 2:
+				stack.pop()
+		else:
+			node = Node(token)
+			if stack:
+				parent, opened_children, closed_children = stack[-1]
+				child = parent.left if closed_children == 0 else parent.right
+				if opened_children == closed_children or child is not None:
+					raise ValueError(f"Unexpected value {token} in the serialized tree")
+				if closed_children == 0:
+					parent.left = node
+				else:
+					parent.right = node
+			elif root_node is None:
+				root_node = node
+			else:
+				raise ValueError("More than one root in the serialized tree")
+			stack.append([node, 0, 0])
+	if stack:
+		raise ValueError("Unclosed brackets in the serialized tree")
+	return root_node
+
+
+def serialize_binary(
+		root_node, sink: typing.Optional[typing.BinaryIO] = None
+) -> typing.Optional[bytes]:
+	"""
+	Serializes the tree into the binary format
+	:param root_node: The root of the tree
+	:param sink: A binary file-like object to write the tree to, if any
+	:return: The bytes of the serialized tree, or None if it was written to
+		the sink
+	"""
+	# The offset of the right child depends on the size of the left subtree,
+	# so the sizes of all subtrees are found first in a post-order traversal
+	sizes = {None: 0}
+	stack = [(root_node, False)]
+	while stack:
+		node, visited = stack.pop()
+		if node is None:
+			continue
+		if not visited:
+			stack.extend(((node, True), (node.right, False), (node.left, False)))
+			continue
+		sizes[id(node)] = (
+			RECORD_HEADER.size + len(str(node.val).encode("utf-8"))
+			+ (RIGHT_OFFSET.size if node.left and node.right else 0)
+			+ sizes[id(node.left) if node.left else None]
+			+ sizes[id(node.right) if node.right else None]
 		)
 
+	stream = io.BytesIO() if sink is None else sink
+	chunk = bytearray(BINARY_MAGIC)
+	offset = len(BINARY_MAGIC)
+	stack = [root_node]
+	while stack:
+		node = stack.pop()
+		if node is None:
+			continue
+		value = str(node.val).encode("utf-8")
+		flags = (HAS_LEFT if node.left else 0) | (HAS_RIGHT if node.right else 0)
+		chunk += RECORD_HEADER.pack(flags, len(value))
+		record_size = RECORD_HEADER.size + len(value)
+		if node.left and node.right:
+			record_size += RIGHT_OFFSET.size
+			chunk += RIGHT_OFFSET.pack(offset + record_size + sizes[id(node.left)])
+		chunk += value
+		offset += record_size
+		stack.extend((node.right, node.left))
+		if len(chunk) >= CHUNK_SIZE:
+			stream.write(chunk)
+			chunk = bytearray()
+	stream.write(chunk)
+	return stream.getvalue() if sink is None else None
 
-# The test cases create a tree, serialize and deserialize it,
-# and test for the value of one of the node
-test_cases = [
-	{
-		"input": {
-			"value": deserialize(
-				serialize(
-					Node(
-						"root", 
-						Node("left", Node("left.left")), 
-						Node("right")
+
+def deserialize_binary(buffer) -> typing.Optional[LazyNode]:
+	"""
+	Deserializes a tree in the binary format lazily, reading the record of
+	each Node only once it is accessed
+	:param buffer: A bytes-like object holding the tree in the binary format,
+		which has to outlive the tree
+	:raises: ValueError: When the buffer is not in the binary format
+	:return: A LazyNode representing the root of the tree, or None for an
+		empty tree
+	"""
+	if buffer[:len(BINARY_MAGIC)] != BINARY_MAGIC:
+		raise ValueError("The buffer does not hold a tree in the binary format")
+	if len(buffer) == len(BINARY_MAGIC):
+		return None
+	return LazyNode(buffer, len(BINARY_MAGIC))
+
+
+def load_binary(path: str) -> typing.Optional[LazyNode]:
+	"""
+	Memory-maps a file holding a tree in the binary format and deserializes
+	the tree lazily, so that only the pages of the Nodes accessed are read
+	:param path: The path of the file
+	:raises: ValueError: When the file is not in the binary format
+	:return: A LazyNode representing the root of the tree, or None for an
+		empty tree
+	"""
+	with open(path, "rb") as tree_file:
+		# The mapping stays open for as long as the Nodes refer to it
+		buffer = mmap.mmap(tree_file.fileno(), 0, access=mmap.ACCESS_READ)
+	return deserialize_binary(buffer)
+
+
+def build_path(length: int):
+	"""
+	Builds a degenerate tree in which every Node only has a left child
+	:param length: The number of Nodes in the tree
+	:return: The root of the tree
+	"""
+	root_node = None
+	for idx in range(length):
+		root_node = Node(f"node.{idx}", left=root_node)
+	return root_node
+
+
+def test_cases() -> typing.Iterator[dict]:
+	"""
+	Generates the test cases, which create a tree, serialize and deserialize
+	it, and test for the value of one of the node. The deep tree is only
+	built when the test cases are checked rather than whenever the solution
+	is imported
+	:return: A generator of the test cases
+	"""
+	yield from [
+		{
+			"input": {
+				"value": deserialize(
+					serialize(
+						Node(
+							"root", 
+							Node("left", Node("left.left")), 
+							Node("right")
+						)
 					)
-				)
-			).left.left.val
+				).left.left.val
+			},
+			"output": "left.left"
+		},
+		{
+			"input": {
+				"value": deserialize(serialize(Node("root"))).val
+			},
+			"output": "root"
 		},
-		"output": "left.left"
-	},
-	{
+		{
+			"input": {
+				"value": deserialize(
+					serialize(Node("root", right=Node("right")))
+				).right.val
+			},
+			"output": "right"
+		}
+	]
+	yield {
 		"input": {
-			"value": deserialize(serialize(Node("root"))).val
+			"value": deserialize(io.StringIO(serialize(build_path(10000)))).val
 		},
-		"output": "root"
+		"output": "node.9999"
 	}
-]
+	yield from [
+		{
+			"input": {
+				"value": deserialize_binary(
+					serialize_binary(
+						Node(
+							"root",
+							Node("left", right=Node("left.right")),
+							Node("right", Node("right.left"), Node("right.right"))
+						)
+					)
+				).right.right.val
+			},
+			"output": "right.right"
+		},
+		{
+			"input": {
+				"value": serialize(
+					deserialize_binary(
+						serialize_binary(deserialize("a [b [] [c [] []]] [d [] []]"))
+					)
+				)
+			},
+			"output": "a [b [] [c [] []]] [d [] []]"
+		}
+	]
 
 
 class ProblemSolver(Solver):
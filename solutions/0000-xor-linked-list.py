@@ -4,6 +4,7 @@
 # linked list contains only the XOR of previous and the next element.
 # Implement the add(element) which adds an element to the end and the 
 # get(idx) function that returns the element at idx.
+# Tags: linked-lists, bit-manipulation
 
 # Approach: XOR is a binary mathematical operation that is defined as:
 # 0 XOR 0 = 0
@@ -26,11 +27,27 @@
 # Therefore x XOR n_y = x XOR (x XOR z) = (x XOR x) XOR z = 0 XOR z = z
 # Put simply, if we XOR the address of the previous element with the
 # XOR of neighbors of the current element we get the address of the next.
-# This is how we implement the get(idx) operation in O(N).
-# Further, add(element) is merely creating a new node after iterating
-# to the end of the list.
+# As the XOR of the neighbors is symmetric, the same holds when walking from
+# the next element to the previous one. For the elements at either end of
+# the list, the missing neighbor is taken to have the address 0, so that
+# the XOR of the neighbors is the address of the only neighbor.
+# This is how we implement the get(idx) operation in O(N), walking from
+# whichever end of the list is closer to idx.
+# Further, add(element) is merely creating a new node after the tail of the
+# list, whose address we keep along with that of the head, and is O(1).
+# Keeping every node as a Python object in a dictionary of addresses is far
+# heavier than an ordinary list though, which defeats the purpose. So the
+# list can also be stored in two parallel arrays of 64-bit integers, one for
+# the elements and one for the XORs of the neighbors, with the address of a
+# node being its index in the arrays. The index 0 is kept unused as the null
+# address, and the slots of removed nodes are chained into a free-list
+# through their XORs of neighbors, so that they are reused by later adds.
+# This brings the storage down to 16 bytes per element.
 
 
+import typing
+from array import array
+
 from components import Solver
 
 
@@ -81,8 +98,13 @@ class XORLinkedList:
 		"""
 		# We mimick a pool of addresses as a dictionary
 		self.address_pool = {}
-		# The root element
+		# The root element, which is the head of the list, and its tail
 		self.root = None
+		self.tail = None
+		self.length = 0
+
+	def __len__(self) -> int:
+		return self.length
 
 	def add(self, element: int) -> None:
 		"""
@@ -94,29 +116,58 @@ class XORLinkedList:
 		if self.root is None:
 			node = Node(element=element, address=0)
 			self.root = node
+			self.tail = node
 			self.address_pool[0] = node # Housekeeping to maintain address pool
+			self.length = 1
 			return
 
-		# Iterating to the end of the existing list
-		iterator = self.root
-		previous_address = None
-		while iterator.both is not None:
-			next_address = get_next_address(previous_address, iterator.both)
-			previous_address = iterator.address
-			iterator = self.address_pool[next_address]
-
 		# Create the new node. For simplicity of implementation the address
 		# we assign to a new element will be 2 + address of previous element
-		node = Node(element=element, address=iterator.address+2)
+		node = Node(element=element, address=self.tail.address+2)
 		# Updating address pool with the newly node created
-		self.address_pool[node.address] = node 
+		self.address_pool[node.address] = node
 
 		# Modify the last element to hold the XOR of the address
-		# of the node before it and the new node to be added
-		if previous_address is None:
-			iterator.both = node.address
+		# of the node before it and the new node to be added, and the new
+		# node to hold the address of the last element as its only neighbor
+		if self.tail.both is None:
+			self.tail.both = node.address
 		else:
-			iterator.both = previous_address ^ node.address
+			self.tail.both ^= node.address
+		node.both = self.tail.address
+		self.tail = node
+		self.length += 1
+
+	def extend(self, elements: typing.Iterable[int]) -> None:
+		"""
+		Adds the elements to the XOR Linked List in order
+		:param elements: The elements to be added to the list
+		:return: None
+		"""
+		for element in elements:
+			self.add(element)
+
+	def iter_nodes(self, reverse: bool = False) -> typing.Iterator[Node]:
+		"""
+		Iterates over the nodes of the list, from the head or from the tail
+		:param reverse: Whether to iterate from the tail to the head
+		:return: A generator of the nodes
+		"""
+		iterator = self.tail if reverse else self.root
+		previous_address = None
+		for _ in range(self.length):
+			yield iterator
+			next_address = get_next_address(previous_address, iterator.both)
+			previous_address = iterator.address
+			iterator = self.address_pool.get(next_address)
+
+	def __iter__(self) -> typing.Iterator[int]:
+		for node in self.iter_nodes():
+			yield node.element
+
+	def __reversed__(self) -> typing.Iterator[int]:
+		for node in self.iter_nodes(reverse=True):
+			yield node.element
 
 	def get(self, index: int) -> int:
 		"""
@@ -124,43 +175,202 @@ class XORLinkedList:
 		:param index: The index for which the element is to be returned
 		:return: The element at the index
 		"""
-		idx = 0
-		iterator = self.root
-		previous_address = None
-		# Iterate over the list, ending when the index is reached or the
-		# end of the list is
-		while idx < index and iterator.both is not None:
-			idx += 1
-			next_address = get_next_address(previous_address, iterator.both)
-			previous_address = iterator.address
-			iterator = self.address_pool[next_address]
-		# If the index is within the bounds of the list, else -1
-		if idx == index:
-			return iterator.element
+		# If the index is out of the bounds of the list, -1
+		if not 0 <= index < self.length:
+			return -1
+		# Iterate over the list from the closer of its two ends, ending
+		# when the index is reached
+		if index < self.length - 1 - index:
+			nodes, steps = self.iter_nodes(), index
+		else:
+			nodes, steps = self.iter_nodes(reverse=True), self.length - 1 - index
+		for _ in range(steps):
+			next(nodes)
+		return next(nodes).element
+
+	def __str__(self) -> None:
+		"""
+		Overriding the method to print the linked list
+		:return: None
+		"""
+		return "\n".join(str(node) for node in self.iter_nodes())
+
+
+class ArrayXORLinkedList:
+	def __init__(self) -> None:
+		"""
+		Initializing the arrays needed for an array-backed XOR Linked List
+		:return: None
+		"""
+		# The elements and the XORs of the neighbors of the nodes, with the
+		# index 0 being the null address
+		self.elements = array("q", [0])
+		self.both = array("q", [0])
+		# The addresses of the head and the tail of the list, and of the first
+		# slot of the free-list
+		self.head = 0
+		self.tail = 0
+		self.free = 0
+		self.length = 0
+
+	def __len__(self) -> int:
+		return self.length
+
+	def nbytes(self) -> int:
+		"""
+		Returns the number of bytes taken up by the arrays of the list
+		:return: The number of bytes
+		"""
+		return (len(self.elements) + len(self.both)) * self.elements.itemsize
+
+	def add(self, element: int) -> None:
+		"""
+		Adds an element to the XOR Linked List, reusing a free slot if any
+		:param element: The element to be added to the list
+		:return: None
+		"""
+		if self.free:
+			address = self.free
+			self.free = self.both[address]
+			self.elements[address] = element
+		else:
+			address = len(self.elements)
+			self.elements.append(element)
+			self.both.append(0)
+		# The new node has the tail as its only neighbor, and the tail has the
+		# new node in place of the null address
+		self.both[address] = self.tail
+		if self.tail:
+			self.both[self.tail] ^= address
+		else:
+			self.head = address
+		self.tail = address
+		self.length += 1
+
+	def extend(self, elements: typing.Iterable[int]) -> None:
+		"""
+		Adds the elements to the XOR Linked List in order
+		:param elements: The elements to be added to the list
+		:return: None
+		"""
+		for element in elements:
+			self.add(element)
+
+	def iter_addresses(self, reverse: bool = False) -> typing.Iterator[int]:
+		"""
+		Iterates over the addresses of the nodes of the list, from the head or
+		from the tail
+		:param reverse: Whether to iterate from the tail to the head
+		:return: A generator of the addresses
+		"""
+		previous_address = 0
+		address = self.tail if reverse else self.head
+		while address:
+			yield address
+			previous_address, address = address, previous_address ^ self.both[address]
+
+	def __iter__(self) -> typing.Iterator[int]:
+		for address in self.iter_addresses():
+			yield self.elements[address]
+
+	def __reversed__(self) -> typing.Iterator[int]:
+		for address in self.iter_addresses(reverse=True):
+			yield self.elements[address]
+
+	def locate(self, index: int) -> typing.Tuple[int, int]:
+		"""
+		Finds the node at a given index, walking from the closer of the two
+		ends of the list
+		:param index: The index of the node, which has to be within bounds
+		:return: The addresses of the node and of its neighbor on the side
+			walked from, or the null address if there is none
+		"""
+		if index < self.length - 1 - index:
+			addresses, steps = self.iter_addresses(), index
 		else:
+			addresses, steps = self.iter_addresses(reverse=True), self.length - 1 - index
+		previous_address = 0
+		for _ in range(steps):
+			previous_address = next(addresses)
+		return next(addresses), previous_address
+
+	def get(self, index: int) -> int:
+		"""
+		Obtains the element at a given index
+		:param index: The index for which the element is to be returned
+		:return: The element at the index
+		"""
+		# If the index is out of the bounds of the list, -1
+		if not 0 <= index < self.length:
 			return -1
+		address, _ = self.locate(index)
+		return self.elements[address]
+
+	def remove(self, index: int) -> int:
+		"""
+		Removes the element at a given index, freeing its slot for reuse
+		:param index: The index of the element to be removed
+		:raises: IndexError: When the index is out of the bounds of the list
+		:return: The element removed
+		"""
+		if not 0 <= index < self.length:
+			raise IndexError(f"Index {index} out of range for {self.length} elements")
+		address, previous_address = self.locate(index)
+		next_address = previous_address ^ self.both[address]
+		# Each of the neighbors swaps the node for the other neighbor
+		if previous_address:
+			self.both[previous_address] ^= address ^ next_address
+		if next_address:
+			self.both[next_address] ^= address ^ previous_address
+		# At either end of the list, the only neighbor becomes the new end
+		if address == self.head:
+			self.head = previous_address ^ next_address
+		if address == self.tail:
+			self.tail = previous_address ^ next_address
+		element = self.elements[address]
+		self.both[address] = self.free
+		self.free = address
+		self.length -= 1
+		return element
 
 	def __str__(self) -> None:
 		"""
 		Overriding the method to print the linked list
 		:return: None
 		"""
-		string = []
-		iterator = self.root
-		previous_address = None
-		string.append(str(iterator))
-		# Iterate over the list
-		while iterator.both is not None:
-			next_address = get_next_address(previous_address, iterator.both)
-			previous_address = iterator.address
-			iterator = self.address_pool[next_address]
-			string.append(str(iterator))
-		return "\n".join(string)
+		return "\n".join(
+			f"Element: {self.elements[address]} | Address: {address} | "
+			f"Both: {self.both[address]}"
+			for address in self.iter_addresses()
+		)
+
+
+# The storages a XOR Linked List can be built with, each of which is
+# benchmarked as a variant of its own
+STORAGES = {"node": XORLinkedList, "array": ArrayXORLinkedList}
+BENCH_VARIANTS = list(STORAGES)
+
+
+def generate_input(size: int, variant: str = "array") -> dict:
+	"""
+	Generates the input for a test case of a given size to benchmark with,
+	which builds and traverses a XOR Linked List
+	:param size: The number of elements in the list
+	:param variant: The storage of the list, one of the STORAGES
+	:return: The input arguments of the test case
+	"""
+	return {"elements": range(size), "storage": variant}
 
 
 xor_linked_list = XORLinkedList()
 for idx in range(10):
 	xor_linked_list.add(12 * idx)
+array_xor_linked_list = ArrayXORLinkedList()
+array_xor_linked_list.extend(12 * idx for idx in range(10))
+array_xor_linked_list.remove(0)
+array_xor_linked_list.remove(4)
+array_xor_linked_list.remove(7)
+array_xor_linked_list.add(120)
 # print(xor_linked_list) # Uncomment to view the linked list
 
 # The test cases create a tree, serialize and deserialize it,
@@ -183,10 +393,69 @@ test_cases = [
 			"value": xor_linked_list.get(11)
 		},
 		"output": -1
+	},
+	{
+		"input": {
+			"value": list(reversed(xor_linked_list))[:3]
+		},
+		"output": [108, 96, 84]
+	},
+	{
+		"input": {
+			"elements": range(100000),
+			"storage": "node",
+			"index": 99990
+		},
+		"output": 99990
+	},
+	{
+		"input": {
+			"value": list(array_xor_linked_list)
+		},
+		"output": [12, 24, 36, 48, 72, 84, 96, 120]
+	},
+	{
+		"input": {
+			"value": array_xor_linked_list.get(5)
+		},
+		"output": 84
+	},
+	{
+		"input": {
+			"elements": [3, 1, 4, 1, 5],
+			"storage": "node"
+		},
+		"output": 14
+	},
+	{
+		"input": {
+			"elements": [3, 1, 4, 1, 5],
+			"storage": "array"
+		},
+		"output": 14
+	},
+	{
+		"input": {
+			"elements": range(1000),
+			"storage": "array",
+			"nbytes": True
+		},
+		"output": 16016
 	}
 ]
 
 
 class ProblemSolver(Solver):
 	def solve(self, input_value: dict):
-		return input_value["value"]
\ No newline at end of file
+		if "elements" not in input_value:
+			return input_value["value"]
+		# Builds a list with the given storage and either gets the element
+		# at the index or traverses it
+		linked_list = STORAGES[input_value["storage"]]()
+		linked_list.extend(input_value["elements"])
+		if "index" in input_value:
+			return linked_list.get(input_value["index"])
+		if input_value.get("nbytes"):
+			# 16 bytes per element, besides the null address
+			return linked_list.nbytes()
+		return sum(linked_list)
@@ -1,6 +1,14 @@
 # Solves the problem of adding two values a and b
-from components import Solver, CheckSolver
+from components import (
+	Solver, CheckSolver, BenchSolver, BenchStore, CheckCache, ProfileSolver,
+	JsonLinesReporter, JUnitReporter, Registry, ImportProfiler
+)
 
+import json
+import os
+import sys
+import tempfile
+import time
 import unittest
 
 
@@ -23,4 +31,321 @@ class AddSolver(Solver):
 
 class TestComponents(unittest.TestCase):
 	def test_components(self):
-		CheckSolver.check_solver(test_cases, AddSolver())
\ No newline at end of file
+		CheckSolver.check_solver(test_cases, AddSolver())
+
+	def test_batches(self):
+		many_test_cases = test_cases * 5
+		CheckSolver.check_solver(many_test_cases, AddSolver(), batch_size=3)
+		wrong_test_cases = many_test_cases + [
+			{"input": {"a": 1, "b": 1}, "output": 3}
+		]
+		with self.assertRaises(AssertionError):
+			CheckSolver.check_solver(wrong_test_cases, AddSolver(), batch_size=4)
+
+	def test_array_outputs(self):
+		import numpy as np
+
+		class PairSolver(Solver):
+			def solve(self, input_value: dict):
+				return np.array([input_value["a"], input_value["b"]])
+
+		pair_test_cases = [
+			{"input": {"a": 1, "b": 2}, "output": [1, 2]},
+			{"input": {"a": 3, "b": 4}, "output": [3, 4]},
+		]
+		for batch_size in (1, 2):
+			CheckSolver.check_solver(pair_test_cases, PairSolver(), batch_size)
+		with self.assertRaises(AssertionError):
+			CheckSolver.check_solver(
+				[{"input": {"a": 1, "b": 2}, "output": [1, 3]}], PairSolver(), 2
+			)
+
+	def test_streamed_test_cases(self):
+		def stream_test_cases():
+			for a in range(1000):
+				yield {"input": {"a": a, "b": 1}, "output": a + 1}
+
+		count = CheckSolver.check_solver(stream_test_cases(), AddSolver(), 7)
+		self.assertEqual(count, 1000)
+		count = CheckSolver.check_solver(stream_test_cases, AddSolver(), 7)
+		self.assertEqual(count, 1000)
+
+	def test_case_timeout(self):
+		class SlowSolver(Solver):
+			def solve(self, input_value: dict):
+				time.sleep(input_value["seconds"])
+				return input_value["seconds"]
+
+		slow_test_cases = [
+			{"input": {"seconds": 0}, "output": 0},
+			{"input": {"seconds": 5}, "output": 5},
+		]
+		with self.assertRaises(TimeoutError):
+			CheckSolver.check_solver(slow_test_cases, SlowSolver(), case_timeout=0.1)
+		CheckSolver.check_solver(slow_test_cases[:1], SlowSolver(), case_timeout=0.1)
+
+	def test_iter_results(self):
+		wrong_test_cases = test_cases + [
+			{"input": {"a": 1, "b": 1}, "output": 3}
+		] + test_cases
+		records = list(CheckSolver.iter_results(wrong_test_cases, AddSolver()))
+		self.assertEqual(
+			[record["status"] for record in records],
+			["PASSED", "PASSED", "FAILED", "PASSED", "PASSED"]
+		)
+		self.assertIsNotNone(records[2]["error"])
+		self.assertGreater(records[0]["peak_memory"], 0)
+
+class TestBenchSolver(unittest.TestCase):
+	def test_bench_solver(self):
+		results = BenchSolver.bench_solver(
+			lambda size: {"a": size, "b": size}, AddSolver(), [10, 100],
+			repeat=3, warmup=1
+		)
+		self.assertEqual([result["size"] for result in results], [10, 100])
+		for result in results:
+			self.assertLessEqual(result["min"], result["median"])
+			self.assertLessEqual(result["median"], result["p95"])
+
+	def test_fit_exponent(self):
+		sizes = [100, 1000, 10000]
+		exponent = BenchSolver.fit_exponent(sizes, [size ** 2 for size in sizes])
+		self.assertAlmostEqual(exponent, 2.0)
+		with self.assertRaises(ValueError):
+			BenchSolver.fit_exponent([1000, 1000], [1.0, 1.1])
+		with self.assertRaises(ValueError):
+			BenchSolver.fit_exponent([1000], [1.0])
+
+	def test_declared_complexity(self):
+		source = "# Time Complexity: O(N) and Space Complexity: O(1)\n"
+		complexity = BenchSolver.declared_complexity(source)
+		self.assertEqual(complexity, "N")
+		self.assertEqual(BenchSolver.complexity_exponent("NlogN"), 1.0)
+		self.assertEqual(BenchSolver.complexity_exponent("N^2"), 2.0)
+		self.assertEqual(BenchSolver.complexity_exponent("1"), 0.0)
+
+
+class TestBenchStore(unittest.TestCase):
+	def test_compare(self):
+		baseline = [{"size": 10, "min": 1.0, "p95": 1.3, "peak_memory": 100}]
+		faster = [{"size": 10, "min": 0.9, "p95": 1.0, "peak_memory": 100}]
+		noisy = [{"size": 10, "min": 1.2, "p95": 1.4, "peak_memory": 100}]
+		slower = [{"size": 10, "min": 1.5, "p95": 1.6, "peak_memory": 200}]
+		self.assertEqual(BenchStore.compare(baseline, faster, 0.1, 0.1), [])
+		# Slower than the threshold but within the spread of the baseline
+		self.assertEqual(BenchStore.compare(baseline, noisy, 0.1, 0.1), [])
+		self.assertEqual(len(BenchStore.compare(baseline, slower, 0.1, 0.1)), 2)
+		self.assertEqual(len(BenchStore.compare(baseline, slower, 1.0, 0.1)), 1)
+		larger = slower + [{"size": 100, "min": 9.0, "p95": 9.5, "peak_memory": 900}]
+		self.assertEqual(BenchStore.missing_sizes(baseline, larger), [100])
+
+	def test_baseline_runs(self):
+		with tempfile.TemporaryDirectory() as directory:
+			store = BenchStore(os.path.join(directory, "history.json"))
+			for run in range(BenchStore.MAX_RUNS + 2):
+				store.add("add.py", "hash", [{
+					"size": 10, "min": 1.0 + run, "median": 1.5 + run,
+					"p95": 2.0 + run, "peak_memory": 100,
+				}])
+			baseline = store.baseline("add.py")
+			self.assertEqual(baseline["runs"], BenchStore.MAX_RUNS)
+			self.assertEqual(baseline["results"][0]["min"], 3.0)
+			self.assertEqual(baseline["results"][0]["p95"], 8.0)
+			# A changed file starts a baseline of its own
+			store.add("add.py", "changed", [{
+				"size": 10, "min": 1.0, "median": 1.0, "p95": 1.0, "peak_memory": 100,
+			}])
+			self.assertEqual(store.baseline("add.py")["runs"], 1)
+
+
+class TestCheckCache(unittest.TestCase):
+	def test_check_cache(self):
+		with tempfile.TemporaryDirectory() as directory:
+			solution = os.path.join(directory, "solution.py")
+			with open(solution, "w") as solution_file:
+				solution_file.write("test_cases = []\n")
+			cache_path = os.path.join(directory, "cache.json")
+			cache = CheckCache(cache_path)
+			key = cache.key(solution)
+			self.assertFalse(cache.hit("solution.py", key))
+			cache.add("solution.py", solution, key)
+			cache.save()
+
+			cache = CheckCache(cache_path)
+			self.assertTrue(cache.hit("solution.py", cache.key(solution)))
+			# A solution that passed without limits may not pass with them
+			self.assertFalse(cache.hit(
+				"solution.py", cache.key(solution, {"TIMEOUT": 1})
+			))
+			with open(solution, "a") as solution_file:
+				solution_file.write("# changed\n")
+			self.assertFalse(cache.hit("solution.py", cache.key(solution)))
+
+			os.remove(solution)
+			cache.save()
+			self.assertEqual(CheckCache(cache_path).entries, {})
+
+
+class TestRegistry(unittest.TestCase):
+	def test_registry(self):
+		with tempfile.TemporaryDirectory() as directory:
+			solutions_dir = os.path.join(directory, "registered_solutions")
+			os.makedirs(solutions_dir)
+			with open(os.path.join(solutions_dir, "add.py"), "w") as solution_file:
+				solution_file.write(
+					"# Tags: Arrays, math\n# Time Complexity: O(1)\n"
+					"LOADED = True\n"
+				)
+			with open(os.path.join(solutions_dir, "sort.py"), "w") as solution_file:
+				solution_file.write("# Tags: arrays\n")
+			manifest_path = os.path.join(directory, "registry.json")
+			registry = Registry(solutions_dir, manifest_path)
+			self.assertTrue(registry.scan())
+			registry.save()
+			self.assertEqual(registry.problems(), ["add.py", "sort.py"])
+			self.assertEqual(registry.problems(["arrays", "MATH"]), ["add.py"])
+			self.assertEqual(registry.entry("add")["complexity"], "1")
+
+			# Unchanged files are not read again
+			registry = Registry(solutions_dir, manifest_path)
+			self.assertFalse(registry.scan())
+			os.remove(os.path.join(solutions_dir, "sort.py"))
+			self.assertTrue(registry.scan())
+			self.assertEqual(registry.problems(["arrays"]), ["add.py"])
+
+			sys.path.insert(0, directory)
+			try:
+				module = registry.module("add.py")
+				self.assertIs(registry.module("add"), module)
+				self.assertFalse(module.loaded)
+				self.assertNotIn("registered_solutions.add", sys.modules)
+				self.assertTrue(module.LOADED)
+				self.assertTrue(module.loaded)
+			finally:
+				sys.path.remove(directory)
+				sys.modules.pop("registered_solutions.add", None)
+				sys.modules.pop("registered_solutions", None)
+
+
+class TestImportProfiler(unittest.TestCase):
+	def test_parse(self):
+		output = (
+			"import time: self [us] | cumulative | imported package\n"
+			"import time:       100 |        100 |     numpy.core\n"
+			"import time:       200 |        300 |   numpy\n"
+			"import time:        50 |         50 |   typing\n"
+			"import time:       400 |        750 | solution\n"
+		)
+		records = ImportProfiler.parse(output)
+		self.assertEqual(
+			[(record["name"], record["depth"]) for record in records],
+			[("numpy.core", 2), ("numpy", 1), ("typing", 1), ("solution", 0)]
+		)
+		self.assertAlmostEqual(records[-1]["self"], 400e-6)
+		self.assertAlmostEqual(records[-1]["cumulative"], 750e-6)
+
+	def test_profile(self):
+		profiler = ImportProfiler(first_party=["components"])
+		profile = profiler.profile("components")
+		self.assertGreater(profile["total"], 0)
+		self.assertAlmostEqual(
+			profile["total"], profile["imports"] + profile["execution"]
+		)
+		self.assertIn("components.solver", [
+			dependency["name"] for dependency in profile["dependencies"]
+		])
+		self.assertEqual(profiler.classify("components.solver"), "first-party")
+		self.assertEqual(profiler.classify("collections.abc"), "stdlib")
+		self.assertEqual(profiler.classify("pandas"), "third-party")
+
+	def test_unused_imports(self):
+		source = (
+			"import collections.abc\nimport numpy as np\nimport pandas\n"
+			"from typing import List, Dict\n"
+			"def f(values: List[int]):\n"
+			"\timport json\n"
+			"\treturn np.array(values), collections.abc.Sequence\n"
+		)
+		self.assertEqual(ImportProfiler.unused_imports(source), {
+			"pandas": "pandas", "Dict": "typing", "json": "json"
+		})
+
+
+class TestProfileSolver(unittest.TestCase):
+	def test_profile_solver(self):
+		solver = ProfileSolver(AddSolver())
+		CheckSolver.check_solver(test_cases, solver)
+		with tempfile.TemporaryDirectory() as directory:
+			paths = solver.write_reports(directory, "add")
+			for path in paths:
+				self.assertTrue(os.path.isfile(path))
+			with open(paths[0]) as report_file:
+				self.assertIn("solve", report_file.read())
+
+	def test_nested_tracing(self):
+		class ListSolver(Solver):
+			def solve(self, input_value: dict):
+				return sum(list(range(input_value["a"] * 10000)))
+
+		list_test_cases = [{"input": {"a": 3, "b": 0}, "output": sum(range(30000))}]
+		solver = ProfileSolver(ListSolver())
+		records = list(CheckSolver.iter_results(list_test_cases, solver))
+		self.assertEqual(records[0]["status"], CheckSolver.PASSED)
+		self.assertGreater(records[0]["peak_memory"], 0)
+		self.assertGreater(solver.peak_memory, 0)
+
+
+class TestReporters(unittest.TestCase):
+	def test_reporters(self):
+		records = list(CheckSolver.iter_results(test_cases, AddSolver()))
+		with tempfile.TemporaryDirectory() as directory:
+			jsonl_path = os.path.join(directory, "results.jsonl")
+			junit_path = os.path.join(directory, "results.xml")
+			reporters = [JsonLinesReporter(jsonl_path), JUnitReporter(junit_path)]
+			for reporter in reporters:
+				for record in records:
+					reporter.report_case("add.py", record)
+				reporter.report_problem("add.py", "PASSED", 0.1, "")
+				reporter.report_problem("broken.py", "FAILED", 0.1, "Traceback")
+				reporter.close()
+
+			with open(jsonl_path) as jsonl_file:
+				lines = [json.loads(line) for line in jsonl_file]
+			self.assertEqual(len(lines), len(records) + 2)
+			self.assertEqual(lines[-1]["error"], "Traceback")
+			with open(junit_path) as junit_file:
+				junit = junit_file.read()
+			self.assertIn('name="add.py" tests="2" failures="0"', junit)
+			self.assertIn('name="broken.py" tests="1" failures="1"', junit)
+
+	def test_junit_problem_status(self):
+		records = list(CheckSolver.iter_results(test_cases, AddSolver()))
+		with tempfile.TemporaryDirectory() as directory:
+			junit_path = os.path.join(directory, "results.xml")
+			reporter = JUnitReporter(junit_path)
+			# The problem timed out on its second test case, after the first
+			# one passed
+			reporter.report_case("add.py", records[0])
+			reporter.report_problem("add.py", "TIMEOUT", 2.0, "Timed out after 2s")
+			reporter.close()
+			with open(junit_path) as junit_file:
+				junit = junit_file.read()
+			self.assertIn('name="add.py" tests="2" failures="1"', junit)
+			self.assertIn('message="TIMEOUT">Timed out after 2s', junit)
+
+
+class TestLargestSumSolution(unittest.TestCase):
+	def test_float_chunks(self):
+		import importlib
+		import random
+		solution = importlib.import_module(
+			"solutions.0000-largest-sum-non-adjacent-numbers"
+		)
+		rng = random.Random(0)
+		for length in (1, 2, 3, 20, 5000):
+			array = [rng.uniform(-1, 1) for _ in range(length)]
+			expected = solution.maximum_non_adjacent_sum(array)
+			for chunk_size in (2, 7, 1 << 20):
+				result = solution.maximum_non_adjacent_sum_chunked(array, chunk_size)
+				self.assertIsInstance(result, float)
+				self.assertAlmostEqual(result, expected, places=9)